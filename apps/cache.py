@@ -0,0 +1,133 @@
+import time
+import logging
+import threading
+
+from collections import OrderedDict
+from typing import Any
+
+from django.core.cache import caches
+
+
+_missing = object()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _missing)
+
+            if item is _missing:
+                return default
+
+            value, expires = item
+
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TwoTierCache:
+    """
+    A small per-process LRU tier in front of a shared Django cache (Redis).
+
+    The shared tier is optional: if it is unreachable, the cache keeps working on the local tier only.
+    """
+
+    def __init__(self, prefix: str, local_size: int, local_ttl: float, alias: str = "default"):
+        self.prefix = prefix
+        self.alias = alias
+        self.local = LRUCache(local_size, local_ttl)
+        self.counters = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def make_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        key = self.make_key(key)
+        value = self.local.get(key, _missing)
+
+        if value is not _missing:
+            self.counters["local_hits"] += 1
+            return value
+
+        try:
+            item = self.shared.get(key, _missing)
+        except Exception as e:
+            logging.warning(f"Shared cache is unavailable: {e!r}")
+            item = _missing
+
+        if item is _missing:
+            self.counters["misses"] += 1
+            return default
+
+        value, expires = item
+        self.counters["shared_hits"] += 1
+        self.local.set(key, value, expires - time.time())
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        key = self.make_key(key)
+        self.local.set(key, value, ttl)
+
+        try:
+            self.shared.set(key, (value, time.time() + ttl), ttl)
+        except Exception as e:
+            logging.warning(f"Shared cache is unavailable: {e!r}")
+
+    def delete(self, key: str) -> None:
+        key = self.make_key(key)
+        self.local.delete(key)
+
+        try:
+            self.shared.delete(key)
+        except Exception as e:
+            logging.warning(f"Shared cache is unavailable: {e!r}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters of this process"""
+
+        requests = sum(self.counters.values())
+        hits = self.counters["local_hits"] + self.counters["shared_hits"]
+
+        return {
+            **self.counters,
+            "hit_ratio": round(hits / requests, 4) if requests else None,
+            "local_size": len(self.local),
+            "local_max_size": self.local.max_size,
+        }
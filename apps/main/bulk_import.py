@@ -0,0 +1,97 @@
+import logging
+import itertools
+
+from typing import Iterator
+
+from django.db import transaction, DatabaseError, IntegrityError
+from django.db.models import Q
+
+from . import models, services
+from .celery_tasks import process_link_image
+from config import settings
+
+
+def import_links(links: list[str], user, collection: models.Collection | None = None) -> Iterator[dict]:
+    """
+    Create links of a user in bulk and yield the result of every link as soon as it is known.
+    The pages are scraped concurrently, the links are saved in batches of BULK_BATCH_SIZE.
+    """
+
+    new_links = {}
+
+    for link in links:
+        canonical_link = services.canonicalize_url(link)
+
+        if not models.fits_columns(models.Link, canonical_link=canonical_link):
+            yield {"link": link, "status": "failed", "detail": "The link is too long."}
+        elif canonical_link in new_links:
+            yield {"link": link, "status": "duplicate"}
+        else:
+            new_links[canonical_link] = link
+
+    saved_links = models.Link.objects.filter(Q(canonical_link__in=new_links.keys()) | Q(link__in=new_links.values()))
+    existing = set(itertools.chain.from_iterable(saved_links.values_list("link", "canonical_link")))
+
+    for canonical_link, link in list(new_links.items()):
+        if canonical_link in existing or link in existing:
+            del new_links[canonical_link]
+            yield {"link": link, "status": "exists"}
+
+    pending = list(new_links.items())
+    batch = []
+
+    for i, data in services.iter_dicts_with_data_from_links([link for _, link in pending]):
+        canonical_link, link = pending[i]
+
+        if isinstance(data, Exception):
+            yield {"link": link, "status": "failed", "detail": getattr(data, "reason", repr(data))}
+            continue
+
+        batch.append(models.Link(link=link, canonical_link=canonical_link, user_id=user, **models.fit_columns(
+            models.Link, title=data["title"], description=data["description"], image=data["image"],
+            type_of_link=data["type_of_link"],
+        )))
+
+        if len(batch) >= settings.LINK_SETTINGS["BULK_BATCH_SIZE"]:
+            yield from save_links(batch, collection)
+            batch = []
+
+    yield from save_links(batch, collection)
+
+
+def save_links(batch: list[models.Link], collection: models.Collection | None = None) -> Iterator[dict]:
+    """
+    Insert a batch of links and their collection relations with two queries.
+    A batch the database rejects is saved link by link, a link it rejects is reported as failed.
+    """
+
+    if not batch:
+        return
+
+    try:
+        with transaction.atomic():
+            created = models.Link.objects.bulk_create(batch)
+
+            if collection is not None:
+                through = models.Link.collections.through
+                through.objects.bulk_create([through(link_id=link.id, collection_id=collection.id) for link in created])
+                models.touch(models.Collection, [collection.id])
+    except DatabaseError as error:
+        # Another request has saved one of the links in the meantime or a value does not fit,
+        # find the link by saving the links one by one
+        if len(batch) > 1:
+            for link in batch:
+                yield from save_links([link], collection)
+        elif isinstance(error, IntegrityError):
+            yield {"link": batch[0].link, "status": "exists"}
+        else:
+            logging.warning(f"The link is not saved. Link: {batch[0].link} - {error}")
+            yield {"link": batch[0].link, "status": "failed", "detail": "The link could not be saved."}
+
+        return
+
+    for link in created:
+        if link.image:
+            process_link_image.delay(link.id)
+
+        yield {"link": link.link, "status": "created", "id": link.id}
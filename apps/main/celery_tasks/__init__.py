@@ -0,0 +1 @@
+from .tasks import scrape_link_data, process_link_image, refresh_stale_links
\ No newline at end of file
@@ -0,0 +1,72 @@
+import logging
+
+from celery import shared_task
+from django.db import DatabaseError
+from django.utils import timezone
+
+from apps.main import models, services, images, refresh
+
+
+@shared_task
+def scrape_link_data(link_id: int) -> None:
+    """Scrape a pending link page and fill the link with its metadata"""
+
+    link = models.Link.objects.filter(id=link_id, status=services.LinkStatus.PENDING).first()
+
+    if link is None:
+        return
+
+    try:
+        data = services.get_dict_with_data_from_link(link.link)
+    except Exception as e:
+        logging.warning(f"Failed to scrape link data. Link: {link.link} - {e!r}")
+        models.Link.objects.filter(id=link_id).update(status=services.LinkStatus.FAILED, modified_in=timezone.now())
+        return
+
+    values = models.fit_columns(models.Link, title=data["title"], description=data["description"],
+                                image=data["image"], type_of_link=data["type_of_link"])
+
+    try:
+        models.Link.objects.filter(id=link_id).update(**values, status=services.LinkStatus.READY,
+                                                      modified_in=timezone.now())
+    except DatabaseError as e:
+        logging.warning(f"Failed to save link data. Link: {link.link} - {e!r}")
+        models.Link.objects.filter(id=link_id).update(status=services.LinkStatus.FAILED, modified_in=timezone.now())
+        return
+
+    if values["image"]:
+        process_link_image.delay(link_id)
+
+
+@shared_task
+def process_link_image(link_id: int) -> None:
+    """Download the link image once and save its thumbnails"""
+
+    link = models.Link.objects.filter(id=link_id).first()
+
+    if link is None or not link.image:
+        return
+
+    # Another link with the same remote image already has the thumbnails
+    thumbnails = models.Link.objects.filter(image=link.image.name).exclude(id=link_id).exclude(thumbnails={}) \
+        .values_list("thumbnails", flat=True).first()
+
+    if thumbnails is None:
+        try:
+            thumbnails = images.store_thumbnails(images.get_image_content(link.image))
+        except Exception as e:
+            logging.warning(f"Failed to process link image. Link: {link.link}, image: {link.image.name} - {e!r}")
+            return
+
+    # The image may have been changed while it was processed
+    models.Link.objects.filter(id=link_id, image=link.image.name).update(thumbnails=thumbnails,
+                                                                        modified_in=timezone.now())
+
+
+@shared_task
+def refresh_stale_links() -> dict:
+    """Revalidate the metadata of a batch of stale links, run by Celery beat"""
+
+    outcomes = refresh.refresh_links()
+    logging.info(f"Refreshed stale links: {outcomes}")
+    return outcomes
@@ -0,0 +1,101 @@
+import time
+import logging
+
+from django.core.cache import caches
+
+from config import settings
+
+
+class HostCircuitBreaker:
+    """
+    Failure tracker of every host, shared by all processes through a Django cache (Redis).
+
+    The circuit of a host opens after CIRCUIT_FAILURE_THRESHOLD failures within CIRCUIT_FAILURE_WINDOW seconds,
+    and requests to the host are short-circuited. After CIRCUIT_COOL_DOWN seconds the circuit is half-open:
+    a single probe request is let through, its success closes the circuit and its failure opens it again.
+
+    If the cache is unreachable, every request is let through.
+    """
+
+    def __init__(self, prefix: str = "circuit", alias: str = "default"):
+        self.prefix = prefix
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, kind: str, host: str) -> str:
+        return f"{self.prefix}:{kind}:{host}"
+
+    def get_retry_after(self, host: str) -> float | None:
+        """Seconds until a request to the host may be sent, None if it may be sent now"""
+
+        try:
+            opened = self.cache.get(self.make_key("opened", host))
+
+            if opened is None:
+                return None
+
+            retry_after = opened + settings.SCRAPER_SETTINGS["CIRCUIT_COOL_DOWN"] - time.time()
+
+            # Half-open: only the request that takes the probe slot goes through
+            if retry_after <= 0 and \
+                    self.cache.add(self.make_key("probe", host), 1, settings.SCRAPER_SETTINGS["TIMEOUT"] * 2):
+                return None
+        except Exception as e:
+            logging.warning(f"Shared cache is unavailable: {e!r}")
+            return None
+
+        return max(retry_after, 1.0)
+
+    def is_failure(self, status: int | None) -> bool:
+        """A timeout, a connection error or a status of an overloaded or hostile site"""
+
+        return status is None or status in settings.SCRAPER_SETTINGS["CIRCUIT_FAILURE_STATUSES"]
+
+    def record_success(self, host: str) -> None:
+        try:
+            opened = self.cache.get(self.make_key("opened", host))
+
+            if opened is not None and opened + settings.SCRAPER_SETTINGS["CIRCUIT_COOL_DOWN"] <= time.time():
+                self.close(host)
+        except Exception as e:
+            logging.warning(f"Shared cache is unavailable: {e!r}")
+
+    def record_failure(self, host: str) -> None:
+        try:
+            opened = self.cache.get(self.make_key("opened", host))
+
+            if opened is not None:
+                # The requests sent before the circuit opened do not count, only the failed probe does
+                if opened + settings.SCRAPER_SETTINGS["CIRCUIT_COOL_DOWN"] <= time.time():
+                    self.open(host)
+                return
+
+            key = self.make_key("failures", host)
+            self.cache.add(key, 0, settings.SCRAPER_SETTINGS["CIRCUIT_FAILURE_WINDOW"])
+
+            try:
+                failures = self.cache.incr(key)
+            except ValueError:
+                # The window has just expired
+                self.cache.set(key, 1, settings.SCRAPER_SETTINGS["CIRCUIT_FAILURE_WINDOW"])
+                failures = 1
+
+            if failures >= settings.SCRAPER_SETTINGS["CIRCUIT_FAILURE_THRESHOLD"]:
+                self.open(host)
+        except Exception as e:
+            logging.warning(f"Shared cache is unavailable: {e!r}")
+
+    def open(self, host: str) -> None:
+        logging.warning(f"Circuit of the host is open. Host: {host}")
+        timeout = settings.SCRAPER_SETTINGS["CIRCUIT_COOL_DOWN"] + settings.SCRAPER_SETTINGS["CIRCUIT_FAILURE_WINDOW"]
+        self.cache.set(self.make_key("opened", host), time.time(), timeout)
+        self.cache.delete_many([self.make_key("failures", host), self.make_key("probe", host)])
+
+    def close(self, host: str) -> None:
+        self.cache.delete_many([self.make_key(kind, host) for kind in ("opened", "failures", "probe")])
+
+
+circuit_breaker = HostCircuitBreaker()
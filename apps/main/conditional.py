@@ -0,0 +1,97 @@
+import hashlib
+import datetime
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .fieldsets import get_fieldset_columns
+from .pagination import KeysetPagination
+
+
+class ConditionalGetViewMixin:
+    """
+    ETag and Last-Modified of the list and the detail GETs computed with small queries, without reading the rows.
+    A request with matching If-None-Match or If-Modified-Since gets a 304 before the rows are read and serialized.
+
+    The validators of a detail are the modified_in of the row and the count and the latest modified_in of the rows
+    of its `conditional_relation`. The validators of a keyset page are the ids and the modified_in of its rows,
+    read by the range scan of the page, and the count and the latest modified_in of their related rows.
+    A page has no Last-Modified, a deleted row does not move the others. The page number lists have no validators,
+    their count would scan the whole table.
+    The relation is left out of the validators if the fieldset of SparseFieldsetViewMixin does not render it.
+    """
+
+    # The relation rendered with the rows, its changes change the representation
+    conditional_relation: str
+
+    def get_etag(self, *values) -> str:
+        """A weak ETag of the validators and the format of the response"""
+
+        digest = hashlib.sha256(repr((self.request.accepted_renderer.format, *values)).encode()).hexdigest()
+        return f"W/{quote_etag(digest[:32])}"
+
+    def renders_relation(self) -> bool:
+        """Whether the fieldset renders the conditional_relation, as nested rows or through an annotation"""
+
+        _, prefetches, annotations = get_fieldset_columns(self.get_serializer_class(), *self.get_sparse_fieldset())
+        return bool(annotations) or any(prefetch.prefetch_through == self.conditional_relation
+                                        for prefetch in prefetches)
+
+    def get_list_validators(self) -> tuple[str | None, None]:
+        if KeysetPagination.cursor_query_param not in self.request.query_params:
+            return None, None
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        keyset = KeysetPagination()
+        rows = keyset.paginate_queryset(queryset.values("id", "created_in", "modified_in"), self.request, self)
+        values = [keyset.has_next, keyset.has_previous, [(row["id"], row["modified_in"]) for row in rows]]
+
+        if rows and self.renders_relation():
+            related = queryset.model.objects.filter(id__in=[row["id"] for row in rows]).order_by().aggregate(
+                count=Count(self.conditional_relation), modified=Max(f"{self.conditional_relation}__modified_in"),
+            )
+            values.extend(related.values())
+
+        return self.get_etag(*values), None
+
+    def get_detail_validators(self) -> tuple[str | None, datetime.datetime | None]:
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        aggregates = {"modified": Max("modified_in")}
+
+        if self.renders_relation():
+            aggregates["related_count"] = Count(self.conditional_relation)
+            aggregates["related_modified"] = Max(f"{self.conditional_relation}__modified_in")
+
+        row = queryset.order_by().aggregate(**aggregates)
+
+        # Not found, the view responds with a 404
+        if row["modified"] is None:
+            return None, None
+
+        return self.get_etag(*row.values()), max(filter(None, (row["modified"], row.get("related_modified"))))
+
+    def get_conditional_response(self, validators: tuple, handler, request, *args, **kwargs):
+        etag, last_modified = validators
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            if etag is not None:
+                response.headers["ETag"] = etag
+            if timestamp is not None:
+                response.headers["Last-Modified"] = http_date(timestamp)
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(self.get_list_validators(), super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(self.get_detail_validators(), super().retrieve, request, *args,
+                                             **kwargs)
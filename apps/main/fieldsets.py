@@ -0,0 +1,176 @@
+import functools
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, Prefetch, QuerySet
+from django.utils.translation import gettext_lazy as _
+from drf_yasg import openapi
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+FIELDS_QUERY_PARAM = "fields"
+EXPAND_QUERY_PARAM = "expand"
+
+swagger_parameters = [
+    openapi.Parameter(FIELDS_QUERY_PARAM, openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description="Comma separated fields of the response, all of them by default."),
+    openapi.Parameter(EXPAND_QUERY_PARAM, openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description="Comma separated nested relations of the response, all of them by default, "
+                                  "none if empty."),
+]
+
+
+def parse_list_param(request, name: str) -> frozenset[str] | None:
+    """The comma separated values of a query parameter, None if the request does not have it"""
+
+    if name not in request.query_params:
+        return None
+
+    return frozenset(value.strip() for value in request.query_params[name].split(",") if value.strip())
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer with the fields limited to the `fields` of the context and the nested relations
+    of `Meta.expandable_fields` rendered only if they are in the `expand` of the context.
+    Without the `fields` or the `expand` in the context every field is rendered.
+
+    The querysets of the views follow the Meta of the serializer too: `annotations` are the expressions
+    of the fields that are not model fields, and `nested_slices` are the nested fields with the first rows
+    of a relation, by their source: (relation, ordering, limit). The other nested relations are ordered by pk.
+    """
+
+    def get_fields(self) -> dict:
+        fields = super().get_fields()
+        requested, expand = self.context.get("fields"), self.context.get("expand")
+
+        for name in list(fields):
+            if requested is not None and name not in requested or \
+                    expand is not None and name in self.Meta.expandable_fields and name not in expand:
+                del fields[name]
+
+        return fields
+
+
+def get_columns(model: type[Model], serializer: serializers.Serializer) -> tuple[frozenset | None, tuple, dict]:
+    """
+    The model fields read by the serializer, the prefetches of its nested relations and the annotations of its
+    Meta for the other fields. The columns are None if a field is not backed by either, then every column is needed.
+    """
+
+    meta = model._meta
+    options = getattr(serializer, "Meta", None)
+    annotations = getattr(options, "annotations", {})
+    columns, prefetches, used_annotations = {meta.pk.name}, [], {}
+
+    for field in serializer.fields.values():
+        source = field.source.split(".")[0]
+
+        if source in annotations:
+            used_annotations[source] = annotations[source]
+            continue
+
+        relation, ordering, limit = getattr(options, "nested_slices", {}).get(source, (source, ("pk",), None))
+
+        try:
+            model_field = meta.get_field(relation)
+        except FieldDoesNotExist:
+            columns = None
+            continue
+
+        if model_field.many_to_many or model_field.one_to_many:
+            related_model = model_field.related_model
+            # Ordered to render the nested relation in the same order on every database
+            related = prune_queryset(related_model.objects.order_by(*ordering),
+                                     *get_columns(related_model, getattr(field, "child", field)))
+
+            # A sliced prefetch reads the first rows of every instance with a window function
+            if limit is not None:
+                prefetches.append(Prefetch(relation, queryset=related[:limit], to_attr=source))
+            else:
+                prefetches.append(Prefetch(relation, queryset=related))
+        elif columns is not None:
+            columns.add(model_field.name)
+
+    return (frozenset(columns) if columns is not None else None), tuple(prefetches), used_annotations
+
+
+@functools.lru_cache(maxsize=256)
+def get_fieldset_columns(serializer_class: type[serializers.Serializer], requested: frozenset | None,
+                         expand: frozenset | None) -> tuple[frozenset | None, tuple, dict]:
+    """get_columns of the serializer limited to a fieldset, the serializer fields are built once for every fieldset"""
+
+    serializer = serializer_class(context={"fields": requested, "expand": expand})
+    return get_columns(serializer_class.Meta.model, serializer)
+
+
+@functools.lru_cache(maxsize=None)
+def get_field_names(serializer_class: type[serializers.Serializer]) -> frozenset:
+    return frozenset(serializer_class().fields)
+
+
+def prune_queryset(queryset: QuerySet, columns: frozenset | None, prefetches: tuple, annotations: dict,
+                   keep: tuple = ()) -> QuerySet:
+    """
+    Prefetch only the nested relations rendered by the serializer, load only the columns it reads and annotate
+    only the fields it renders, plus the `keep` fields needed by the view (the lookup and the ordering fields)
+    """
+
+    queryset = queryset.prefetch_related(None).prefetch_related(*prefetches).annotate(**annotations)
+
+    if columns is None:
+        return queryset
+
+    return queryset.only(*columns, *keep)
+
+
+class SparseFieldsetViewMixin:
+    """
+    `?fields=` and `?expand=` of the GET requests for a serializer of SparseFieldsetSerializerMixin.
+    The fields left out are neither serialized nor loaded: the queryset drops the prefetches of the nested
+    relations that are not expanded and loads only the columns of the rendered fields.
+    """
+
+    invalid_fields_message = _("Unknown fields: {fields}.")
+
+    def get_sparse_fieldset(self) -> tuple[frozenset | None, frozenset | None]:
+        if not hasattr(self, "_sparse_fieldset"):
+            self._sparse_fieldset = self.validate_sparse_fieldset(
+                parse_list_param(self.request, FIELDS_QUERY_PARAM) or None,
+                parse_list_param(self.request, EXPAND_QUERY_PARAM),
+            )
+
+        return self._sparse_fieldset
+
+    def validate_sparse_fieldset(self, requested: frozenset | None, expand: frozenset | None) -> tuple:
+        serializer_class = self.get_serializer_class()
+        errors = {}
+
+        if requested is not None and (unknown := requested - get_field_names(serializer_class)):
+            errors[FIELDS_QUERY_PARAM] = [self.invalid_fields_message.format(fields=", ".join(sorted(unknown)))]
+
+        if expand is not None and (unknown := expand - set(serializer_class.Meta.expandable_fields)):
+            errors[EXPAND_QUERY_PARAM] = [self.invalid_fields_message.format(fields=", ".join(sorted(unknown)))]
+
+        if errors:
+            raise ValidationError(errors)
+
+        return requested, expand
+
+    def get_serializer_context(self) -> dict:
+        context = super().get_serializer_context()
+
+        if self.request is not None and self.request.method == "GET":
+            context["fields"], context["expand"] = self.get_sparse_fieldset()
+
+        return context
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()
+
+        if self.request is None or self.request.method != "GET":
+            return queryset
+
+        columns = get_fieldset_columns(self.get_serializer_class(), *self.get_sparse_fieldset())
+        ordering = tuple(field.lstrip("-") for field in queryset.query.order_by)
+        return prune_queryset(queryset, *columns, keep=(self.lookup_field, *ordering))
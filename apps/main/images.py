@@ -0,0 +1,108 @@
+import io
+import hashlib
+
+from PIL import Image, ImageOps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.fields.files import FieldFile
+
+from . import scraper
+from config import settings
+
+
+class ImageProcessingError(Exception):
+    """The link image could not be turned into thumbnails"""
+
+
+def get_image_content(image: FieldFile) -> bytes:
+    """Content of the link image: a remote og:image is downloaded, an uploaded image is read from the storage"""
+
+    if image.name.startswith(("http://", "https://")):
+        return scraper.get_bytes(image.name, settings.IMAGE_SETTINGS["MAX_BYTES"])
+
+    if image.size > settings.IMAGE_SETTINGS["MAX_BYTES"]:
+        raise ImageProcessingError(f"{image.name}: File is too large")
+
+    with image.open("rb") as file:
+        return file.read()
+
+
+def get_thumbnail_paths(digest: str) -> dict[str, dict[str, str]]:
+    """Storage paths of the thumbnails of an image by size and format"""
+
+    directory = f"{settings.IMAGE_SETTINGS['STORAGE_PATH']}/{digest[:2]}/{digest}"
+
+    return {
+        name: {format: f"{directory}/{name}.{format}" for format in settings.IMAGE_SETTINGS["FORMATS"]}
+        for name in settings.IMAGE_SETTINGS["THUMBNAIL_SIZES"]
+    }
+
+
+def encode(image: Image.Image, format: str) -> bytes:
+    if format == "jpeg" and image.mode == "RGBA":
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, quality=settings.IMAGE_SETTINGS["QUALITY"])
+    return buffer.getvalue()
+
+
+def make_thumbnails(content: bytes) -> dict[str, dict[str, bytes]]:
+    """Resize an image to every THUMBNAIL_SIZES box and encode the result in every format"""
+
+    sizes = sorted(settings.IMAGE_SETTINGS["THUMBNAIL_SIZES"].items(), key=lambda item: item[1], reverse=True)
+
+    try:
+        image = Image.open(io.BytesIO(content))
+
+        if image.width * image.height > settings.IMAGE_SETTINGS["MAX_PIXELS"]:
+            raise ImageProcessingError(f"The image is too large: {image.width}x{image.height}")
+
+        # A JPEG image is decoded right at the smallest scale that still covers the largest box
+        image.draft("RGB", (sizes[0][1], sizes[0][1]))
+        image = ImageOps.exif_transpose(image)
+
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(str(e))
+
+    thumbnails = {}
+
+    # Every smaller thumbnail is resized from the previous one instead of the original image
+    for name, size in sizes:
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        thumbnails[name] = {format: encode(image, format) for format in settings.IMAGE_SETTINGS["FORMATS"]}
+
+    return thumbnails
+
+
+def store_thumbnails(content: bytes) -> dict[str, dict[str, str]]:
+    """
+    Save the thumbnails of an image and return their storage paths.
+    The paths are derived from the sha256 of the image, so the same image is stored only once.
+    """
+
+    paths = get_thumbnail_paths(hashlib.sha256(content).hexdigest())
+
+    if all(default_storage.exists(path) for formats in paths.values() for path in formats.values()):
+        return paths
+
+    for name, formats in make_thumbnails(content).items():
+        for format, thumbnail in formats.items():
+            if not default_storage.exists(paths[name][format]):
+                paths[name][format] = default_storage.save(paths[name][format], ContentFile(thumbnail))
+
+    return paths
+
+
+def get_thumbnail_urls(thumbnails: dict[str, dict[str, str]], request=None) -> dict[str, dict[str, str]]:
+    """URLs of the stored thumbnails, absolute if there is a request"""
+
+    def get_url(path: str) -> str:
+        url = default_storage.url(path)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return {name: {format: get_url(path) for format, path in formats.items()} for name, formats in thumbnails.items()}
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.main.add_test_data import add_test_data
+
+
+class Command(BaseCommand):
+    help = "Add test users, collections and links. The link metadata comes from the bundled test data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scrape", action="store_true", help="Scrape the link metadata from the live pages")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        counts = add_test_data(scrape=options["scrape"])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Test data added in {elapsed:.2f}s: {counts['users']} users, {counts['collections']} collections, "
+            f"{counts['links']} new links."
+        ))
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.main.scale_data import ScaleDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate deterministic, Zipf-skewed users, collections and links for scale testing. "
+        "For example: --users 1000000 --collections 5000000 --links 50000000"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--collections", type=int, default=5000)
+        parser.add_argument("--links", type=int, default=50_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--exponent", type=float, default=1.1, help="Exponent of the Zipf distributions")
+        parser.add_argument("--max-collections-per-link", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=10_000, help="Rows saved in one transaction")
+        parser.add_argument("--id-offset", type=int, default=1_000_000_000, help="Id of the first generated row")
+        parser.add_argument("--method", choices=("auto", "copy", "bulk_create"), default="auto",
+                            help="COPY is used on Postgres by default, bulk_create on other databases")
+        parser.add_argument("--resume", action="store_true",
+                            help="Continue an interrupted run, the other arguments must be the same")
+
+    def handle(self, *args, **options):
+        if min(options["users"], options["collections"], options["links"], options["batch_size"]) < 1:
+            raise CommandError("The numbers of rows and the batch size must be positive.")
+
+        method = options["method"]
+
+        if method == "auto":
+            method = "copy" if connection.vendor == "postgresql" else "bulk_create"
+        elif method == "copy" and connection.vendor != "postgresql":
+            raise CommandError("COPY is only available on Postgres.")
+
+        self.started = time.monotonic()
+        self.reported = 0.0
+
+        generator = ScaleDataGenerator(
+            users=options["users"], collections=options["collections"], links=options["links"],
+            seed=options["seed"], exponent=options["exponent"],
+            max_collections_per_link=options["max_collections_per_link"], batch_size=options["batch_size"],
+            id_offset=options["id_offset"], method=method, progress=self.progress,
+        )
+
+        if not options["resume"] and generator.has_data():
+            raise CommandError(f"There are rows with ids from {options['id_offset']} already, use --resume to "
+                               f"continue the previous run or another --id-offset.")
+
+        generator.generate(resume=options["resume"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated in {time.monotonic() - self.started:.1f}s with {method}. "
+            f"The password of every user is 'scale{options['seed']}'."
+        ))
+
+    def progress(self, table: str, done: int, total: int) -> None:
+        """Print the progress at most once a second and at the end of every table"""
+
+        now = time.monotonic()
+
+        if done < total and now - self.reported < 1:
+            return
+
+        self.reported = now
+        self.stdout.write(f"{table}: {done:,}/{total:,} ({done / total:.1%}), {now - self.started:.1f}s")
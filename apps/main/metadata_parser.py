@@ -0,0 +1,87 @@
+import codecs
+
+from html.parser import HTMLParser
+
+
+class HeadMetadataParser(HTMLParser):
+    """
+    Incremental parser of the page metadata.
+
+    Feed it the page in chunks: it collects the OpenGraph tags, <title> and meta description
+    and sets `done` as soon as the <head> is over, so the rest of the page does not have to be downloaded.
+    """
+
+    def __init__(self, encoding: str = "utf-8"):
+        super().__init__(convert_charrefs=True)
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.og = {}
+        self.title = None
+        self.description = None
+        self.done = False
+        self._title_parts = None
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        self.feed(self.decoder.decode(chunk))
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "meta":
+            attrs = dict(attrs)
+            key = attrs.get("property") or attrs.get("name") or ""
+            content = attrs.get("content")
+
+            if content is None:
+                return
+
+            if key.startswith("og:"):
+                self.og.setdefault(key[3:], content)
+            elif key.lower() == "description" and self.description is None:
+                self.description = content
+        elif tag == "title" and self.title is None:
+            self._title_parts = []
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title" and self._title_parts is not None:
+            self.title = "".join(self._title_parts).strip()
+            self._title_parts = None
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data: str) -> None:
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def get_metadata(self, url: str) -> dict:
+        """OpenGraph data with the same fallbacks as opengraph_py3 scraping"""
+
+        data = dict(self.og)
+        fallbacks = {
+            "title": self.title,
+            "description": self.description or "",
+            "image": "",
+            "type": "other",
+            "url": url,
+        }
+
+        for key, value in fallbacks.items():
+            if not data.get(key) and value is not None:
+                data[key] = value
+
+        return data
+
+
+def parse_metadata(url: str, chunks, max_bytes: int, encoding: str = "utf-8") -> dict:
+    """Get the page metadata from an iterable of byte chunks, reading at most `max_bytes`"""
+
+    parser = HeadMetadataParser(encoding)
+    read = 0
+
+    for chunk in chunks:
+        parser.feed_bytes(chunk)
+        read += len(chunk)
+
+        if parser.done or read >= max_bytes:
+            break
+
+    return parser.get_metadata(url)
@@ -3,11 +3,13 @@ import datetime
 from typing import Optional
 
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from config import settings
-from .services import TypeOfLink
+from .services import TypeOfLink, LinkStatus, canonicalize_url
 
 
 User = settings.AUTH_USER_MODEL
@@ -20,11 +22,21 @@ class Collection(models.Model):
     description: str = models.CharField(_("description"), max_length=250, blank=True)
     created_in: datetime.datetime = models.DateTimeField(auto_now_add=True)
     updated_in: datetime.datetime = models.DateTimeField(blank=True, null=True)
+    # Any change of the collection or of its links, the Last-Modified of the conditional GETs
+    modified_in: datetime.datetime = models.DateTimeField(_("modified in"), auto_now=True, editable=False)
     user_id = models.ForeignKey(to=User, verbose_name="user", on_delete=models.CASCADE, related_name="collection_set")
 
     class Meta:
         verbose_name = _("Collection")
         verbose_name_plural = _("Collections")
+        indexes = [
+            # The list of collections, newest first and by keyset
+            models.Index(fields=["created_in", "id"], name="collection_created_in_id_idx"),
+            # The collections of a user, newest first
+            models.Index(fields=["user_id", "created_in"], name="collection_user_created_in_idx"),
+            # The latest change of the collections of the conditional GETs
+            models.Index(fields=["modified_in"], name="collection_modified_in_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -32,6 +44,12 @@ class Collection(models.Model):
     def get_absolute_url(self):
         return reverse('collection-detail', kwargs={'name': self.name})
 
+    def delete(self, *args, **kwargs):
+        link_ids = list(self.links.values_list("id", flat=True))
+        result = super().delete(*args, **kwargs)
+        touch(Link, link_ids)
+        return result
+
 
 class Link(models.Model):
     """Link model"""
@@ -39,11 +57,20 @@ class Link(models.Model):
     title: str = models.CharField(_("title"), max_length=250, help_text="Required.")
     description: str = models.CharField(_("description"), max_length=250, help_text="Required.")
     link: str = models.CharField(_("link"), max_length=200, help_text="Required.", unique=True)
+    canonical_link: str = models.CharField(_("canonical link"), max_length=250, unique=True, null=True, 
+                                           blank=True, editable=False)
     image: bytes = models.ImageField(_("image"), blank=True, upload_to="link/")
+    thumbnails: dict = models.JSONField(_("thumbnails"), default=dict, blank=True, editable=False)
     type_of_link: str = models.CharField(_("type"), max_length=250, default=TypeOfLink.WEBSITE, help_text="Required.", 
                                          choices=TypeOfLink.choices)
+    status: str = models.CharField(_("status"), max_length=10, default=LinkStatus.READY, choices=LinkStatus.choices)
     created_in: datetime.datetime = models.DateTimeField(auto_now_add=True)
     updated_in: datetime.datetime = models.DateTimeField(blank=True, null=True)
+    refreshed_in: datetime.datetime = models.DateTimeField(_("refreshed in"), default=timezone.now, editable=False)
+    # Any change of the link or of its collections, the Last-Modified of the conditional GETs
+    modified_in: datetime.datetime = models.DateTimeField(_("modified in"), auto_now=True, editable=False)
+    etag: str = models.CharField(_("ETag"), max_length=250, blank=True, editable=False)
+    last_modified: str = models.CharField(_("Last-Modified"), max_length=64, blank=True, editable=False)
     user_id = models.ForeignKey(to=User, verbose_name="user", on_delete=models.CASCADE, related_name="link_set")
     collections: Optional[list[Collection]] = models.ManyToManyField(to=Collection, related_name="links", 
                                                                      help_text="Required", blank=True)
@@ -51,9 +78,75 @@ class Link(models.Model):
     class Meta:
         verbose_name = _("Link")
         verbose_name_plural = _("Links")
+        indexes = [
+            # The list of links, newest first and by keyset
+            models.Index(fields=["created_in", "id"], name="link_created_in_id_idx"),
+            # The links of a user and the links of a type, newest first
+            models.Index(fields=["user_id", "created_in"], name="link_user_created_in_idx"),
+            models.Index(fields=["type_of_link", "created_in"], name="link_type_created_in_idx"),
+            # The links sharing an image, whose thumbnails process_link_image reuses
+            models.Index(fields=["image"], name="link_image_idx"),
+            # The stale links of refresh.get_stale_links, the pending and the edited links are left out
+            models.Index(fields=["refreshed_in"], name="link_stale_refreshed_in_idx",
+                         condition=models.Q(status=LinkStatus.READY, updated_in__isnull=True)),
+            # The latest change of the links of the conditional GETs
+            models.Index(fields=["modified_in"], name="link_modified_in_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.link}"
 
     def get_absolute_url(self):
         return reverse('link-detail', kwargs={'id': self.id})
+
+    def save(self, *args, **kwargs):
+        self.canonical_link = canonicalize_url(self.link)
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        collection_ids = list(self.collections.values_list("id", flat=True))
+        result = super().delete(*args, **kwargs)
+        touch(Collection, collection_ids)
+        return result
+
+
+def touch(model: type[models.Model], ids) -> None:
+    """
+    Move modified_in of the rows to now, for the changes that do not save them: the updates of querysets,
+    the relations saved in bulk and the relations deleted with the other side
+    """
+
+    model.objects.filter(id__in=ids).update(modified_in=timezone.now())
+
+
+def fit_columns(model: type[models.Model], **values) -> dict:
+    """
+    The values cut to the max_length of their columns, for the data scraped from the pages.
+    A file name that does not fit is dropped, a part of it is not a file.
+    """
+
+    fitted = {}
+
+    for name, value in values.items():
+        field = model._meta.get_field(name)
+
+        if isinstance(value, str) and field.max_length is not None and len(value) > field.max_length:
+            value = "" if isinstance(field, models.FileField) else value[:field.max_length]
+
+        fitted[name] = value
+
+    return fitted
+
+
+def fits_columns(model: type[models.Model], **values) -> bool:
+    """Whether the values fit the max_length of their columns as they are"""
+
+    return fit_columns(model, **values) == values
+
+
+def get_link_count() -> Coalesce:
+    """The number of links of a collection, as a subquery of the links of the collection only"""
+
+    links = Link.collections.through.objects.filter(collection_id=models.OuterRef("pk")).order_by()
+    return Coalesce(models.Subquery(links.values("collection_id").annotate(count=models.Count("*")).values("count")),
+                    0)
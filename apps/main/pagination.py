@@ -0,0 +1,149 @@
+import json
+import base64
+import binascii
+import datetime
+
+from django.db.models import Q, QuerySet
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest first pages by the (created_in, id) keyset, with opaque cursors in the next and previous links.
+
+    A page is a range scan of the (created_in, id) index after the last row of the previous page, so a deep page
+    costs as much as the first one, no count query is needed and the rows inserted meanwhile do not shift the pages.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.base_url = request.build_absolute_uri()
+        position, self.reverse = self.decode_cursor(request)
+
+        if position is not None:
+            created_in, id = position
+            # created_in bounds the range scan of the index, id only breaks the ties
+            if self.reverse:
+                queryset = queryset.filter(created_in__gte=created_in).filter(Q(created_in__gt=created_in) |
+                                                                               Q(id__gt=id))
+            else:
+                queryset = queryset.filter(created_in__lte=created_in).filter(Q(created_in__lt=created_in) |
+                                                                               Q(id__lt=id))
+
+        ordering = ("created_in", "id") if self.reverse else ("-created_in", "-id")
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.position = position
+        self.results = results
+        return results
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+
+        if self.results:
+            return self.encode_cursor(self.results[-1], reverse=False)
+
+        # An empty page before the first row of a previous page
+        return self.encode_position(self.position, reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+
+        if self.results:
+            return self.encode_cursor(self.results[0], reverse=True)
+
+        return self.encode_position(self.position, reverse=True)
+
+    def decode_cursor(self, request) -> tuple[tuple | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if not encoded:
+            return None, False
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = (datetime.datetime.fromisoformat(cursor["c"]), int(cursor["i"]))
+            return position, bool(cursor.get("r"))
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse: bool) -> str:
+        if isinstance(instance, dict):
+            return self.encode_position((instance["created_in"], instance["id"]), reverse)
+
+        return self.encode_position((instance.created_in, instance.id), reverse)
+
+    def encode_position(self, position: tuple, reverse: bool) -> str:
+        return replace_query_param(self.base_url, self.cursor_query_param, self.make_cursor(position, reverse))
+
+    def make_cursor(self, position: tuple, reverse: bool = False) -> str:
+        """The opaque cursor of the page after (or before, if reverse) the row at the (created_in, id) position"""
+
+        cursor = {"c": position[0].isoformat(), "i": position[1]}
+
+        if reverse:
+            cursor["r"] = 1
+
+        return base64.urlsafe_b64encode(json.dumps(cursor, separators=(",", ":")).encode()).decode()
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class CursorOrPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination for the admin and the UI, and keyset pagination without the count query when the request
+    has a `cursor` parameter: `?cursor=` for the first page, then the next and previous links
+    """
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view) -> list:
+        return super().get_schema_operation_parameters(view) + [{
+            "name": KeysetPagination.cursor_query_param,
+            "required": False,
+            "in": "query",
+            "description": "Keyset pagination cursor, empty for the first page.",
+            "schema": {"type": "string"},
+        }]
@@ -0,0 +1,241 @@
+import functools
+
+from collections import defaultdict
+from typing import Callable
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, QuerySet, Window
+from django.db.models.functions import RowNumber
+from django.http import Http404
+from rest_framework import fields as drf_fields, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from config import settings
+
+
+# The names of the parent id and of the row number in the rows of a nested relation
+PARENT_KEY = "_parent_id"
+ROW_NUMBER_KEY = "_row_number"
+
+
+class UnsupportedField(Exception):
+    """A serializer field the row reader can not render from a column"""
+
+
+class RowReader:
+    """
+    Read only representation of a ModelSerializer built from `.values()` rows, with the output of the serializer.
+    Every field is compiled once into a column and a converter of the value and the request, and every nested
+    relation is read for the whole page in one query, instead of the model instances, the field by field dispatch
+    and the prefetch managers.
+    The annotations and the nested slices of the Meta of the serializer are described by SparseFieldsetSerializerMixin.
+    Raises UnsupportedField for the serializers with their own to_representation and with fields that are not
+    backed by a column or that are not DRF fields, unless they have a `row_representation(value, request)`.
+    """
+
+    def __init__(self, serializer: serializers.ModelSerializer):
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            raise UnsupportedField(type(serializer).__name__)
+
+        self.model = serializer.Meta.model
+        self.pk = self.model._meta.pk.attname
+        self.fields = []
+        self.nested = []
+        self.annotations = {}
+        annotations = getattr(serializer.Meta, "annotations", {})
+        nested_slices = getattr(serializer.Meta, "nested_slices", {})
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if field.source in annotations:
+                self.annotations[field.source] = annotations[field.source]
+                self.fields.append((name, field.source, self.get_converter(field, None)))
+                continue
+
+            relation, ordering, limit = nested_slices.get(field.source, (field.source, ("pk",), None))
+            model_field = self.get_model_field(field, relation)
+
+            if isinstance(field, serializers.ListSerializer):
+                self.nested.append((name, self.get_lookup(model_field), RowReader(field.child), ordering, limit))
+            elif isinstance(field, (serializers.BaseSerializer, serializers.RelatedField,
+                                    serializers.ManyRelatedField)) or not model_field.concrete:
+                raise UnsupportedField(name)
+            else:
+                self.fields.append((name, model_field.attname, self.get_converter(field, model_field)))
+
+        self.columns = {self.pk, *(column for _, column, _ in self.fields if column not in self.annotations)}
+
+    def get_model_field(self, field: drf_fields.Field, name: str):
+        if "." in field.source or field.source == "*":
+            raise UnsupportedField(field.field_name)
+
+        try:
+            return self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise UnsupportedField(field.field_name)
+
+    @staticmethod
+    def get_lookup(model_field) -> str:
+        """The lookup from the related model of a nested relation back to the model"""
+
+        if not (model_field.many_to_many or model_field.one_to_many):
+            raise UnsupportedField(model_field.name)
+
+        return model_field.field.name if model_field.auto_created else model_field.related_query_name()
+
+    @staticmethod
+    def get_converter(field: drf_fields.Field, model_field) -> Callable:
+        """The to_representation of the field for a column value and the request"""
+
+        if hasattr(field, "row_representation"):
+            return field.row_representation
+        if isinstance(field, drf_fields.FileField):
+            return get_file_converter(field, model_field)
+        if isinstance(field, drf_fields.ChoiceField):
+            choices = field.choice_strings_to_values
+            return lambda value, request: choices.get(str(value), value)
+        # str() and int() of the values of the columns
+        if type(field) in (drf_fields.CharField, drf_fields.IntegerField):
+            return identity
+        # The other fields may read the request from the context of the serializer
+        if type(field).__module__ != drf_fields.__name__:
+            raise UnsupportedField(field.field_name)
+
+        return lambda value, request: field.to_representation(value)
+
+    def values(self, queryset: QuerySet, keep: tuple = (), **expressions) -> QuerySet:
+        """The rows of the queryset with the columns of the reader, plus the `keep` fields needed by the view"""
+
+        return queryset.prefetch_related(None).values(*dict.fromkeys((*self.columns, *keep)), **self.annotations,
+                                                      **expressions)
+
+    def read(self, rows: list[dict], request=None) -> list[dict]:
+        nested = [
+            (name, self.read_nested(lookup, reader, ordering, limit, [row[self.pk] for row in rows], request))
+            for name, lookup, reader, ordering, limit in self.nested
+        ]
+        fields = self.fields
+        results = []
+
+        for row in rows:
+            data = {}
+
+            for name, column, convert in fields:
+                value = row[column]
+                data[name] = None if value is None else convert(value, request)
+
+            for name, related in nested:
+                data[name] = related.get(row[self.pk], [])
+
+            results.append(data)
+
+        return results
+
+    def read_nested(self, lookup: str, reader: "RowReader", ordering: tuple, limit: int | None, ids: list,
+                    request) -> dict[int, list[dict]]:
+        """
+        The representations of a nested relation of the rows by their id, in one query.
+        With a limit only the first rows of every id are read, numbered by a window function as a sliced prefetch.
+        """
+
+        if not ids:
+            return {}
+
+        queryset = reader.model.objects.filter(**{f"{lookup}__in": ids})
+
+        if limit is not None:
+            row_number = Window(RowNumber(), partition_by=F(lookup), order_by=ordering)
+            queryset = queryset.annotate(**{ROW_NUMBER_KEY: row_number}).filter(**{f"{ROW_NUMBER_KEY}__lte": limit})
+
+        rows = list(reader.values(queryset.order_by(*ordering), **{PARENT_KEY: F(lookup)}))
+        related = defaultdict(list)
+
+        for row, data in zip(rows, reader.read(rows, request)):
+            related[row[PARENT_KEY]].append(data)
+
+        return related
+
+
+def identity(value, request):
+    return value
+
+
+def get_file_converter(field: drf_fields.FileField, model_field) -> Callable:
+    """FileField.to_representation for the file name of a column"""
+
+    if not getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL):
+        return identity
+
+    storage = model_field.storage
+
+    def convert(name: str, request) -> str | None:
+        if not name:
+            return None
+
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return convert
+
+
+@functools.lru_cache(maxsize=256)
+def get_row_reader(serializer_class: type[serializers.ModelSerializer], requested: frozenset | None,
+                   expand: frozenset | None) -> RowReader | None:
+    """The reader of the serializer limited to a fieldset, compiled once for every fieldset, None if unsupported"""
+
+    try:
+        return RowReader(serializer_class(context={"fields": requested, "expand": expand}))
+    except UnsupportedField:
+        return None
+
+
+class RowReaderViewMixin:
+    """
+    GET of the list and the detail endpoints through a RowReader of the serializer, with the same response.
+    Falls back to the serializer if it is not supported or LINK_SETTINGS["ROW_READER"] is off.
+    The fieldset comes from SparseFieldsetViewMixin, which must follow this mixin.
+    """
+
+    def get_row_reader(self) -> RowReader | None:
+        if not settings.LINK_SETTINGS["ROW_READER"]:
+            return None
+
+        return get_row_reader(self.get_serializer_class(), *self.get_sparse_fieldset())
+
+    def get_row_queryset(self, reader: RowReader) -> QuerySet:
+        queryset = self.get_queryset()
+        ordering = tuple(field.lstrip("-") for field in queryset.query.order_by)
+        return reader.values(self.filter_queryset(queryset), keep=ordering)
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_row_reader()
+
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.get_row_queryset(reader)
+        page = self.paginate_queryset(queryset)
+
+        if page is not None:
+            return self.get_paginated_response(reader.read(page, request))
+
+        return Response(reader.read(list(queryset), request))
+
+    def retrieve(self, request, *args, **kwargs):
+        reader = self.get_row_reader()
+
+        if reader is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_row_queryset(reader).filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        rows = list(queryset[:1])
+
+        if not rows:
+            raise Http404
+
+        self.check_object_permissions(request, rows[0])
+        return Response(reader.read(rows, request)[0])
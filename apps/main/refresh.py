@@ -0,0 +1,113 @@
+import asyncio
+import logging
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from . import models, services, scraper
+from config import settings
+
+
+def get_stale_links(batch_size: int) -> QuerySet:
+    """
+    The links whose metadata has not been refreshed for REFRESH_AGE, oldest first.
+    The links edited by their owners keep their metadata.
+    """
+
+    threshold = timezone.now() - settings.LINK_SETTINGS["REFRESH_AGE"]
+
+    return models.Link.objects.filter(
+        status=services.LinkStatus.READY, updated_in__isnull=True, refreshed_in__lt=threshold,
+    ).order_by("refreshed_in").only("id", "link", "canonical_link", "title", "description", "image", "thumbnails",
+                                    "type_of_link", "etag", "last_modified")[:batch_size]
+
+
+async def revalidate(links: list[models.Link], concurrency: int) -> list[tuple[dict | None, dict] | Exception]:
+    """Send conditional GETs for the link pages, at most `concurrency` at a time"""
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def revalidate_link(link: models.Link) -> tuple[dict | None, dict]:
+        async with semaphore:
+            return await scraper.fetcher.fetch_head(link.link, link.etag, link.last_modified)
+
+    return await asyncio.gather(*(revalidate_link(link) for link in links), return_exceptions=True)
+
+
+def refresh_links(batch_size: int | None = None, concurrency: int | None = None) -> dict:
+    """
+    Refresh the metadata of a batch of stale links and return the number of links by outcome.
+
+    The batch is claimed first by moving its refreshed_in to now, with the rows locked and the rows locked by
+    an overlapping run skipped, so overlapping runs take different links and a failing link is retried only
+    after REFRESH_AGE. The new metadata is written only to the links still unedited by their owners.
+    """
+
+    batch_size = batch_size or settings.LINK_SETTINGS["REFRESH_BATCH_SIZE"]
+    concurrency = concurrency or settings.LINK_SETTINGS["REFRESH_CONCURRENCY"]
+    claimed_in = timezone.now()
+
+    with transaction.atomic():
+        links = list(get_stale_links(batch_size).select_for_update(skip_locked=True))
+        models.Link.objects.filter(id__in=[link.id for link in links]).update(refreshed_in=claimed_in)
+
+    results = scraper.fetcher.run(revalidate(links, concurrency)) if links else []
+    changed = []
+    outcomes = Counter()
+
+    for link, result in zip(links, results):
+        if isinstance(result, Exception):
+            logging.info(f"Failed to refresh link data. Link: {link.link} - {result!r}")
+            outcomes["failed"] += 1
+            continue
+
+        metadata, validators = result
+
+        if metadata is None:
+            outcomes["not_modified"] += 1
+            continue
+
+        try:
+            data = services.build_dict_with_data(metadata)
+        except KeyError as e:
+            logging.info(f"Failed to refresh link data. Link: {link.link} - {e!r}")
+            outcomes["failed"] += 1
+            continue
+
+        services.cache_data_from_link(link.canonical_link or services.canonicalize_url(link.link), data)
+
+        values = models.fit_columns(models.Link, title=data["title"], description=data["description"],
+                                    image=data["image"], type_of_link=data["type_of_link"], **validators)
+
+        if values["image"] != link.image.name:
+            link.thumbnails = {}
+
+        for name, value in values.items():
+            setattr(link, name, value)
+
+        link.modified_in = timezone.now()
+
+        changed.append(link)
+
+    with transaction.atomic():
+        # The links edited by their owners during the requests keep the edit, a later edit waits for the write
+        unedited = set(models.Link.objects.select_for_update().filter(
+            id__in=[link.id for link in changed], updated_in__isnull=True, refreshed_in=claimed_in,
+        ).values_list("id", flat=True))
+
+        outcomes["edited"] = len(changed) - len(unedited)
+        changed = [link for link in changed if link.id in unedited]
+        models.Link.objects.bulk_update(changed, ["title", "description", "image", "thumbnails", "type_of_link",
+                                                  "etag", "last_modified", "modified_in"])
+        outcomes["updated"] = len(changed)
+
+    from .celery_tasks import process_link_image
+
+    for link in changed:
+        if link.image and not link.thumbnails:
+            process_link_image.delay(link.id)
+
+    return {outcome: count for outcome, count in outcomes.items() if count}
@@ -0,0 +1,228 @@
+import io
+import json
+import math
+import random
+import datetime
+import contextlib
+
+from typing import Callable, Iterator
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max, Model
+
+from . import models, services
+from apps.user import services as user_services
+from apps.user.models import User
+
+
+TYPES_OF_LINK = [services.TypeOfLink.WEBSITE] * 6 + [services.TypeOfLink.VIDEO] * 2 + \
+    [services.TypeOfLink.ARTICLE, services.TypeOfLink.MUSIC, services.TypeOfLink.BOOK]
+# The generated rows are created within three years from START_DATE
+START_DATE = datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc)
+PERIOD = int(datetime.timedelta(days=3 * 365).total_seconds())
+WORDS = ("python", "django", "rest", "api", "asyncio", "postgres", "redis", "celery", "docker", "testing",
+         "cache", "index", "query", "scale", "music", "video", "book", "guide", "notes", "release")
+
+
+def zipf_rank(rng: random.Random, n: int, exponent: float) -> int:
+    """
+    A rank from 1 to n with the probability of rank r about proportional to 1 / r ** exponent.
+    Uses the inverse of the continuous distribution, so it needs neither memory nor time proportional to n.
+    """
+
+    u = rng.random()
+
+    if math.isclose(exponent, 1.0):
+        rank = math.exp(u * math.log(n + 1))
+    else:
+        rank = (((n + 1) ** (1 - exponent) - 1) * u + 1) ** (1 / (1 - exponent))
+
+    return min(int(rank), n)
+
+
+class Scatter:
+    """A permutation of range(n), so that the most popular ranks are spread over the table instead of its start"""
+
+    def __init__(self, n: int, seed: int):
+        self.n = n
+        self.step = random.Random(seed).randrange(n // 2, n) | 1 if n > 2 else 1
+
+        while math.gcd(self.step, n) != 1:
+            self.step += 2
+
+    def __call__(self, rank: int) -> int:
+        return (rank - 1) * self.step % self.n
+
+
+class ScaleDataGenerator:
+    """
+    Generates users, collections and links with explicit ids starting at `id_offset`.
+
+    Every chunk of rows is generated by its own random generator seeded with (seed, table, chunk), so a run is
+    deterministic and can be resumed from the first chunk that has not been saved.
+    Links per user and links per collection follow a Zipf distribution.
+    """
+
+    def __init__(self, users: int, collections: int, links: int, seed: int = 0, exponent: float = 1.1,
+                 max_collections_per_link: int = 5, batch_size: int = 10_000, id_offset: int = 1_000_000_000,
+                 method: str = "bulk_create", progress: Callable[[str, int, int], None] | None = None):
+        self.users = users
+        self.collections = collections
+        self.links = links
+        self.seed = seed
+        self.exponent = exponent
+        self.max_collections_per_link = max_collections_per_link
+        self.batch_size = batch_size
+        self.id_offset = id_offset
+        self.method = method
+        self.progress = progress or (lambda table, done, total: None)
+
+        self.scatter_users = Scatter(users, seed)
+        self.scatter_collections = Scatter(collections, seed + 1)
+        # The same password of every user, with a salt of the seed so that the data stays the same
+        self.password = user_services.create_hashed_password(f"scale{seed}", salt=f"scale{seed}")
+
+    def get_rng(self, table: str, chunk: int) -> random.Random:
+        return random.Random(f"{self.seed}:{table}:{chunk}")
+
+    def get_date(self, rng: random.Random) -> datetime.datetime:
+        return START_DATE + datetime.timedelta(seconds=rng.randrange(PERIOD))
+
+    def get_user_id(self, rng: random.Random) -> int:
+        return self.id_offset + self.scatter_users(zipf_rank(rng, self.users, self.exponent))
+
+    def user_rows(self, chunk: int, start: int, stop: int) -> Iterator[dict]:
+        rng = self.get_rng("user", chunk)
+
+        for i in range(start, stop):
+            created_in = self.get_date(rng)
+            yield {"id": self.id_offset + i, "username": f"scale{i}", "email": f"scale{i}@example.com",
+                   "hashed_password": self.password, "created_in": created_in, "date_joined": created_in}
+
+    def collection_rows(self, chunk: int, start: int, stop: int) -> Iterator[dict]:
+        rng = self.get_rng("collection", chunk)
+
+        for i in range(start, stop):
+            description = " ".join(rng.sample(WORDS, 3))
+            created_in = self.get_date(rng)
+            yield {"id": self.id_offset + i, "name": f"scale-{i}", "description": description,
+                   "created_in": created_in, "modified_in": created_in, "user_id_id": self.get_user_id(rng)}
+
+    def link_rows(self, chunk: int, start: int, stop: int) -> Iterator[dict]:
+        rng = self.get_rng("link", chunk)
+
+        for i in range(start, stop):
+            link = f"https://host{zipf_rank(rng, 10_000, self.exponent)}.example.com/page/{i}"
+            created_in = self.get_date(rng)
+            collection_count = zipf_rank(rng, self.max_collections_per_link + 1, self.exponent) - 1
+            collection_ids = {
+                self.id_offset + self.scatter_collections(zipf_rank(rng, self.collections, self.exponent))
+                for _ in range(collection_count)
+            }
+
+            yield {"id": self.id_offset + i, "title": " ".join(rng.sample(WORDS, 4)).capitalize(),
+                   "description": " ".join(rng.sample(WORDS, 8)), "link": link, "canonical_link": link,
+                   "image": f"https://images.example.com/{i}.jpg" if rng.random() < 0.7 else "",
+                   "type_of_link": rng.choice(TYPES_OF_LINK), "created_in": created_in, "refreshed_in": created_in,
+                   "modified_in": created_in,
+                   "user_id_id": self.get_user_id(rng), "collection_ids": sorted(collection_ids)}
+
+    def get_saved_chunks(self, model: type[Model], total: int) -> int:
+        """Number of chunks of the table saved by a previous run, chunks are saved in order and atomically"""
+
+        last_id = model.objects.filter(id__gte=self.id_offset, id__lt=self.id_offset + total) \
+            .aggregate(last_id=Max("id"))["last_id"]
+        return 0 if last_id is None else (last_id - self.id_offset) // self.batch_size + 1
+
+    def has_data(self) -> bool:
+        return any(model.objects.filter(id__gte=self.id_offset).exists() for model in (User, models.Collection,
+                                                                                      models.Link))
+
+    def generate(self, resume: bool = False) -> None:
+        tables = [
+            ("users", User, self.users, self.user_rows),
+            ("collections", models.Collection, self.collections, self.collection_rows),
+            ("links", models.Link, self.links, self.link_rows),
+        ]
+
+        for table, model, total, rows in tables:
+            first_chunk = self.get_saved_chunks(model, total) if resume else 0
+
+            for chunk in range(first_chunk, math.ceil(total / self.batch_size)):
+                start, stop = chunk * self.batch_size, min((chunk + 1) * self.batch_size, total)
+
+                with transaction.atomic():
+                    self.save(model, list(rows(chunk, start, stop)))
+
+                self.progress(table, stop, total)
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, models.Collection, models.Link]):
+                cursor.execute(sql)
+
+    def save(self, model: type[Model], rows: list[dict]) -> None:
+        through = models.Link.collections.through
+        relations = [
+            {"link_id": row["id"], "collection_id": collection_id}
+            for row in rows for collection_id in row.pop("collection_ids", ())
+        ]
+
+        if self.method == "copy":
+            copy_rows(model, rows)
+            copy_rows(through, relations)
+        else:
+            with keep_created_in(model):
+                model.objects.bulk_create([model(**row) for row in rows], batch_size=1000)
+
+            through.objects.bulk_create([through(**row) for row in relations], batch_size=1000)
+
+
+@contextlib.contextmanager
+def keep_created_in(model: type[Model]):
+    """Save the generated created_in instead of the current time of auto_now_add"""
+
+    field = model._meta.get_field("created_in")
+    field.auto_now_add = False
+
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def format_copy_value(value) -> str:
+    """A value in the COPY text format"""
+
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def copy_rows(model: type[Model], rows: list[dict]) -> None:
+    """Insert rows with COPY FROM STDIN of Postgres, the fields missing from a row get their defaults"""
+
+    if not rows:
+        return
+
+    fields = [field for field in model._meta.concrete_fields if field.attname in rows[0] or not field.primary_key]
+    defaults = {field.attname: field.get_default() for field in fields if field.attname not in rows[0]}
+    buffer = io.StringIO()
+
+    for row in rows:
+        row = {**defaults, **row}
+        buffer.write("\t".join(format_copy_value(row[field.attname]) for field in fields) + "\n")
+
+    buffer.seek(0)
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN",
+                                  buffer)
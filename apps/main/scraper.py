@@ -0,0 +1,395 @@
+import os
+import time
+import codecs
+import asyncio
+import threading
+import contextlib
+
+from collections import OrderedDict
+from typing import AsyncIterator, Iterator
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .metadata_parser import HeadMetadataParser
+from .circuit_breaker import circuit_breaker
+from config import settings
+
+
+class ScrapingError(Exception):
+    """The link page could not be fetched"""
+
+    def __init__(self, url: str, reason: str, status: int | None = None):
+        super().__init__(f"{url}: {reason}")
+        self.url = url
+        self.reason = reason
+        self.status = status
+
+
+class CircuitOpenError(ScrapingError):
+    """The host of the link has failed too often, the request was not sent"""
+
+    def __init__(self, url: str, retry_after: float):
+        super().__init__(url, "The site is not responding, try again later")
+        self.retry_after = retry_after
+
+
+def get_host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def get_encoding(charset: str | None) -> str:
+    """Page encoding from the Content-Type charset, utf-8 if it is missing or unknown"""
+
+    try:
+        return codecs.lookup(charset).name if charset else "utf-8"
+    except LookupError:
+        return "utf-8"
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average and bursts of up to `burst` requests"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostLimit:
+    """Politeness limits of a single host"""
+
+    def __init__(self):
+        self.semaphore = asyncio.Semaphore(settings.SCRAPER_SETTINGS["MAX_PER_HOST"])
+        self.bucket = TokenBucket(settings.SCRAPER_SETTINGS["HOST_RATE"], settings.SCRAPER_SETTINGS["HOST_BURST"])
+        # Requests holding or waiting for a slot of the host, the limits of an idle host can be forgotten
+        self.active = 0
+
+
+class Fetcher:
+    """
+    Downloads link pages on a background event loop of the current process.
+
+    The loop keeps one aiohttp session, so keep-alive connections are pooled per host and reused
+    between requests. Every host has a concurrency cap and a token bucket rate limit, the limits of
+    the least recently used idle hosts are forgotten when there are more than MAX_HOSTS of them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._session = None
+        self._semaphore = None
+        self._hosts = OrderedDict()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+            "short_circuited": 0,
+        }
+
+    def get_stats(self) -> dict:
+        """Connection reuse, queue wait and circuit breaker counters of this process"""
+
+        stats = dict(self.stats)
+        connections = stats["connections_created"] + stats["connections_reused"]
+        stats["connection_reuse_ratio"] = round(stats["connections_reused"] / connections, 4) if connections else None
+        stats["queue_wait_avg"] = stats["queue_wait_total"] / stats["requests"] if stats["requests"] else None
+        stats["hosts"] = len(self._hosts)
+        return stats
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background loop on the first use, and again in a forked worker process"""
+
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._loop = asyncio.new_event_loop()
+                    self._session = None
+                    self._hosts = OrderedDict()
+                    threading.Thread(target=self._loop.run_forever, name="scraper", daemon=True).start()
+                    self._pid = os.getpid()
+
+        return self._loop
+
+    def run(self, coroutine):
+        """Run a coroutine on the background loop and wait for its result"""
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.get_loop()).result()
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(self._on_connection_create)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+
+            connector = aiohttp.TCPConnector(
+                limit=settings.SCRAPER_SETTINGS["MAX_CONCURRENCY"],
+                limit_per_host=settings.SCRAPER_SETTINGS["MAX_PER_HOST"],
+                keepalive_timeout=settings.SCRAPER_SETTINGS["KEEPALIVE_TIMEOUT"],
+            )
+            self._semaphore = asyncio.Semaphore(settings.SCRAPER_SETTINGS["MAX_CONCURRENCY"])
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"User-Agent": settings.SCRAPER_SETTINGS["USER_AGENT"]},
+                trace_configs=[trace_config],
+            )
+
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled connections and forget the host limits"""
+
+        session, self._session, self._hosts = self._session, None, OrderedDict()
+
+        if session is not None:
+            await session.close()
+
+    async def _on_connection_create(self, session, context, params) -> None:
+        self.stats["connections_created"] += 1
+
+    async def _on_connection_reuse(self, session, context, params) -> None:
+        self.stats["connections_reused"] += 1
+
+    def get_host_limit(self, host: str) -> HostLimit:
+        """Limits of the host, the least recently used idle hosts are forgotten to keep at most MAX_HOSTS"""
+
+        host_limit = self._hosts.get(host)
+
+        if host_limit is not None:
+            self._hosts.move_to_end(host)
+            return host_limit
+
+        excess = len(self._hosts) + 1 - settings.SCRAPER_SETTINGS["MAX_HOSTS"]
+
+        if excess > 0:
+            for idle_host in [name for name, limit in self._hosts.items() if not limit.active][:excess]:
+                del self._hosts[idle_host]
+
+        host_limit = self._hosts[host] = HostLimit()
+        return host_limit
+
+    @contextlib.asynccontextmanager
+    async def limit(self, url: str):
+        """Wait for a free slot of the host, a token of its bucket and a free global slot"""
+
+        host_limit = self.get_host_limit(get_host(url))
+        host_limit.active += 1
+        start = time.monotonic()
+
+        try:
+            async with host_limit.semaphore:
+                await host_limit.bucket.acquire()
+
+                async with self._semaphore:
+                    wait = time.monotonic() - start
+                    self.stats["requests"] += 1
+                    self.stats["queue_wait_total"] += wait
+                    self.stats["queue_wait_max"] = max(self.stats["queue_wait_max"], wait)
+                    yield
+        finally:
+            host_limit.active -= 1
+
+    async def check_circuit(self, url: str) -> None:
+        """Short-circuit a request to a host with an open circuit"""
+
+        retry_after = await asyncio.to_thread(circuit_breaker.get_retry_after, get_host(url))
+
+        if retry_after is not None:
+            self.stats["short_circuited"] += 1
+            raise CircuitOpenError(url, retry_after)
+
+    @contextlib.asynccontextmanager
+    async def guard(self, url: str):
+        """
+        Wait for the limits of the host and record the outcome of the request.
+        A host with an open circuit fails at once without waiting for its limits, and the circuit is checked again
+        after the wait, as it could have opened meanwhile.
+        """
+
+        await self.check_circuit(url)
+
+        async with self.limit(url):
+            await self.check_circuit(url)
+
+            try:
+                yield
+            except ScrapingError as e:
+                if circuit_breaker.is_failure(e.status):
+                    await asyncio.to_thread(circuit_breaker.record_failure, get_host(url))
+                raise
+            else:
+                await asyncio.to_thread(circuit_breaker.record_success, get_host(url))
+
+    async def fetch_metadata(self, url: str) -> dict:
+        """
+        Download the <head> of a link page and get its metadata.
+        The download stops at the end of the <head> or after MAX_PAGE_BYTES.
+        """
+
+        metadata, _ = await self.fetch_head(url)
+        return metadata
+
+    async def fetch_head(self, url: str, etag: str = "", last_modified: str = "") -> tuple[dict | None, dict]:
+        """
+        Get the metadata of a link page and its ETag/Last-Modified validators.
+        With validators the request is conditional, the metadata is None if the page has not been modified.
+        """
+
+        session = self.get_session()
+        timeout = aiohttp.ClientTimeout(total=settings.SCRAPER_SETTINGS["TIMEOUT"])
+        headers = {}
+
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async with self.guard(url):
+            try:
+                async with session.get(url, headers=headers, timeout=timeout) as response:
+                    validators = {
+                        "etag": response.headers.get("ETag", etag),
+                        "last_modified": response.headers.get("Last-Modified", last_modified),
+                    }
+
+                    if response.status == 304:
+                        return None, validators
+
+                    if response.status >= 400:
+                        raise ScrapingError(url, response.reason, response.status)
+
+                    parser = HeadMetadataParser(get_encoding(response.charset))
+                    read = 0
+
+                    async for chunk in response.content.iter_chunked(settings.SCRAPER_SETTINGS["CHUNK_SIZE"]):
+                        parser.feed_bytes(chunk)
+                        read += len(chunk)
+
+                        if parser.done or read >= settings.SCRAPER_SETTINGS["MAX_PAGE_BYTES"]:
+                            break
+
+                    # A connection goes back to the pool only when the body has been read to the end
+                    if response.content_length is not None and \
+                            response.content_length - read <= settings.SCRAPER_SETTINGS["DRAIN_BYTES"]:
+                        await response.content.read()
+            except asyncio.TimeoutError:
+                raise ScrapingError(url, "Timed out")
+            except aiohttp.ClientError as e:
+                raise ScrapingError(url, str(e) or e.__class__.__name__)
+
+        return parser.get_metadata(url), validators
+
+    async def fetch_bytes(self, url: str, max_bytes: int) -> bytes:
+        """Download a whole file, which must be no larger than `max_bytes`"""
+
+        session = self.get_session()
+        timeout = aiohttp.ClientTimeout(total=settings.SCRAPER_SETTINGS["TIMEOUT"])
+        content = bytearray()
+
+        async with self.guard(url):
+            try:
+                async with session.get(url, timeout=timeout) as response:
+                    if response.status >= 400:
+                        raise ScrapingError(url, response.reason, response.status)
+
+                    if response.content_length is not None and response.content_length > max_bytes:
+                        raise ScrapingError(url, "File is too large")
+
+                    async for chunk in response.content.iter_chunked(settings.SCRAPER_SETTINGS["CHUNK_SIZE"]):
+                        content += chunk
+
+                        if len(content) > max_bytes:
+                            raise ScrapingError(url, "File is too large")
+            except asyncio.TimeoutError:
+                raise ScrapingError(url, "Timed out")
+            except aiohttp.ClientError as e:
+                raise ScrapingError(url, str(e) or e.__class__.__name__)
+
+        return bytes(content)
+
+    async def fetch_many_metadata(self, urls: list[str]) -> list[dict | Exception]:
+        """Get metadata of several links at once, keeping the order of the links"""
+
+        return await asyncio.gather(*(self.fetch_metadata(url) for url in urls), return_exceptions=True)
+
+    async def iter_fetch_metadata(self, urls: list[str]) -> AsyncIterator[tuple[int, dict | Exception]]:
+        """Yield (index, metadata) pairs of several links in the order the pages are downloaded"""
+
+        async def fetch(index: int, url: str) -> tuple[int, dict | Exception]:
+            try:
+                return index, await self.fetch_metadata(url)
+            except Exception as e:
+                return index, e
+
+        tasks = [asyncio.ensure_future(fetch(i, url)) for i, url in enumerate(urls)]
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+fetcher = Fetcher()
+
+
+def get_many_metadata(urls: list[str]) -> list[dict | Exception]:
+    """Synchronous entry point to Fetcher.fetch_many_metadata"""
+
+    if not urls:
+        return []
+
+    return fetcher.run(fetcher.fetch_many_metadata(urls))
+
+
+def get_bytes(url: str, max_bytes: int) -> bytes:
+    """Synchronous entry point to Fetcher.fetch_bytes"""
+
+    return fetcher.run(fetcher.fetch_bytes(url, max_bytes))
+
+
+def iter_many_metadata(urls: list[str]) -> Iterator[tuple[int, dict | Exception]]:
+    """Synchronous entry point to Fetcher.iter_fetch_metadata"""
+
+    if not urls:
+        return
+
+    async def get_next(pages):
+        return await anext(pages)
+
+    async def close(pages):
+        await pages.aclose()
+
+    pages = fetcher.iter_fetch_metadata(urls)
+
+    try:
+        while True:
+            try:
+                yield fetcher.run(get_next(pages))
+            except StopAsyncIteration:
+                break
+    finally:
+        fetcher.run(close(pages))
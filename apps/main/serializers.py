@@ -1,7 +1,21 @@
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
-from . import models
+from . import models, services, images
+from .fieldsets import SparseFieldsetSerializerMixin
 from apps.user.models import User
+from config import settings
+
+
+class ThumbnailsField(serializers.ReadOnlyField):
+    """URLs of the link image thumbnails by size and format"""
+
+    # The representation of the value for the row reader
+    row_representation = staticmethod(images.get_thumbnail_urls)
+
+    def to_representation(self, value: dict) -> dict:
+        return images.get_thumbnail_urls(value, self.context.get("request"))
 
 
 class BaseCollectionSerializer(serializers.ModelSerializer):
@@ -15,9 +29,11 @@ class BaseCollectionSerializer(serializers.ModelSerializer):
 class BaseLinkSerializer(serializers.ModelSerializer):
     """Base link serializer"""
 
+    thumbnails = ThumbnailsField()
+
     class Meta:
         model = models.Link
-        fields = ("id", "title", "description", "link", "image", "type_of_link", 
+        fields = ("id", "title", "description", "link", "image", "thumbnails", "type_of_link", 
                   "created_in", "updated_in")
 
 
@@ -35,17 +51,62 @@ class CreateLinkSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Link
         fields = ["link"]
+        extra_kwargs = {"link": {"validators": []}}
+
+    def validate_link(self, value: str) -> str:
+        """Reject a link that is already saved, without scraping it, with the indexes of both columns"""
+
+        canonical_link = services.canonicalize_url(value)
+
+        # The query of the canonical form is percent-encoded again and may be longer than the link
+        if not models.fits_columns(models.Link, canonical_link=canonical_link):
+            raise serializers.ValidationError(_("The link is too long."))
+
+        if models.Link.objects.filter(Q(canonical_link=canonical_link) | Q(link=value)).exists():
+            raise serializers.ValidationError(_("Link with this link already exists."))
+
+        return value
+
+
+class BulkCreateLinkSerializer(serializers.Serializer):
+    """Bulk create links serializer"""
+
+    links = serializers.ListField(child=serializers.CharField(max_length=200), allow_empty=False,
+                                  max_length=settings.LINK_SETTINGS["BULK_MAX_LINKS"])
+    collection = serializers.PrimaryKeyRelatedField(queryset=models.Collection.objects.all(), required=False, 
+                                                    allow_null=True)
+
+    def validate_collection(self, value: models.Collection | None) -> models.Collection | None:
+        if value is not None and value.user_id_id != self.context["request"].user.id:
+            raise serializers.ValidationError(_("You can only add links to your own collections."))
+
+        return value
+
+
+class PendingLinkSerializer(serializers.ModelSerializer):
+    """Pending link serializer"""
+
+    status_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.Link
+        fields = ("id", "link", "status", "status_url")
+
+    def get_status_url(self, instance) -> str:
+        return self.context["request"].build_absolute_uri(instance.get_absolute_url())
 
 
-class LinkSerializer(serializers.ModelSerializer):
+class LinkSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Link serializer"""
 
     collections = BaseCollectionSerializer(many=True)
+    thumbnails = ThumbnailsField()
 
     class Meta:
         model = models.Link
-        fields = ("id", "title", "description", "link", "image", "type_of_link", 
+        fields = ("id", "title", "description", "link", "image", "thumbnails", "type_of_link", "status",
                   "created_in", "updated_in", "collections")
+        expandable_fields = ("collections",)
 
 
 class UpdateLinkSerializer(serializers.ModelSerializer):
@@ -56,14 +117,20 @@ class UpdateLinkSerializer(serializers.ModelSerializer):
         fields = ["title", "description", "image", "collections"]
 
 
-class CollectionSerializer(serializers.ModelSerializer):
-    """Collection serializer"""
+class CollectionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Collection serializer with the most recent links, all of them are at /collections/<id>/links/"""
 
-    links = BaseLinkSerializer(many=True)
+    link_count = serializers.IntegerField(read_only=True)
+    links = BaseLinkSerializer(many=True, source="recent_links")
 
     class Meta:
         model = models.Collection
-        fields = ("id", "name", "description", "created_in", "updated_in", "links")
+        fields = ("id", "name", "description", "created_in", "updated_in", "link_count", "links")
+        expandable_fields = ("links",)
+        annotations = {"link_count": models.get_link_count()}
+        nested_slices = {
+            "recent_links": ("links", ("-created_in", "-id"), settings.LINK_SETTINGS["COLLECTION_RECENT_LINKS"]),
+        }
 
 
 class CreateCollectionSerializer(serializers.ModelSerializer):
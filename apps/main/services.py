@@ -1,7 +1,13 @@
-import opengraph_py3
+from typing import Iterator
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 from django.db import models
 
+from . import scraper
+from apps.cache import TwoTierCache
+from config import settings
+
+
 class TypeOfLink(models.TextChoices):
     """Choose time"""
 
@@ -12,6 +18,46 @@ class TypeOfLink(models.TextChoices):
     VIDEO = "video"
 
 
+class LinkStatus(models.TextChoices):
+    """Link metadata enrichment state"""
+
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+
+metadata_cache = TwoTierCache(
+    prefix="link-metadata",
+    local_size=settings.SCRAPER_SETTINGS["CACHE_LOCAL_SIZE"],
+    local_ttl=settings.SCRAPER_SETTINGS["CACHE_LOCAL_TTL"],
+)
+
+
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "yclid", "msclkid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl"}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a link so that the same page always has the same key:
+    lowercase scheme and host, no default port, fragment, trailing slash and tracking params, sorted query.
+    """
+
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.hostname or ""
+
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        netloc = f"{netloc}:{parts.port}"
+
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.startswith("utm_") and key not in TRACKING_PARAMS
+    )
+
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
 def get_title(data: dict) -> str:
     """Get title from dict"""
 
@@ -32,11 +78,9 @@ def get_type_of_list(data: dict) -> str:
     return TypeOfLink.WEBSITE
 
 
-def get_dict_with_data_from_link(link: str) -> dict:
-    """Get a dict with data from a link"""
+def build_dict_with_data(data: dict) -> dict:
+    """Build a dict with link data from the page metadata"""
 
-    data = opengraph_py3.OpenGraph(url=link, scrape=True)
-    
     result = {
         "title": get_title(data),
         "description": data["description"],
@@ -48,6 +92,86 @@ def get_dict_with_data_from_link(link: str) -> dict:
     return result
 
 
+def get_fallback_dict(link: str) -> dict:
+    """Data of a link whose page can not be scraped now"""
+
+    return {
+        "title": urlsplit(link).hostname or link,
+        "description": "",
+        "image": "",
+        "link": link,
+        "type_of_link": TypeOfLink.WEBSITE,
+    }
+
+
+def get_dict_with_data_from_link(link: str) -> dict:
+    """Get a dict with data from a link"""
+
+    return get_dicts_with_data_from_links([link])[0]
+
+
+def get_dicts_with_data_from_links(links: list[str], return_exceptions: bool = False) -> list[dict | Exception]:
+    """
+    Get dicts with data from several links.
+    The links are looked up in the metadata cache first, the rest of the pages are downloaded concurrently.
+    The links of a host with an open circuit get fallback data if CIRCUIT_FALLBACK is on.
+    """
+
+    result = [None] * len(links)
+
+    for i, data in iter_dicts_with_data_from_links(links):
+        if isinstance(data, Exception) and not return_exceptions:
+            raise data
+
+        result[i] = data
+
+    return result
+
+
+def iter_dicts_with_data_from_links(links: list[str]) -> Iterator[tuple[int, dict | Exception]]:
+    """Yield (index, dict with data) pairs of several links as soon as each of them is ready"""
+
+    keys = [canonicalize_url(link) for link in links]
+    missed = []
+
+    for i, key in enumerate(keys):
+        data = metadata_cache.get(key)
+
+        if data is None:
+            missed.append(i)
+        elif "error" in data:
+            yield i, scraper.ScrapingError(links[i], data["error"], data["status"])
+        else:
+            yield i, data
+
+    for j, data in scraper.iter_many_metadata([links[i] for i in missed]):
+        i = missed[j]
+
+        if isinstance(data, scraper.CircuitOpenError):
+            # The page has not been requested, there is nothing to cache
+            yield i, get_fallback_dict(links[i]) if settings.SCRAPER_SETTINGS["CIRCUIT_FALLBACK"] else data
+            continue
+
+        if not isinstance(data, Exception):
+            try:
+                data = build_dict_with_data(data)
+            except KeyError as e:
+                data = e
+
+        cache_data_from_link(keys[i], data)
+        yield i, data
+
+
+def cache_data_from_link(key: str, data: dict | Exception) -> None:
+    """Save a scraping result to the metadata cache, failed pages are remembered for a shorter time"""
+
+    if isinstance(data, scraper.ScrapingError):
+        value = {"error": data.reason, "status": data.status}
+        metadata_cache.set(key, value, settings.SCRAPER_SETTINGS["CACHE_NEGATIVE_TTL"])
+    elif not isinstance(data, Exception):
+        metadata_cache.set(key, data, settings.SCRAPER_SETTINGS["CACHE_TTL"])
+
+
 def add_data_by_link(serializer, user) -> dict:
     """Get info by a link and add they to the serializer data"""
 
@@ -0,0 +1,19 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from . import models
+
+
+@receiver(m2m_changed, sender=models.Link.collections.through)
+def touch_memberships(sender, instance, action: str, reverse: bool, model, pk_set: set | None, **kwargs) -> None:
+    """A link added to or removed from a collection changes the links and the collections on both sides"""
+
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if action == "pre_clear":
+        # The cleared relations are only known before the clear
+        pk_set = model.objects.filter(**{"collections" if reverse else "links": instance}).values_list("id", flat=True)
+
+    models.touch(model, list(pk_set))
+    models.touch(type(instance), [instance.pk])
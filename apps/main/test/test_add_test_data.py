@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from apps.main import models, add_test_data
+from apps.main.celery_tasks import tasks
+from apps.user import models as user_models, services as user_services
+from apps.user.auth import models as auth_models
+
+
+class TestAddTestData(APITestCase):
+    """Testing the add_test_data function"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    def setUp(self) -> None:
+        patcher = mock.patch.object(tasks.process_link_image, "delay")
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_add_test_data(self):
+        with self.assertNumQueries(14):
+            counts = add_test_data.add_test_data()
+
+        assert {"users": 11, "collections": 11, "links": 25} == counts, counts
+
+        user = user_models.User.objects.get(username="string1")
+        assert user_services.validate_password("stringstring1", user.hashed_password), "the hash must be valid"
+        assert auth_models.JWTToken.objects.filter(user=user).exists(), "a test user must have a token"
+
+        links = models.Link.objects.filter(user_id__username__startswith="string").prefetch_related("collections")
+        assert 25 == len(links), len(links)
+        assert all(1 == len(link.collections.all()) for link in links), "every link must be in a collection"
+        assert all(link.canonical_link for link in links), "the canonical links must be set"
+        assert 24 == self.delay.call_count, "every link with an image must get thumbnails"
+
+    def test_add_test_data_twice(self):
+        add_test_data.add_test_data()
+
+        with self.assertLogs(level="WARNING"):
+            counts = add_test_data.add_test_data()
+
+        assert {"users": 11, "collections": 11, "links": 0} == counts, counts
+        assert 11 == auth_models.JWTToken.objects.filter(user__username__startswith="string").count()
+
+    def test_test_data_fits_columns(self):
+        """Testing the bundled test data fits the columns, the databases other than SQLite enforce the lengths"""
+
+        test_data = add_test_data.load_test_data()
+
+        for model, rows in ((user_models.User, test_data["users"]), (models.Link, test_data["links"])):
+            for row in rows:
+                assert row == models.fit_columns(model, **row), row
+
+    def test_long_link(self):
+        links_data = add_test_data.load_test_data()["links"][:2]
+        links_data[0] = {**links_data[0], "link": f"https://habr.com/{'a' * 200}"}
+        links_data[1] = {**links_data[1], "title": "a" * 300}
+        collections = [models.Collection.objects.create(name="Long", user_id_id=1)]
+
+        with self.assertLogs(level="WARNING"):
+            links = add_test_data.add_links(links_data, collections)
+
+        assert [links_data[1]["link"]] == [link.link for link in links], links
+        assert 250 == len(links[0].title), len(links[0].title)
+
+    def test_command(self):
+        call_command("add_test_data", stdout=mock.Mock())
+
+        assert 25 == models.Link.objects.filter(user_id__username__startswith="string").count()
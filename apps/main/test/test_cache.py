@@ -0,0 +1,90 @@
+import pytest
+
+from unittest import mock
+
+from django.test import override_settings
+
+from apps.cache import LRUCache, TwoTierCache
+from apps.main import scraper, services
+
+
+locmem_caches = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@pytest.mark.parametrize(
+    "url, output",
+    [
+        ("HTTPS://GitHub.com", "https://github.com/"),
+        ("https://github.com:443/Lanterman#readme", "https://github.com/Lanterman"),
+        ("http://127.0.0.1:8000/links/?page=2", "http://127.0.0.1:8000/links?page=2"),
+        ("https://www.youtube.com/watch?v=w8rRhAup4kg&utm_source=tg&fbclid=1", "https://www.youtube.com/watch?v=w8rRhAup4kg"),
+        ("https://habr.com/ru/articles/?b=2&a=1&a=0", "https://habr.com/ru/articles?a=0&a=1&b=2"),
+    ]
+)
+def test_canonicalize_url(url: str, output: str):
+    """Testing the canonicalize_url function"""
+
+    response = services.canonicalize_url(url)
+    assert output == response, response
+
+
+def test_lru_cache():
+    """Testing the LRUCache class"""
+
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("first", 1)
+    cache.set("second", 2)
+    assert 1 == cache.get("first")
+
+    cache.set("third", 3)
+    assert cache.get("second") is None, "the least recently used key must be evicted"
+    assert 1 == cache.get("first")
+    assert 3 == cache.get("third")
+
+    cache.set("expired", 4, ttl=-1)
+    assert cache.get("expired") is None
+
+
+@override_settings(CACHES=locmem_caches)
+def test_two_tier_cache():
+    """Testing the TwoTierCache class"""
+
+    cache = TwoTierCache(prefix="test", local_size=10, local_ttl=60)
+    assert cache.get("key") is None
+
+    cache.set("key", {"title": "Title"}, ttl=60)
+    assert {"title": "Title"} == cache.get("key")
+
+    cache.local.clear()
+    assert {"title": "Title"} == cache.get("key")
+    assert {"title": "Title"} == cache.get("key")
+
+    stats = cache.stats()
+    assert 2 == stats["local_hits"], stats
+    assert 1 == stats["shared_hits"], stats
+    assert 1 == stats["misses"], stats
+
+    cache.delete("key")
+    assert cache.get("key") is None
+
+
+@override_settings(CACHES=locmem_caches)
+def test_get_dicts_with_data_from_links_cache():
+    """Testing the get_dicts_with_data_from_links function uses the metadata cache"""
+
+    page = {"title": "GitHub", "description": "GitHub", "image": "", "url": "https://github.com/", "type": "website"}
+    error = scraper.ScrapingError("https://github.com/private", "Forbidden", 403)
+    links = ["https://github.com", "https://GITHUB.com/", "https://github.com/private"]
+    services.metadata_cache.local.clear()
+
+    pages = [enumerate([page, page, error]), iter([])]
+
+    with mock.patch.object(scraper, "iter_many_metadata", side_effect=pages) as scrape:
+        first = services.get_dicts_with_data_from_links(links, return_exceptions=True)
+        second = services.get_dicts_with_data_from_links(links, return_exceptions=True)
+
+    assert 2 == scrape.call_count, scrape.call_count
+    assert [] == scrape.call_args.args[0], "the second call must not download anything"
+    assert first[0] == second[0] == second[1], second
+    assert isinstance(second[2], scraper.ScrapingError), second[2]
+    assert 403 == second[2].status, second[2].status
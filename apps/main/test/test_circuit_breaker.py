@@ -0,0 +1,117 @@
+import pytest
+
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import override_settings
+
+from apps.main import scraper, services
+from apps.main.circuit_breaker import HostCircuitBreaker
+from benchmarks.stand_in import StandInServer
+from config import settings
+
+
+locmem_caches = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+circuit_settings = {"CIRCUIT_FAILURE_THRESHOLD": 3, "CIRCUIT_FAILURE_WINDOW": 60, "CIRCUIT_COOL_DOWN": 300}
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    with override_settings(CACHES=locmem_caches), mock.patch.dict(settings.SCRAPER_SETTINGS, circuit_settings):
+        caches["default"].clear()
+        yield caches["default"]
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StandInServer() as server:
+        yield server
+
+
+def test_circuit_opens_after_failures():
+    """Testing the HostCircuitBreaker class opens the circuit after CIRCUIT_FAILURE_THRESHOLD failures"""
+
+    breaker = HostCircuitBreaker()
+
+    for _ in range(2):
+        breaker.record_failure("habr.com")
+
+    assert breaker.get_retry_after("habr.com") is None, "the circuit must be closed below the threshold"
+
+    breaker.record_failure("habr.com")
+    assert 299 < breaker.get_retry_after("habr.com") <= 300, "the circuit must be open for the cool-down"
+    assert breaker.get_retry_after("github.com") is None, "other hosts must not be affected"
+
+    breaker.record_success("habr.com")
+    assert breaker.get_retry_after("habr.com") is not None, "a request sent before the circuit opened can't close it"
+
+
+def test_half_open_circuit():
+    """Testing the HostCircuitBreaker class lets a single probe through after the cool-down"""
+
+    breaker = HostCircuitBreaker()
+
+    for _ in range(3):
+        breaker.record_failure("habr.com")
+
+    with mock.patch.dict(settings.SCRAPER_SETTINGS, {"CIRCUIT_COOL_DOWN": 0}):
+        assert breaker.get_retry_after("habr.com") is None, "the first request after the cool-down is the probe"
+        assert breaker.get_retry_after("habr.com") is not None, "the other requests must wait for the probe"
+
+        breaker.record_failure("habr.com")
+        assert breaker.get_retry_after("habr.com") is None, "the circuit must be open again for a new cool-down"
+
+        breaker.record_success("habr.com")
+
+    assert breaker.get_retry_after("habr.com") is None, "the successful probe must close the circuit"
+
+
+def test_open_circuit_short_circuits_scraping(server: StandInServer):
+    """Testing the scraper does not request a host with an open circuit"""
+
+    for i in range(3):
+        with pytest.raises(scraper.ScrapingError):
+            services.get_dict_with_data_from_link(f"{server.url}/blocked-{i}?status=429")
+
+    scraper.fetcher.reset_stats()
+
+    with pytest.raises(scraper.CircuitOpenError):
+        services.get_dict_with_data_from_link(f"{server.url}/page")
+
+    stats = scraper.fetcher.get_stats()
+    assert 1 == stats["short_circuited"], stats
+    assert 0 == stats["requests"], "an open circuit must fail without waiting for the limits of the host"
+
+    with mock.patch.dict(settings.SCRAPER_SETTINGS, {"CIRCUIT_FALLBACK": True}):
+        response = services.get_dict_with_data_from_link(f"{server.url}/page")
+
+    assert "127.0.0.1" == response["title"], response
+    assert f"{server.url}/page" == response["link"], response
+    assert services.TypeOfLink.WEBSITE == response["type_of_link"], response
+
+
+def test_circuit_opened_while_waiting(server: StandInServer):
+    """Testing a request is short-circuited when the circuit opens while it waits for the limits of the host"""
+
+    scraper.fetcher.reset_stats()
+
+    with mock.patch.object(scraper.circuit_breaker, "get_retry_after", side_effect=[None, 30.0]), \
+            mock.patch.object(scraper.circuit_breaker, "record_failure") as record_failure:
+        with pytest.raises(scraper.CircuitOpenError):
+            scraper.fetcher.run(scraper.fetcher.fetch_metadata(f"{server.url}/opened-meanwhile"))
+
+    stats = scraper.fetcher.get_stats()
+    assert 1 == stats["requests"], stats
+    assert 1 == stats["short_circuited"], stats
+    record_failure.assert_not_called()
+
+
+def test_not_found_is_not_a_failure(server: StandInServer):
+    """Testing a missing page does not open the circuit of its host"""
+
+    for i in range(5):
+        with pytest.raises(scraper.ScrapingError):
+            services.get_dict_with_data_from_link(f"{server.url}/missing-{i}?status=404")
+
+    response = services.get_dict_with_data_from_link(f"{server.url}/found")
+    assert "Page /found" == response["title"], response
@@ -0,0 +1,117 @@
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.main import models
+from apps.user import models as user_models
+
+
+class TestConditionalGet(APITestCase):
+    """Testing the ETag and Last-Modified of the link and the collection endpoints"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = user_models.User.objects.get(id=1)
+        cls.collection = models.Collection.objects.create(name="Collection", description="", user_id=cls.user)
+        cls.link = models.Link.objects.create(title="Link", description="", link="https://example.com/",
+                                              user_id=cls.user)
+        cls.other_link = models.Link.objects.create(title="Other", description="", link="https://example.com/other",
+                                                    user_id=cls.user)
+        cls.link.collections.add(cls.collection)
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(self.user)
+
+    def get_etag(self, path: str) -> str:
+        response = self.client.get(path)
+        assert 200 == response.status_code, response.data
+        return response.headers["ETag"]
+
+    def assert_not_modified(self, path: str, etag: str) -> None:
+        with self.assertNumQueries(1):
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+
+        assert 304 == response.status_code, response.status_code
+        assert b"" == response.content, response.content
+        assert etag == response.headers["ETag"], response.headers
+
+    def test_detail(self):
+        path = reverse("link-detail", kwargs={"id": self.link.id})
+        response = self.client.get(path)
+
+        assert response.headers["ETag"].startswith('W/"'), response.headers["ETag"]
+        assert "Last-Modified" in response.headers, response.headers
+        self.assert_not_modified(path, response.headers["ETag"])
+
+        response = self.client.get(path, HTTP_IF_MODIFIED_SINCE=response.headers["Last-Modified"])
+        assert 304 == response.status_code, response.status_code
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH='W/"other"')
+        assert 200 == response.status_code, response.status_code
+
+    def test_detail_changes(self):
+        link_path = reverse("link-detail", kwargs={"id": self.link.id})
+        collection_path = reverse("collection-detail", kwargs={"id": self.collection.id})
+        etags = {self.get_etag(link_path), self.get_etag(collection_path)}
+
+        self.client.patch(link_path, {"title": "New title"})
+        etags |= {self.get_etag(link_path), self.get_etag(collection_path)}
+        assert 4 == len(etags), "an edit of the link changes both representations"
+
+        self.collection.name = "New name"
+        self.collection.save()
+        etags |= {self.get_etag(link_path), self.get_etag(collection_path)}
+        assert 6 == len(etags), "an edit of the collection changes both representations"
+
+        self.collection.links.add(self.other_link)
+        etags.add(self.get_etag(collection_path))
+        assert 7 == len(etags), "a new link of the collection changes its representation"
+
+        self.link.delete()
+        etags.add(self.get_etag(collection_path))
+        assert 8 == len(etags), "a deleted link of the collection changes its representation"
+
+    def test_list(self):
+        path = f"{reverse('collection-list')}?cursor="
+        etag = self.get_etag(path)
+
+        # The ids of the page and the aggregate of their links
+        with self.assertNumQueries(2):
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+
+        assert 304 == response.status_code, response.status_code
+        assert "Last-Modified" not in response.headers, response.headers
+
+        link_path = f"{reverse('link-list')}?cursor="
+        link_etag = self.get_etag(link_path)
+        self.collection.links.remove(self.link)
+        assert link_etag != self.get_etag(link_path), "a removed membership changes the collections of links"
+
+        self.collection.links.add(self.link)
+        etag, link_etag = self.get_etag(path), self.get_etag(link_path)
+        models.Link.objects.filter(id=self.other_link.id).delete()
+        assert link_etag != self.get_etag(link_path), "a deleted link changes the page of links"
+        assert etag == self.get_etag(path), "a link out of the collections does not change them"
+
+        models.Link.objects.filter(id=self.link.id).delete()
+        assert etag != self.get_etag(path), "a deleted link changes the link_count of the collections"
+
+    def test_page_number_list(self):
+        """Testing the page number lists have no validators, their count scans the table"""
+
+        response = self.client.get(reverse("link-list"))
+        assert 200 == response.status_code, response.status_code
+        assert "ETag" not in response.headers, response.headers
+
+    def test_fieldset(self):
+        path = f"{reverse('link-detail', kwargs={'id': self.link.id})}?fields=id,title"
+        etag = self.get_etag(path)
+
+        self.collection.name = "New name"
+        self.collection.save()
+        assert etag == self.get_etag(path), "the collections are not rendered"
+
+    def test_missing(self):
+        response = self.client.get(reverse("link-detail", kwargs={"id": 0}), HTTP_IF_NONE_MATCH="*")
+        assert 404 == response.status_code, response.status_code
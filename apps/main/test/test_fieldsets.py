@@ -0,0 +1,99 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.main import models
+from apps.user import models as user_models
+
+
+class TestSparseFieldsets(APITestCase):
+    """Testing the `fields` and the `expand` query parameters of the link and the collection endpoints"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = user_models.User.objects.get(id=1)
+        collections = [
+            models.Collection.objects.create(name=f"Collection {i}", description="", user_id=cls.user)
+            for i in range(3)
+        ]
+
+        for i in range(5):
+            link = models.Link.objects.create(title=f"Link {i}", description="Description",
+                                              link=f"https://example.com/{i}", user_id=cls.user)
+            link.collections.set(collections[:i % 3 + 1])
+
+        cls.link = link
+        cls.collection = collections[0]
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(self.user)
+
+    def get(self, url: str, params: dict) -> tuple:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+
+        assert 200 == response.status_code, response.data
+        return response, [query["sql"] for query in queries]
+
+    def test_default(self):
+        response, _ = self.get(reverse("link-detail", kwargs={"id": self.link.id}), {})
+        assert "collections" in response.data, response.data
+        assert "thumbnails" in response.data, response.data
+
+    def test_fields(self):
+        response, queries = self.get(reverse("link-list"), {"fields": "id,title"})
+
+        for link in response.data["results"]:
+            assert {"id", "title"} == set(link), link
+
+        assert not any("main_collection" in query for query in queries), "the collections must not be prefetched"
+        assert not any('"description"' in query for query in queries), "the unused columns must not be loaded"
+
+    def test_fields_keyset_pagination(self):
+        response, queries = self.get(reverse("link-list"), {"fields": "title", "cursor": ""})
+
+        # The ids of the page for the ETag and the page, without the collections and the count of the pagination
+        assert 2 == len(queries), queries
+        assert not any("COUNT(" in query or '"description"' in query for query in queries), queries
+        assert {"title"} == set(response.data["results"][0]), response.data["results"][0]
+
+    def test_expand(self):
+        url = reverse("link-detail", kwargs={"id": self.link.id})
+
+        response, queries = self.get(url, {"expand": ""})
+        assert "collections" not in response.data, response.data
+        assert "title" in response.data, response.data
+        assert not any("main_collection" in query for query in queries), queries
+
+        response, _ = self.get(url, {"fields": "id,collections", "expand": "collections"})
+        assert {"id", "collections"} == set(response.data), response.data
+        assert [collection.id for collection in self.link.collections.all()] == \
+            [collection["id"] for collection in response.data["collections"]], response.data
+
+    def test_collections(self):
+        response, queries = self.get(reverse("collection-list"), {"fields": "id,name", "expand": ""})
+
+        for collection in response.data["results"]:
+            assert {"id", "name"} == set(collection), collection
+
+        assert not any("main_link" in query for query in queries), "the links must not be prefetched"
+
+        response, _ = self.get(reverse("collection-detail", kwargs={"id": self.collection.id}), {"fields": "links"})
+        assert {"links"} == set(response.data), response.data
+        assert 5 == len(response.data["links"]), response.data
+
+    def test_unknown_fields(self):
+        response = self.client.get(reverse("link-list"), {"fields": "id,secret", "expand": "user_id"})
+
+        assert 400 == response.status_code, response.data
+        assert {"fields", "expand"} == set(response.data), response.data
+
+    def test_put_method(self):
+        response = self.client.patch(f"{reverse('link-detail', kwargs={'id': self.link.id})}?fields=id",
+                                     {"title": "New title"})
+
+        assert 200 == response.status_code, response.data
+        assert "New title" == response.data["title"], response.data
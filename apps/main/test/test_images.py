@@ -0,0 +1,115 @@
+import io
+import shutil
+import tempfile
+
+import pytest
+
+from unittest import mock
+
+from PIL import Image
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from apps.main import models, serializers, images, scraper
+from apps.main.celery_tasks import tasks
+from apps.user import models as user_models
+
+
+def make_image(size: tuple[int, int], format: str = "jpeg", color: tuple = (255, 0, 0)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGBA" if len(color) == 4 else "RGB", size, color).save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def test_make_thumbnails():
+    """Testing the make_thumbnails function"""
+
+    thumbnails = images.make_thumbnails(make_image((3000, 2000)))
+
+    assert {"small", "large"} == thumbnails.keys(), thumbnails.keys()
+    assert {"webp", "jpeg"} == thumbnails["small"].keys(), thumbnails["small"].keys()
+
+    with Image.open(io.BytesIO(thumbnails["small"]["webp"])) as image:
+        assert "WEBP" == image.format, image.format
+        assert (320, 213) == image.size, image.size
+
+    with Image.open(io.BytesIO(thumbnails["large"]["jpeg"])) as image:
+        assert "JPEG" == image.format, image.format
+        assert (960, 640) == image.size, image.size
+
+
+def test_make_thumbnails_of_transparent_and_small_images():
+    """Testing the make_thumbnails function with a transparent PNG smaller than the thumbnails"""
+
+    thumbnails = images.make_thumbnails(make_image((200, 100), format="png", color=(255, 0, 0, 128)))
+
+    with Image.open(io.BytesIO(thumbnails["large"]["jpeg"])) as image:
+        assert (200, 100) == image.size, "an image must not be upscaled"
+
+    with Image.open(io.BytesIO(thumbnails["small"]["webp"])) as image:
+        assert "RGBA" == image.mode, image.mode
+
+
+def test_make_thumbnails_of_invalid_image():
+    """Testing the make_thumbnails function with content that is not an image"""
+
+    with pytest.raises(images.ImageProcessingError):
+        images.make_thumbnails(b"<html></html>")
+
+
+class TestProcessLinkImage(APITestCase):
+    """Testing the process_link_image task"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    def setUp(self) -> None:
+        self.media_root = tempfile.mkdtemp()
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+        self.user = user_models.User.objects.get(id=1)
+        self.content = make_image((1200, 630))
+
+    def create_link(self, link: str, image: str) -> models.Link:
+        return models.Link.objects.create(title="Page", description="", link=link, image=image, user_id=self.user)
+
+    def test_process_link_image(self):
+        link = self.create_link("https://habr.com/ru/articles/770554/", "https://habrastorage.org/asyncio.png")
+
+        with mock.patch.object(scraper, "get_bytes", return_value=self.content) as get_bytes:
+            tasks.process_link_image(link.id)
+
+        get_bytes.assert_called_once_with("https://habrastorage.org/asyncio.png", mock.ANY)
+        link.refresh_from_db()
+        path = link.thumbnails["small"]["webp"]
+        assert path.startswith("link/thumbnails/"), path
+        assert images.default_storage.exists(path), path
+
+        response = serializers.LinkSerializer(link).data
+        assert f"/media/{path}" == response["thumbnails"]["small"]["webp"], response["thumbnails"]
+
+    def test_same_image_is_stored_once(self):
+        first = self.create_link("https://habr.com/ru/articles/1/", "https://habrastorage.org/first.png")
+        second = self.create_link("https://habr.com/ru/articles/2/", "https://habrastorage.org/second.png")
+        third = self.create_link("https://habr.com/ru/articles/3/", "https://habrastorage.org/first.png")
+
+        with mock.patch.object(scraper, "get_bytes", return_value=self.content) as get_bytes, \
+                mock.patch.object(images, "make_thumbnails", wraps=images.make_thumbnails) as make_thumbnails:
+            for link in (first, second, third):
+                tasks.process_link_image(link.id)
+
+        assert 2 == get_bytes.call_count, "the image of the third link has been downloaded for the first one"
+        assert 1 == make_thumbnails.call_count, "the second image has the same content as the first one"
+
+        thumbnails = [link.thumbnails for link in models.Link.objects.filter(id__in=(first.id, second.id, third.id))]
+        assert thumbnails[0] == thumbnails[1] == thumbnails[2], thumbnails
+
+    def test_failed_download(self):
+        link = self.create_link("https://habr.com/ru/articles/770554/", "https://habrastorage.org/asyncio.png")
+
+        with self.assertLogs(level="WARNING"):
+            with mock.patch.object(scraper, "get_bytes", side_effect=scraper.ScrapingError(link.link, "Not Found", 404)):
+                tasks.process_link_image(link.id)
+
+        link.refresh_from_db()
+        assert {} == link.thumbnails, link.thumbnails
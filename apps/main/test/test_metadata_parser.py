@@ -0,0 +1,65 @@
+from apps.main.metadata_parser import HeadMetadataParser, parse_metadata
+
+
+page = """<html>
+<head>
+    <title>Асинхронность в Python / Хабр</title>
+    <meta name="description" content="Как устроен цикл событий">
+    <meta property="og:title" content="Асинхронность в Python">
+    <meta property="og:type" content="article">
+    <meta property="og:image" content="https://habrastorage.org/asyncio.png">
+</head>
+<body><img src="https://habrastorage.org/body.png"></body>
+</html>""".encode()
+
+
+def split(html: bytes, size: int):
+    return (html[i:i + size] for i in range(0, len(html), size))
+
+
+def test_parse_metadata():
+    """Testing the parse_metadata function, the chunks split tags and multibyte characters"""
+
+    response = parse_metadata("https://habr.com/ru/articles/770554/", split(page, 7), max_bytes=10_000)
+    assert "Асинхронность в Python" == response["title"], response
+    assert "Как устроен цикл событий" == response["description"], response
+    assert "https://habrastorage.org/asyncio.png" == response["image"], response
+    assert "article" == response["type"], response
+    assert "https://habr.com/ru/articles/770554/" == response["url"], response
+
+
+def test_parse_metadata_fallback():
+    """Testing the parse_metadata function on a page without OpenGraph tags"""
+
+    html = b"<html><head><title> Home </title><meta name='description' content='Django, API'></head></html>"
+    response = parse_metadata("https://www.django-rest-framework.org/", [html], max_bytes=10_000)
+    assert "Home" == response["title"], response
+    assert "Django, API" == response["description"], response
+    assert "" == response["image"], response
+    assert "other" == response["type"], response
+
+    response = parse_metadata("https://example.com/", [b"<html><body>Empty</body></html>"], max_bytes=10_000)
+    assert "title" not in response, response
+
+
+def test_head_metadata_parser_stops_at_head():
+    """Testing the HeadMetadataParser class stops at the end of the <head>"""
+
+    parser = HeadMetadataParser()
+    parser.feed_bytes(page[:page.index(b"</head>")])
+    assert not parser.done
+
+    parser.feed_bytes(b"</head>")
+    assert parser.done
+
+
+def test_parse_metadata_max_bytes():
+    """Testing the parse_metadata function reads no more than max_bytes"""
+
+    html = b"<html><head><title>Endless</title>" + b"<meta name='x' content='y'>" * 1000
+    chunks = split(html, 100)
+    count_chunks = -(-len(html) // 100)
+
+    response = parse_metadata("https://example.com/", chunks, max_bytes=500)
+    assert "Endless" == response["title"], response
+    assert count_chunks - 5 == len(list(chunks)), "only 5 chunks of 100 bytes must be read"
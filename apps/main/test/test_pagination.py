@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.main import models
+from apps.user import models as user_models
+
+
+class TestKeysetPagination(APITestCase):
+    """Testing the keyset pagination of the link and the collection lists"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = user_models.User.objects.get(id=1)
+        now = timezone.now()
+
+        for i in range(40):
+            link = models.Link.objects.create(title=f"Link {i}", description="", link=f"https://example.com/{i}",
+                                              user_id=cls.user)
+            # Every other pair of links has the same created_in to check the ties
+            models.Link.objects.filter(id=link.id).update(created_in=now - timedelta(minutes=i // 2))
+
+        cls.ids = list(models.Link.objects.order_by("-created_in", "-id").values_list("id", flat=True))
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(self.user)
+
+    def get_pages(self, url: str, key: str = "next") -> list[list[int]]:
+        pages = []
+
+        while url:
+            response = self.client.get(url)
+            assert 200 == response.status_code, response.data
+            pages.append([link["id"] for link in response.data["results"]])
+            url = response.data[key]
+
+        return pages
+
+    def test_pages(self):
+        # The ids of the page and the aggregate of their collections for the ETag, the page and its collections
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("link-list"), {"cursor": ""})
+
+        assert "count" not in response.data, "the keyset pagination must not count the rows"
+        assert response.data["previous"] is None, response.data["previous"]
+
+        pages = self.get_pages(f"{reverse('link-list')}?cursor=")
+
+        assert [15, 15, 10] == [len(page) for page in pages], pages
+        assert self.ids == sum(pages, []), "the pages must follow each other by (created_in, id)"
+
+    def test_previous_pages(self):
+        response = self.client.get(reverse("link-list"), {"cursor": ""})
+        response = self.client.get(response.data["next"])
+        last_page = self.client.get(response.data["next"])
+
+        pages = self.get_pages(last_page.data["previous"], key="previous")
+        assert [self.ids[15:30], self.ids[:15]] == pages, pages
+
+    def test_concurrent_inserts(self):
+        """Testing the links created between the pages do not shift the next pages"""
+
+        response = self.client.get(reverse("link-list"), {"cursor": ""})
+
+        for i in range(5):
+            models.Link.objects.create(title="New", description="", link=f"https://example.com/new/{i}",
+                                       user_id=self.user)
+
+        pages = self.get_pages(response.data["next"])
+        assert self.ids[15:] == sum(pages, []), pages
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("link-list"), {"cursor": "invalid"})
+        assert 404 == response.status_code, response.data
+
+    def test_page_number_pagination(self):
+        response = self.client.get(reverse("link-list"), {"page": 2})
+
+        assert 200 == response.status_code, response.data
+        assert 40 == response.data["count"], response.data["count"]
+        assert self.ids[15:30] == [link["id"] for link in response.data["results"]]
+
+    def test_collections(self):
+        for i in range(20):
+            models.Collection.objects.create(name=f"Collection {i}", user_id=self.user)
+
+        ids = list(models.Collection.objects.order_by("-created_in", "-id").values_list("id", flat=True))
+        pages = self.get_pages(f"{reverse('collection-list')}?cursor=")
+
+        assert ids == sum(pages, []), pages
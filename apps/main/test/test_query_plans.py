@@ -0,0 +1,95 @@
+import json
+
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from config import settings
+from apps.main import models, refresh, services
+from apps.main.scale_data import ScaleDataGenerator, START_DATE
+from apps.user.auth import models as auth_models
+from apps.user.models import User
+
+
+# A plan may read a table sequentially only if the planner expects fewer rows than this
+SEQ_SCAN_MAX_ROWS = 1000
+
+
+def iter_plan_nodes(plan: dict):
+    yield plan
+
+    for child in plan.get("Plans", ()):
+        yield from iter_plan_nodes(child)
+
+
+def get_seq_scans(queryset: QuerySet) -> list[tuple[str, int]]:
+    """The tables read sequentially by the plan of the queryset with the expected number of rows"""
+
+    plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+
+    return [
+        (node["Relation Name"], node["Plan Rows"])
+        for node in iter_plan_nodes(plan) if node["Node Type"] == "Seq Scan"
+    ]
+
+
+@skipUnless(connection.vendor == "postgresql", "The query plans are checked on Postgres only")
+class TestQueryPlans(TestCase):
+    """
+    Testing the hot querysets are served by the indexes on a seeded database.
+    A plan that reads a large table sequentially fails the test.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        ScaleDataGenerator(users=20_000, collections=20_000, links=100_000, batch_size=20_000, id_offset=1,
+                           method="copy").generate()
+
+        # A token of every user, a tenth of them expired a minute apart
+        auth_models.JWTToken.objects.bulk_create([
+            auth_models.JWTToken(access_token=f"access{i}", refresh_token=f"refresh{i}", user_id=i)
+            for i in range(1, 20_001)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {auth_models.JWTToken._meta.db_table} SET created = %s + user_id * interval '1 minute' "
+                f"WHERE user_id <= 2000",
+                [START_DATE],
+            )
+            cursor.execute("ANALYZE")
+
+    def assert_index_scan(self, queryset: QuerySet) -> None:
+        seq_scans = [(table, rows) for table, rows in get_seq_scans(queryset) if rows >= SEQ_SCAN_MAX_ROWS]
+        assert not seq_scans, f"{seq_scans}\n{queryset.explain()}"
+
+    def test_links(self):
+        self.assert_index_scan(models.Link.objects.order_by("-created_in", "-id")[:15])
+        self.assert_index_scan(models.Link.objects.filter(created_in__lt=START_DATE + timedelta(days=500))
+                               .order_by("-created_in", "-id")[:15])
+
+    def test_links_of_user(self):
+        self.assert_index_scan(models.Link.objects.filter(user_id=1).order_by("-created_in")[:15])
+
+    def test_links_of_type(self):
+        self.assert_index_scan(models.Link.objects.filter(type_of_link=services.TypeOfLink.BOOK)
+                               .order_by("-created_in")[:15])
+
+    def test_stale_links(self):
+        self.assert_index_scan(refresh.get_stale_links(settings.LINK_SETTINGS["REFRESH_BATCH_SIZE"]))
+
+    def test_collections(self):
+        self.assert_index_scan(models.Collection.objects.order_by("-created_in", "-id")[:15])
+        self.assert_index_scan(models.Collection.objects.filter(user_id=1).order_by("-created_in")[:15])
+
+    def test_users(self):
+        self.assert_index_scan(User.objects.order_by("created_in")[:10])
+
+    def test_expired_tokens(self):
+        threshold = timezone.now() - settings.JWT_SETTINGS["REFRESH_TOKEN_LIFETIME"]
+        self.assert_index_scan(auth_models.JWTToken.objects.filter(created__lt=threshold)
+                               .order_by("created", "id")[:settings.JWT_SETTINGS["PURGE_BATCH_SIZE"]])
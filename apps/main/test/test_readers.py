@@ -0,0 +1,98 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from config import settings
+from apps.main import models, readers, serializers, services
+from apps.user import models as user_models
+
+
+class TestRowReader(APITestCase):
+    """Testing the GET responses of the row reader are byte-identical to the responses of the serializers"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = user_models.User.objects.get(id=1)
+        now = timezone.now()
+        collections = [
+            models.Collection.objects.create(name=f"Collection {i}", description=f"Description {i}" * (i % 2),
+                                             user_id=cls.user, updated_in=now if i % 2 else None)
+            for i in range(4)
+        ]
+
+        for i in range(20):
+            link = models.Link.objects.create(
+                title=f"Link {i}", description="Ünïcode \"description\"", link=f"https://example.com/{i}",
+                image=f"link/{i}.jpeg" if i % 3 else "", type_of_link=services.TypeOfLink.choices[i % 2][0],
+                status=services.LinkStatus.PENDING if i == 5 else services.LinkStatus.READY,
+                thumbnails={"small": {"webp": f"link/thumbnails/{i}.webp"}} if i % 4 == 0 else {},
+                updated_in=now - timedelta(hours=i) if i % 2 else None, user_id=cls.user,
+            )
+            link.collections.set(collections[:i % 4])
+
+        cls.link = link
+        cls.collection = collections[-1]
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(self.user)
+
+    def get_content(self, url: str, params: dict, row_reader: bool) -> bytes:
+        with mock.patch.dict(settings.LINK_SETTINGS, {"ROW_READER": row_reader}):
+            response = self.client.get(url, params)
+
+        assert 200 == response.status_code, response.data
+        return response.content
+
+    def assert_identical(self, url: str, params: dict | None = None) -> None:
+        params = params or {}
+        expected = self.get_content(url, params, row_reader=False)
+        content = self.get_content(url, params, row_reader=True)
+        assert expected == content, f"{url} {params}\n{expected}\n{content}"
+
+    def test_links(self):
+        self.assert_identical(reverse("link-list"))
+        self.assert_identical(reverse("link-list"), {"page": 2})
+        self.assert_identical(reverse("link-list"), {"cursor": ""})
+        self.assert_identical(reverse("link-list"), {"fields": "id,title,collections", "expand": "collections"})
+        self.assert_identical(reverse("link-list"), {"fields": "image,thumbnails,updated_in", "cursor": ""})
+        self.assert_identical(reverse("link-list"), {"expand": ""})
+
+    def test_link(self):
+        self.assert_identical(reverse("link-detail", kwargs={"id": self.link.id}))
+        self.assert_identical(reverse("link-detail", kwargs={"id": self.link.id}), {"fields": "id,type_of_link"})
+
+    def test_collections(self):
+        self.assert_identical(reverse("collection-list"))
+        self.assert_identical(reverse("collection-list"), {"cursor": ""})
+        self.assert_identical(reverse("collection-list"), {"fields": "name,links"})
+        self.assert_identical(reverse("collection-detail", kwargs={"id": self.collection.id}))
+
+    def test_not_found(self):
+        response = self.client.get(reverse("link-detail", kwargs={"id": 0}))
+        assert 404 == response.status_code, response.data
+
+    def test_queries(self):
+        """Testing a page is read with a query of the rows and a query of every nested relation"""
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("link-list"), {"cursor": ""})
+
+        # After the validators of the ETag: the ids of the page and the aggregate of their collections
+        assert 4 == len(queries), [query["sql"] for query in queries]
+        assert "LIMIT 16" in queries[0]["sql"] and "COUNT(" not in queries[0]["sql"], queries[0]["sql"]
+        assert "IN (" in queries[1]["sql"], "the collections of the page only must be aggregated"
+        assert readers.PARENT_KEY in queries[3]["sql"], "the collections must be read by the row reader"
+
+    def test_unsupported_serializer(self):
+        with self.assertRaises(readers.UnsupportedField):
+            readers.RowReader(serializers.SQLRequestSerializer())
+
+        with self.assertRaises(readers.UnsupportedField):
+            readers.RowReader(serializers.PendingLinkSerializer())
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.main import models, refresh
+from apps.main.celery_tasks import tasks
+from apps.user import models as user_models
+from benchmarks.stand_in import StandInServer
+
+
+locmem_caches = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=locmem_caches)
+class TestRefreshLinks(APITestCase):
+    """Testing the refresh_links function"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.server = cls.enterClassContext(StandInServer())
+
+    def setUp(self) -> None:
+        self.user = user_models.User.objects.get(id=1)
+
+    def create_link(self, path: str, age: timedelta, **kwargs) -> models.Link:
+        link = models.Link.objects.create(title="Old title", description="", link=f"{self.server.url}{path}",
+                                          user_id=self.user, **kwargs)
+        models.Link.objects.filter(id=link.id).update(refreshed_in=timezone.now() - age)
+        return link
+
+    def test_refresh_links(self):
+        link = self.create_link("/page?etag=v1", timedelta(days=30))
+
+        with mock.patch.object(tasks.process_link_image, "delay") as delay:
+            outcomes = tasks.refresh_stale_links()
+
+        assert {"updated": 1} == outcomes, outcomes
+        link.refresh_from_db()
+        assert "Page /page" == link.title, link.title
+        assert '"v1"' == link.etag, link.etag
+        assert timezone.now() - link.refreshed_in < timedelta(minutes=1), link.refreshed_in
+        delay.assert_called_once_with(link.id)
+
+        models.Link.objects.filter(id=link.id).update(refreshed_in=timezone.now() - timedelta(days=30), title="Kept")
+        outcomes = refresh.refresh_links()
+
+        assert {"not_modified": 1} == outcomes, outcomes
+        link.refresh_from_db()
+        assert "Kept" == link.title, "a page that has not been modified must not be parsed again"
+
+    def test_long_values(self):
+        """Testing a scraped value longer than its column is cut or dropped instead of failing the batch"""
+
+        link = self.create_link("/long", timedelta(days=30), image="http://127.0.0.1/old.png")
+        image = f"https://example.com/{'i' * 276}.png"
+        data = {"title": "t" * 300, "description": "Long", "image": image, "type_of_link": "website"}
+
+        with mock.patch.object(refresh.services, "build_dict_with_data", return_value=data), \
+                mock.patch.object(tasks.process_link_image, "delay") as delay:
+            outcomes = refresh.refresh_links()
+
+        assert 300 == len(image), len(image)
+        assert {"updated": 1} == outcomes, outcomes
+        link.refresh_from_db()
+        assert "t" * 250 == link.title, link.title
+        assert "" == link.image, "the image URL longer than the column is dropped"
+        assert {} == link.thumbnails, link.thumbnails
+        delay.assert_not_called()
+
+    def test_stale_links(self):
+        """Testing only the stale links are refreshed, oldest first"""
+
+        oldest = self.create_link("/oldest", timedelta(days=60))
+        old = self.create_link("/old", timedelta(days=30))
+        self.create_link("/fresh", timedelta(days=1))
+        self.create_link("/edited", timedelta(days=90), updated_in=timezone.now())
+        self.create_link("/pending", timedelta(days=90), status="pending")
+
+        stale_links = list(refresh.get_stale_links(batch_size=10))
+        assert [oldest.id, old.id] == [link.id for link in stale_links], stale_links
+
+        with mock.patch.object(tasks.process_link_image, "delay") as delay:
+            outcomes = refresh.refresh_links(batch_size=1)
+
+        assert {"updated": 1} == outcomes, outcomes
+        delay.assert_called_once_with(oldest.id)
+        assert [old.id] == [link.id for link in refresh.get_stale_links(batch_size=10)], "the oldest must be claimed"
+
+    def test_edited_during_refresh(self):
+        """Testing a link edited by its owner while its page is fetched keeps the edit"""
+
+        link = self.create_link("/edited-meanwhile", timedelta(days=30))
+        run = refresh.scraper.fetcher.run
+
+        def edit_and_run(coroutine):
+            models.Link.objects.filter(id=link.id).update(title="Mine", updated_in=timezone.now())
+            return run(coroutine)
+
+        with mock.patch.object(refresh.scraper.fetcher, "run", side_effect=edit_and_run):
+            outcomes = refresh.refresh_links()
+
+        assert {"edited": 1} == outcomes, outcomes
+        link.refresh_from_db()
+        assert "Mine" == link.title, link.title
+
+    def test_failed_refresh(self):
+        link = self.create_link("/gone?status=404", timedelta(days=30))
+
+        outcomes = refresh.refresh_links()
+
+        assert {"failed": 1} == outcomes, outcomes
+        link.refresh_from_db()
+        assert "Old title" == link.title, link.title
+        assert timezone.now() - link.refreshed_in < timedelta(minutes=1), "a failed link waits for the next refresh"
@@ -0,0 +1,128 @@
+import random
+import statistics
+
+from collections import Counter
+from unittest import mock
+
+import pytest
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from rest_framework.test import APITestCase
+
+from apps.main import models
+from apps.main.scale_data import ScaleDataGenerator, Scatter, zipf_rank
+from apps.user import models as user_models, services as user_services
+
+
+def test_zipf_rank():
+    """Testing the zipf_rank function"""
+
+    rng = random.Random(0)
+    ranks = Counter(zipf_rank(rng, 1000, 1.1) for _ in range(20_000))
+
+    assert 1 <= min(ranks) and max(ranks) <= 1000, (min(ranks), max(ranks))
+    assert ranks[1] > 10 * ranks[100], (ranks[1], ranks[100])
+
+
+@pytest.mark.parametrize("n", [1, 2, 10, 12, 1000])
+def test_scatter(n: int):
+    """Testing the Scatter class is a permutation"""
+
+    scatter = Scatter(n, seed=0)
+    assert list(range(n)) == sorted(scatter(rank) for rank in range(1, n + 1))
+
+
+class TestScaleDataGenerator(APITestCase):
+    """Testing the ScaleDataGenerator class"""
+
+    def get_generator(self, **kwargs) -> ScaleDataGenerator:
+        options = {"users": 50, "collections": 30, "links": 1000, "batch_size": 100, "id_offset": 1000}
+        return ScaleDataGenerator(**{**options, **kwargs})
+
+    def get_snapshot(self) -> tuple:
+        return (
+            list(user_models.User.objects.order_by("id").values_list("id", "username", "created_in")),
+            list(models.Collection.objects.order_by("id").values_list("id", "name", "user_id", "created_in")),
+            list(models.Link.objects.order_by("id").values_list("id", "link", "title", "user_id", "created_in")),
+            list(models.Link.collections.through.objects.order_by("link_id", "collection_id")
+                 .values_list("link_id", "collection_id")),
+        )
+
+    def delete_data(self) -> None:
+        for model in (models.Link, models.Collection, user_models.User):
+            model.objects.all().delete()
+
+    def test_generate(self):
+        self.get_generator().generate()
+
+        assert 50 == user_models.User.objects.count()
+        assert 30 == models.Collection.objects.count()
+        assert 1000 == models.Link.objects.count()
+
+        user = user_models.User.objects.get(id=1000)
+        assert user_services.validate_password("scale0", user.hashed_password), user.hashed_password
+
+        links_per_user = list(models.Link.objects.values("user_id").annotate(count=Count("id"))
+                              .values_list("count", flat=True))
+        assert max(links_per_user) > 5 * statistics.median(links_per_user), sorted(links_per_user)
+
+        link_count = models.Link.objects.filter(collections__isnull=False).distinct().count()
+        assert 0 < link_count < 1000, "only a part of the links must be in collections"
+
+    def test_generate_is_deterministic(self):
+        self.get_generator().generate()
+        snapshot = self.get_snapshot()
+
+        self.delete_data()
+        self.get_generator().generate()
+
+        assert snapshot == self.get_snapshot()
+
+        self.delete_data()
+        self.get_generator(seed=1).generate()
+
+        assert snapshot != self.get_snapshot(), "another seed must generate other data"
+
+    def test_resume(self):
+        self.get_generator().generate()
+        snapshot = self.get_snapshot()
+        self.delete_data()
+
+        generator = self.get_generator()
+        save = generator.save
+        calls = []
+
+        def interrupt(model, rows):
+            calls.append(model)
+
+            if model is models.Link and calls.count(models.Link) == 4:
+                raise KeyboardInterrupt
+
+            save(model, rows)
+
+        with mock.patch.object(generator, "save", side_effect=interrupt), pytest.raises(KeyboardInterrupt):
+            generator.generate()
+
+        assert 300 == models.Link.objects.count(), "the saved chunks must stay"
+
+        generator = self.get_generator()
+
+        with mock.patch.object(generator, "save", wraps=generator.save) as save:
+            generator.generate(resume=True)
+
+        assert 7 == save.call_count, "only the 7 remaining chunks of links must be saved"
+        assert snapshot == self.get_snapshot()
+
+    def test_command(self):
+        options = {"users": 20, "collections": 10, "links": 100, "id_offset": 1000, "stdout": mock.Mock()}
+        call_command("generate_scale_data", **options)
+
+        assert 100 == models.Link.objects.count()
+
+        with pytest.raises(CommandError):
+            call_command("generate_scale_data", **options)
+
+        call_command("generate_scale_data", resume=True, **options)
+        assert 100 == models.Link.objects.count()
@@ -0,0 +1,119 @@
+import time
+import asyncio
+
+import pytest
+
+from unittest import mock
+
+from apps.main import scraper, services
+from benchmarks.stand_in import StandInServer
+from config import settings
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StandInServer() as server:
+        yield server
+
+
+def test_get_many_metadata(server: StandInServer):
+    """Testing the get_many_metadata function"""
+
+    urls = [f"{server.url}/first", f"{server.url}/second?status=404", f"{server.url}/third"]
+    response = scraper.get_many_metadata(urls)
+
+    assert 3 == len(response), response
+    assert "Page /first" == response[0]["title"], response[0]
+    assert "Page /third" == response[2]["title"], response[2]
+    assert isinstance(response[1], scraper.ScrapingError), response[1]
+    assert 404 == response[1].status, response[1].status
+
+
+@mock.patch.dict(settings.SCRAPER_SETTINGS, {"TIMEOUT": 0.2})
+def test_get_many_metadata_timeout(server: StandInServer):
+    """Testing the get_many_metadata function with a slow page"""
+
+    response = scraper.get_many_metadata([f"{server.url}/slow?delay=1"])
+
+    assert isinstance(response[0], scraper.ScrapingError), response[0]
+    assert response[0].status is None, response[0].status
+
+
+def test_get_dict_with_data_from_link(server: StandInServer):
+    """Testing the get_dict_with_data_from_link function"""
+
+    response = services.get_dict_with_data_from_link(f"{server.url}/page")
+    assert "Page /page" == response["title"], response
+    assert "Stand-in page /page" == response["description"], response
+    assert services.TypeOfLink.WEBSITE == response["type_of_link"], response
+
+    with pytest.raises(scraper.ScrapingError):
+        services.get_dict_with_data_from_link(f"{server.url}/page?status=403")
+
+
+def test_token_bucket():
+    """Testing the TokenBucket class lets a burst through and then keeps the rate"""
+
+    async def acquire(bucket: scraper.TokenBucket, count: int) -> float:
+        start = time.monotonic()
+
+        for _ in range(count):
+            await bucket.acquire()
+
+        return time.monotonic() - start
+
+    bucket = scraper.TokenBucket(rate=20, burst=5)
+    assert asyncio.run(acquire(bucket, 5)) < 0.05, "the burst must not wait"
+    assert asyncio.run(acquire(bucket, 4)) >= 0.15, "4 more requests at 20 per second must take ~0.2s"
+
+
+@mock.patch.dict(settings.SCRAPER_SETTINGS, {"MAX_PER_HOST": 2, "HOST_RATE": 1000, "HOST_BURST": 1000})
+def test_fetcher_reuses_connections(server: StandInServer):
+    """Testing the Fetcher class keeps at most MAX_PER_HOST connections to a host and reuses them"""
+
+    scraper.fetcher.reset_stats()
+    scraper.fetcher.run(scraper.fetcher.close())
+
+    response = scraper.get_many_metadata([f"{server.url}/page-{i}?delay=0.05" for i in range(10)])
+    assert not [data for data in response if isinstance(data, Exception)], response
+
+    stats = scraper.fetcher.get_stats()
+    assert 10 == stats["requests"], stats
+    assert 2 == stats["connections_created"], stats
+    assert 8 == stats["connections_reused"], stats
+    assert stats["queue_wait_max"] >= 0.05, "the requests over MAX_PER_HOST must wait for a free connection"
+
+
+@mock.patch.dict(settings.SCRAPER_SETTINGS, {"MAX_HOSTS": 2})
+def test_fetcher_forgets_idle_hosts():
+    """Testing the Fetcher class keeps the limits of at most MAX_HOSTS hosts and never forgets a busy one"""
+
+    fetcher = scraper.Fetcher()
+
+    async def use_hosts() -> list[str]:
+        fetcher.get_session()
+
+        async with fetcher.limit("http://busy.test/page"):
+            for i in range(5):
+                async with fetcher.limit(f"http://host-{i}.test/page"):
+                    pass
+
+            hosts = list(fetcher._hosts)
+
+        await fetcher.close()
+        return hosts
+
+    hosts = asyncio.run(use_hosts())
+    assert ["busy.test", "host-4.test"] == hosts, hosts
+    assert 6 == fetcher.get_stats()["requests"], fetcher.get_stats()
+
+
+
+def test_get_bytes(server: StandInServer):
+    """Testing the get_bytes function"""
+
+    content = scraper.get_bytes(f"{server.url}/page?body=100", max_bytes=10_000)
+    assert content.startswith(b"<html>"), content[:100]
+
+    with pytest.raises(scraper.ScrapingError):
+        scraper.get_bytes(f"{server.url}/page?body=100", max_bytes=1_000)
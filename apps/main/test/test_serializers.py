@@ -0,0 +1,35 @@
+from rest_framework.test import APITestCase
+
+from apps.main import models, serializers
+from apps.user import models as user_models
+
+
+class TestCreateLinkSerializer(APITestCase):
+    """Testing the CreateLinkSerializer duplicate check"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    def test_validate_link(self):
+        user = user_models.User.objects.get(id=1)
+        link = models.Link.objects.create(link="https://github.com/Lanterman/?utm_source=readme", title="Lanterman",
+                                          description="", user_id=user)
+        assert "https://github.com/Lanterman" == link.canonical_link, link.canonical_link
+
+        for value in ("https://github.com/Lanterman", "HTTPS://GITHUB.COM/Lanterman/#repositories"):
+            serializer = serializers.CreateLinkSerializer(data={"link": value})
+            assert not serializer.is_valid(), value
+            assert "Link with this link already exists." == serializer.errors["link"][0], serializer.errors
+
+        serializer = serializers.CreateLinkSerializer(data={"link": "https://github.com/Lanterman/xvun"})
+        with self.assertNumQueries(1):
+            assert serializer.is_valid(), serializer.errors
+
+    def test_validate_long_canonical_link(self):
+        """Testing a link whose canonical form is longer than its column is rejected"""
+
+        value = f"https://habr.com/?q={'ü' * 80}"
+        assert len(value) <= 200, len(value)
+
+        serializer = serializers.CreateLinkSerializer(data={"link": value})
+        assert not serializer.is_valid(), value
+        assert "The link is too long." == serializer.errors["link"][0], serializer.errors
@@ -0,0 +1,273 @@
+import json
+
+from collections import Counter
+from unittest import mock
+
+from django.db import DataError
+from django.db.models import QuerySet
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from apps.main import models, services
+from apps.main.celery_tasks import tasks
+from apps.user import models as user_models, services as user_services
+from benchmarks.stand_in import StandInServer
+from config import settings
+
+
+class TestListLinkViewAsyncEnrichment(APITestCase):
+    """Testing the ListLinkView endpoint in the async enrichment mode"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.user = user_models.User.objects.get(id=1)
+        cls.token = user_services.create_jwttoken(cls.user.id)
+
+        cls.client = APIClient()
+
+        cls.path = reverse("link-list")
+        cls.data = {
+            "title": "Django REST framework",
+            "description": "Django REST framework is a toolkit for building Web APIs.",
+            "image": "https://www.django-rest-framework.org/img/logo.png",
+            "link": "https://www.django-rest-framework.org/",
+            "type_of_link": "website",
+        }
+
+    @mock.patch.dict(settings.LINK_SETTINGS, {"ASYNC_ENRICHMENT": True})
+    def test_post_method(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token.access_token}")
+
+        with mock.patch.object(tasks.scrape_link_data, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(self.path, data={"link": self.data["link"]})
+
+        content = json.loads(response.content)
+        link = models.Link.objects.get(id=content["id"])
+        assert 202 == response.status_code, response.status_code
+        assert services.LinkStatus.PENDING == content["status"], content["status"]
+        assert content["status_url"].endswith(link.get_absolute_url()), content["status_url"]
+        assert content["status_url"] == response.headers["Location"], response.headers["Location"]
+        delay.assert_called_once_with(link.id)
+
+        with mock.patch.object(services, "get_dict_with_data_from_link", return_value=self.data), \
+                mock.patch.object(tasks.process_link_image, "delay") as process_image:
+            tasks.scrape_link_data(link.id)
+
+        link.refresh_from_db()
+        assert services.LinkStatus.READY == link.status, link.status
+        assert self.data["title"] == link.title, link.title
+        assert self.data["image"] == link.image, link.image
+        process_image.assert_called_once_with(link.id)
+
+    @mock.patch.dict(settings.LINK_SETTINGS, {"ASYNC_ENRICHMENT": True})
+    def test_failed_scraping(self):
+        link = models.Link.objects.create(link="https://example.com/", title="", description="",
+                                          user_id=self.user, status=services.LinkStatus.PENDING)
+
+        with self.assertLogs(level="WARNING"):
+            with mock.patch.object(services, "get_dict_with_data_from_link", side_effect=KeyError("description")):
+                tasks.scrape_link_data(link.id)
+
+        link.refresh_from_db()
+        assert services.LinkStatus.FAILED == link.status, link.status
+
+    def test_scraping_long_values(self):
+        link = models.Link.objects.create(link="https://example.com/", title="", description="",
+                                          user_id=self.user, status=services.LinkStatus.PENDING)
+        data = {**self.data, "title": "a" * 300, "image": f"https://example.com/{'a' * 300}.png"}
+
+        with mock.patch.object(services, "get_dict_with_data_from_link", return_value=data):
+            tasks.scrape_link_data(link.id)
+
+        link.refresh_from_db()
+        assert services.LinkStatus.READY == link.status, link.status
+        assert "a" * 250 == link.title, link.title
+        assert "" == link.image, "the image URL longer than the column is dropped"
+
+    def test_scraping_database_error(self):
+        """Testing a link whose data the database rejects is failed instead of left pending"""
+
+        link = models.Link.objects.create(link="https://example.com/", title="", description="",
+                                          user_id=self.user, status=services.LinkStatus.PENDING)
+        update = QuerySet.update
+
+        def reject(queryset, **kwargs):
+            if kwargs.get("status") == services.LinkStatus.READY:
+                raise DataError("value too long for type character varying(250)")
+
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(services, "get_dict_with_data_from_link", return_value=self.data), \
+                mock.patch.object(QuerySet, "update", autospec=True, side_effect=reject), \
+                self.assertLogs(level="WARNING"):
+            tasks.scrape_link_data(link.id)
+
+        link.refresh_from_db()
+        assert services.LinkStatus.FAILED == link.status, link.status
+
+
+class TestBulkCreateLinkView(APITestCase):
+    """Testing the BulkCreateLinkView endpoint"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        cls.server = StandInServer().__enter__()
+        cls.user = user_models.User.objects.get(id=1)
+        cls.token = user_services.create_jwttoken(cls.user.id)
+        cls.collection = models.Collection.objects.create(name="Bulk", user_id=cls.user)
+        cls.foreign_collection = models.Collection.objects.create(name="Foreign", user_id_id=2)
+        models.Link.objects.create(link=f"{cls.server.url}/saved", title="Saved", description="", user_id=cls.user)
+
+        cls.client = APIClient()
+
+        cls.path = reverse("link-bulk-create")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.__exit__()
+        super().tearDownClass()
+
+    def test_post_method(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token.access_token}")
+        links = [
+            f"{self.server.url}/first",
+            f"{self.server.url}/first/",
+            f"{self.server.url}/saved",
+            f"{self.server.url}/missing?status=404",
+            f"{self.server.url}/second",
+            f"{self.server.url}/long?q={'ü' * 80}",
+        ]
+
+        with mock.patch.object(tasks.process_link_image, "delay") as process_image:
+            response = self.client.post(self.path, data={"links": links, "collection": self.collection.id},
+                                        format="json")
+            results = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        statuses = Counter(result["status"] for result in results)
+
+        assert 200 == response.status_code, response.status_code
+        assert "application/x-ndjson" == response.headers["Content-Type"], response.headers["Content-Type"]
+        assert 6 == len(results), results
+        assert {"created": 2, "duplicate": 1, "exists": 1, "failed": 2} == statuses, results
+        assert 2 == self.collection.links.count(), self.collection.links.count()
+        assert "Page /second" == models.Link.objects.get(link=links[4]).title
+        created = [mock.call(result["id"]) for result in results if result["status"] == "created"]
+        assert created == process_image.call_args_list, process_image.call_args_list
+
+    def test_post_method_long_values(self):
+        """Testing a scraped value longer than its column is cut or dropped instead of failing the batch"""
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token.access_token}")
+        link = f"{self.server.url}/{'long' * 40}"
+
+        response = self.client.post(self.path, data={"links": [link]}, format="json")
+        results = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        assert "created" == results[0]["status"], results
+        assert "" == models.Link.objects.get(link=link).image, "the image URL longer than the column is dropped"
+
+    def test_post_method_database_error(self):
+        """Testing a link rejected by the database is reported without stopping the other links"""
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token.access_token}")
+        links = [f"{self.server.url}/fourth", f"{self.server.url}/rejected", f"{self.server.url}/fifth"]
+        bulk_create = models.Link.objects.bulk_create
+
+        def reject(batch, *args, **kwargs):
+            if any(link.link == links[1] for link in batch):
+                raise DataError("value too long for type character varying(100)")
+
+            return bulk_create(batch, *args, **kwargs)
+
+        with mock.patch.object(models.Link.objects, "bulk_create", side_effect=reject), \
+                mock.patch.object(tasks.process_link_image, "delay") as process_image, \
+                self.assertLogs(level="WARNING"):
+            response = self.client.post(self.path, data={"links": links, "collection": self.collection.id},
+                                        format="json")
+            results = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        statuses = {result["link"]: result["status"] for result in results}
+        assert {links[0]: "created", links[1]: "failed", links[2]: "created"} == statuses, results
+        assert 2 == self.collection.links.count(), self.collection.links.count()
+        created = [mock.call(result["id"]) for result in results if result["status"] == "created"]
+        assert created == process_image.call_args_list, process_image.call_args_list
+
+    def test_post_method_foreign_collection(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token.access_token}")
+
+        with self.assertLogs(level="WARNING"):
+            response = self.client.post(
+                self.path, data={"links": [f"{self.server.url}/third"], "collection": self.foreign_collection.id}, 
+                format="json",
+            )
+
+        assert 400 == response.status_code, response.status_code
+
+
+class TestCollectionLinks(APITestCase):
+    """Testing the recent links of the collection endpoints and the CollectionLinksView endpoint"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = user_models.User.objects.get(id=1)
+        cls.collection = models.Collection.objects.create(name="Big", description="", user_id=cls.user)
+        cls.empty_collection = models.Collection.objects.create(name="Empty", description="", user_id=cls.user)
+
+        for i in range(25):
+            link = models.Link.objects.create(title=f"Link {i}", description="", link=f"https://example.com/{i}",
+                                              user_id=cls.user)
+            link.collections.add(cls.collection)
+
+        cls.ids = list(cls.collection.links.order_by("-created_in", "-id").values_list("id", flat=True))
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(self.user)
+
+    @mock.patch.dict(settings.LINK_SETTINGS, {"ROW_READER": False})
+    def test_recent_links_serializer(self):
+        self.test_recent_links()
+
+    def test_recent_links(self):
+        limit = settings.LINK_SETTINGS["COLLECTION_RECENT_LINKS"]
+
+        response = self.client.get(reverse("collection-detail", kwargs={"id": self.collection.id}))
+        assert 200 == response.status_code, response.data
+        assert 25 == response.data["link_count"], response.data["link_count"]
+        assert self.ids[:limit] == [link["id"] for link in response.data["links"]], response.data["links"]
+
+        response = self.client.get(reverse("collection-list"))
+        collections = {collection["id"]: collection for collection in response.data["results"]}
+        assert 25 == collections[self.collection.id]["link_count"], collections
+        assert limit == len(collections[self.collection.id]["links"]), collections
+        assert 0 == collections[self.empty_collection.id]["link_count"], collections
+        assert [] == collections[self.empty_collection.id]["links"], collections
+
+    def test_get_method(self):
+        path = reverse("collection-links", kwargs={"id": self.collection.id})
+        ids = []
+
+        while path:
+            response = self.client.get(path)
+            assert 200 == response.status_code, response.data
+            ids += [link["id"] for link in response.data["results"]]
+            path = response.data["next"]
+
+        assert self.ids == ids, ids
+
+        response = self.client.get(reverse("collection-links", kwargs={"id": self.collection.id}), {"cursor": ""})
+        assert self.ids[:15] == [link["id"] for link in response.data["results"]], response.data
+
+    def test_get_method_missing_collection(self):
+        response = self.client.get(reverse("collection-links", kwargs={"id": 0}))
+        assert 404 == response.status_code, response.data
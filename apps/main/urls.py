@@ -5,8 +5,12 @@ from . import views
 urlpatterns = [
     path("asql_request/", views.sql_request, name="sql-request"),
     path("add_test_data/", views.add_test_data_for_testing, name="add-test-data"),
+    path("metadata_cache_stats/", views.metadata_cache_stats, name="metadata-cache-stats"),
+    path("scraper_stats/", views.scraper_stats, name="scraper-stats"),
     path("links/", views.ListLinkView.as_view(), name="link-list"),
+    path("links/bulk/", views.BulkCreateLinkView.as_view(), name="link-bulk-create"),
     path("links/<int:id>/", views.LinkView.as_view(), name="link-detail"),
     path("collections/", views.CollectionsView.as_view(), name="collection-list"),
     path("collections/<int:id>", views.CollectionView.as_view(), name="collection-detail"),
+    path("collections/<int:id>/links/", views.CollectionLinksView.as_view(), name="collection-links"),
 ]
\ No newline at end of file
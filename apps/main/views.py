@@ -1,24 +1,37 @@
-from urllib.error import HTTPError
+import json
 
+from django.db import transaction, IntegrityError
 from django.db.models import Count
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
 from rest_framework import generics, response, status, decorators, exceptions
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from drf_yasg.utils import swagger_auto_schema
 
-from . import models, serializers, permissions, services, add_test_data
+from . import models, serializers, permissions, services, scraper, bulk_import, add_test_data, pagination, \
+    fieldsets, readers, conditional
+from .celery_tasks import scrape_link_data, process_link_image
 from apps.user.models import User
+from config import settings
 
 
-@method_decorator(name="get", decorator=swagger_auto_schema(tags=["link"]))
+class ReadViewMixin(conditional.ConditionalGetViewMixin, readers.RowReaderViewMixin,
+                    fieldsets.SparseFieldsetViewMixin):
+    """GET of the link and the collection endpoints: conditional, with sparse fieldsets and read from rows"""
+
+
+@method_decorator(name="get", decorator=swagger_auto_schema(tags=["link"],
+                                                             manual_parameters=fieldsets.swagger_parameters))
 @method_decorator(name="post", decorator=swagger_auto_schema(tags=["link"]))
-class ListLinkView(generics.ListCreateAPIView):
+class ListLinkView(ReadViewMixin, generics.ListCreateAPIView):
     """List link and create link endpoint"""
 
-    queryset = models.Link.objects.all().prefetch_related("collections")
+    queryset = models.Link.objects.all().prefetch_related("collections").order_by("-created_in", "-id")
+    conditional_relation = "collections"
     permission_classes = [IsAuthenticated]
+    pagination_class = pagination.CursorOrPageNumberPagination
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -30,24 +43,73 @@ class ListLinkView(generics.ListCreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
+        if settings.LINK_SETTINGS["ASYNC_ENRICHMENT"]:
+            return self.create_pending(serializer)
+
         try:
             serializer = services.add_data_by_link(serializer, request.user)
-        except HTTPError:
+        except scraper.CircuitOpenError:
+            raise exceptions.ValidationError({"link": [_("The site is not responding, try again later.")]})
+        except scraper.ScrapingError as e:
+            if e.status is None:
+                raise exceptions.ValidationError({"link": [_("Failed to load the page.")]})
             raise exceptions.PermissionDenied("This site has prohibited this action")
     
-        self.perform_create(serializer)
+        instance = self.perform_create(serializer)
+
+        if instance.image:
+            transaction.on_commit(lambda: process_link_image.delay(instance.id))
+
         headers = self.get_success_headers(serializer.data)
         return response.Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def perform_create(self, serializer, **kwargs):
+        try:
+            with transaction.atomic():
+                return serializer.save(**kwargs)
+        except IntegrityError:
+            raise exceptions.ValidationError({"link": [_("Link with this link already exists.")]})
+
+    def create_pending(self, serializer):
+        """Save the link without metadata and scrape it in the background"""
+
+        instance = self.perform_create(serializer, user_id=self.request.user, title="", description="", 
+                                       status=services.LinkStatus.PENDING)
+        transaction.on_commit(lambda: scrape_link_data.delay(instance.id))
+
+        pending_serializer = serializers.PendingLinkSerializer(instance, context=self.get_serializer_context())
+        headers = {"Location": pending_serializer.data["status_url"]}
+        return response.Response(pending_serializer.data, status=status.HTTP_202_ACCEPTED, headers=headers)
+
+
+@method_decorator(name="post", decorator=swagger_auto_schema(tags=["link"]))
+class BulkCreateLinkView(generics.GenericAPIView):
+    """Bulk create links endpoint, the result of every link is streamed back as a line of NDJSON"""
+
+    serializer_class = serializers.BulkCreateLinkSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = bulk_import.import_links(
+            serializer.validated_data["links"], request.user, serializer.validated_data.get("collection")
+        )
+        return StreamingHttpResponse((json.dumps(result) + "\n" for result in results), 
+                                     content_type="application/x-ndjson")
+
 
-@method_decorator(name="get", decorator=swagger_auto_schema(tags=["link"]))
+@method_decorator(name="get", decorator=swagger_auto_schema(tags=["link"],
+                                                             manual_parameters=fieldsets.swagger_parameters))
 @method_decorator(name="put", decorator=swagger_auto_schema(tags=["link"]))
 @method_decorator(name="patch", decorator=swagger_auto_schema(tags=["link"]))
 @method_decorator(name="delete", decorator=swagger_auto_schema(tags=["link"]))
-class LinkView(generics.RetrieveUpdateDestroyAPIView):
+class LinkView(ReadViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """Link endpoint"""
 
     queryset = models.Link.objects.all().prefetch_related("collections")
+    conditional_relation = "collections"
     lookup_field = "id"
 
     def get_serializer_class(self):
@@ -65,17 +127,27 @@ class LinkView(generics.RetrieveUpdateDestroyAPIView):
         return [permission() for permission in permission_list]
     
     def perform_update(self, serializer):
-        serializer.save(updated_in = timezone.now())
+        if "image" not in serializer.validated_data or serializer.validated_data["image"] == serializer.instance.image:
+            serializer.save(updated_in = timezone.now())
+            return
+
+        instance = serializer.save(updated_in = timezone.now(), thumbnails={})
+
+        if instance.image:
+            transaction.on_commit(lambda: process_link_image.delay(instance.id))
  
 
 
-@method_decorator(name="get", decorator=swagger_auto_schema(tags=["collection"]))
+@method_decorator(name="get", decorator=swagger_auto_schema(tags=["collection"],
+                                                             manual_parameters=fieldsets.swagger_parameters))
 @method_decorator(name="post", decorator=swagger_auto_schema(tags=["collection"]))
-class CollectionsView(generics.ListCreateAPIView):
+class CollectionsView(ReadViewMixin, generics.ListCreateAPIView):
     """List and create collections endpoint"""
 
-    queryset = models.Collection.objects.all().prefetch_related("links")
+    queryset = models.Collection.objects.all().prefetch_related("links").order_by("-created_in", "-id")
+    conditional_relation = "links"
     permission_classes = [IsAuthenticated]
+    pagination_class = pagination.CursorOrPageNumberPagination
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -87,14 +159,16 @@ class CollectionsView(generics.ListCreateAPIView):
         serializer.save(user_id=self.request.user)
 
 
-@method_decorator(name="get", decorator=swagger_auto_schema(tags=["collection"]))
+@method_decorator(name="get", decorator=swagger_auto_schema(tags=["collection"],
+                                                             manual_parameters=fieldsets.swagger_parameters))
 @method_decorator(name="put", decorator=swagger_auto_schema(tags=["collection"]))
 @method_decorator(name="patch", decorator=swagger_auto_schema(tags=["collection"]))
 @method_decorator(name="delete", decorator=swagger_auto_schema(tags=["collection"]))
-class CollectionView(generics.RetrieveUpdateDestroyAPIView):
+class CollectionView(ReadViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """Collection endpoint"""
 
     queryset = models.Collection.objects.all().prefetch_related("links")
+    conditional_relation = "links"
     lookup_field = "id"
 
     def get_serializer_class(self):
@@ -115,14 +189,51 @@ class CollectionView(generics.RetrieveUpdateDestroyAPIView):
         serializer.save(updated_in = timezone.now())
 
 
+@method_decorator(name="get", decorator=swagger_auto_schema(tags=["collection"],
+                                                             manual_parameters=fieldsets.swagger_parameters))
+class CollectionLinksView(ReadViewMixin, generics.ListAPIView):
+    """All links of a collection endpoint, the collection endpoints embed only the most recent ones"""
+
+    queryset = models.Link.objects.all().prefetch_related("collections").order_by("-created_in", "-id")
+    conditional_relation = "collections"
+    serializer_class = serializers.LinkSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = pagination.CursorOrPageNumberPagination
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return models.Link.objects.none()
+
+        if not models.Collection.objects.filter(id=self.kwargs["id"]).exists():
+            raise exceptions.NotFound()
+
+        return super().get_queryset().filter(collections=self.kwargs["id"])
+
+
 @decorators.api_view(["GET"])
 def add_test_data_for_testing(request):
-    """Add test data for testing the project"""
+    """Add test data for testing the project, `?scrape=1` scrapes the link metadata from the live pages"""
 
-    add_test_data.add_test_data()
+    add_test_data.add_test_data(scrape=request.query_params.get("scrape") in ("1", "true"))
     return response.Response({"detail": "Test data added successfully."})
 
 
+@decorators.api_view(["GET"])
+@decorators.permission_classes([IsAdminUser])
+def metadata_cache_stats(request):
+    """Link metadata cache counters of the current process"""
+
+    return response.Response(services.metadata_cache.stats())
+
+
+@decorators.api_view(["GET"])
+@decorators.permission_classes([IsAdminUser])
+def scraper_stats(request):
+    """Connection reuse, queue wait and circuit breaker counters of the scraper of the current process"""
+
+    return response.Response(scraper.fetcher.get_stats())
+
+
 @decorators.api_view(["GET"])
 def sql_request(request):
     """SQL request"""
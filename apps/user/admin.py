@@ -3,7 +3,7 @@ from django.contrib import messages
 from django.contrib import admin
 
 from . import models
-from .auth import models as auth_models
+from .auth import models as auth_models, cache as auth_cache
 
 
 @admin.register(models.User)
@@ -19,9 +19,22 @@ class UserAdmin(admin.ModelAdmin):
     list_per_page = 150
     actions = ["activate_user", "deactivate_user", "grant_access_to_admin_site", "deny_access_to_admin_site"]
 
+    def update_users(self, queryset, **fields) -> int:
+        """Update the users and drop them from the token cache"""
+
+        user_ids = list(queryset.values_list("id", flat=True))
+        updated = queryset.update(**fields)
+        auth_cache.forget_users(user_ids)
+        return updated
+
+    def delete_queryset(self, request, queryset):
+        user_ids = list(queryset.values_list("id", flat=True))
+        super().delete_queryset(request, queryset)
+        auth_cache.forget_users(user_ids)
+
     @admin.action(description="Activate user(-s)")
     def activate_user(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        updated = self.update_users(queryset, is_active=True)
         self.message_user(request, ngettext(
             '%d user was successfully activated.',
             '%d users were successfully activated.',
@@ -30,7 +43,7 @@ class UserAdmin(admin.ModelAdmin):
 
     @admin.action(description="Deactivate user(-s)")
     def deactivate_user(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        updated = self.update_users(queryset, is_active=False)
         self.message_user(request, ngettext(
             '%d user was successfully activated.',
             '%d users were successfully activated.',
@@ -39,7 +52,7 @@ class UserAdmin(admin.ModelAdmin):
 
     @admin.action(description="Grant access to admin site")
     def grant_access_to_admin_site(self, request, queryset):
-        updated = queryset.update(is_staff=True)
+        updated = self.update_users(queryset, is_staff=True)
         self.message_user(request, ngettext(
             '%d user was successfully granted access to the admin site.',
             '%d users were successfully granted access to the admin site.',
@@ -48,7 +61,7 @@ class UserAdmin(admin.ModelAdmin):
 
     @admin.action(description="Deny access to admin site")
     def deny_access_to_admin_site(self, request, queryset):
-        updated = queryset.update(is_staff=False)
+        updated = self.update_users(queryset, is_staff=False)
         self.message_user(request, ngettext(
             '%d user was successfully denied access to the admin site.',
             '%d users were successfully denied access to the admin site.',
@@ -1,8 +1,12 @@
+import jwt
+
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework import exceptions
 from rest_framework.authentication import BaseAuthentication, get_authorization_header
 
+from . import cache
+from apps.user import services
 from config import settings
 
 
@@ -47,6 +51,17 @@ class JWTTokenAuthBackend(BaseAuthentication):
     def authenticate_credentials(self, access_token: str):
         """JWT autentetication"""
 
+        if settings.JWT_SETTINGS["VERIFICATION"] == "stateless":
+            return self.authenticate_credentials_stateless(access_token)
+
+        if settings.JWT_SETTINGS["VERIFICATION"] == "cache":
+            return self.authenticate_credentials_cache(access_token)
+
+        return self.authenticate_credentials_database(access_token)
+
+    def authenticate_credentials_database(self, access_token: str):
+        """JWT autentetication by the token table"""
+
         model = self.get_model()
         try:
             token = model.objects.select_related('user').get(access_token=access_token)
@@ -61,5 +76,76 @@ class JWTTokenAuthBackend(BaseAuthentication):
 
         return (token.user, token)
 
+    def authenticate_credentials_stateless(self, access_token: str):
+        """
+        JWT autentetication without database queries on a warm cache.
+
+        The signature and the expiration are verified locally with the key derived from the secret key of the user
+        from the cache, the logged out tokens are in the revocation set of the cache.
+        """
+
+        try:
+            claims = jwt.decode(access_token, options={"verify_signature": False})
+            user_id = claims[settings.JWT_SETTINGS["USER_ID_CLAIM"]]
+        except (jwt.InvalidTokenError, KeyError):
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        # A token issued before the stateless mode has no expiration claim
+        if "exp" not in claims:
+            return self.authenticate_credentials_database(access_token)
+
+        try:
+            credentials, revoked = cache.get_credentials(user_id, access_token)
+        except cache.AuthCacheUnavailable:
+            return self.authenticate_credentials_database(access_token)
+
+        if revoked or credentials is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        user, secret_key = credentials
+
+        try:
+            claims = jwt.decode(access_token, key=services.get_signing_key(secret_key),
+                                algorithms=[settings.JWT_SETTINGS["ALGORITHM"]])
+        except jwt.ExpiredSignatureError:
+            raise exceptions.AuthenticationFailed(_('Token expired.'))
+        except jwt.InvalidTokenError:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if claims.get("type_token") != "access":
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (user, self.get_model()(access_token=access_token, user=user))
+
+    def authenticate_credentials_cache(self, access_token: str):
+        """
+        JWT autentetication by the token table fronted by the token cache.
+
+        The cached token is dropped on logout, on a new token, on a password change and on a user change.
+        """
+
+        try:
+            claims = jwt.decode(access_token, options={"verify_signature": False})
+            user_id = claims[settings.JWT_SETTINGS["USER_ID_CLAIM"]]
+        except (jwt.InvalidTokenError, KeyError):
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        token = cache.get_token(user_id, access_token)
+
+        if token is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if token["created"] + settings.JWT_SETTINGS["ACCESS_TOKEN_LIFETIME"] < timezone.now():
+            raise exceptions.AuthenticationFailed(_('Token expired.'))
+
+        if not token["is_active"]:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        user = token["user"]
+        return (user, self.get_model()(access_token=access_token, user=user, created=token["created"]))
+
     def authenticate_header(self, request):
         return self.keyword
\ No newline at end of file
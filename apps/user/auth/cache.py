@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import datetime
+
+from django.core.cache import caches
+from django.utils import timezone
+
+from apps.cache import TwoTierCache
+from config import settings
+
+
+class AuthCacheUnavailable(Exception):
+    """The shared cache can not be reached, a token must be checked against the database"""
+
+
+# The local tier of the other processes is not invalidated, it serves a revoked token for up to its short TTL
+token_cache = TwoTierCache(
+    "jwt-token",
+    local_size=settings.JWT_SETTINGS["TOKEN_CACHE_LOCAL_SIZE"],
+    local_ttl=settings.JWT_SETTINGS["TOKEN_CACHE_LOCAL_TTL"],
+)
+
+
+def get_cache():
+    return caches["default"]
+
+
+def get_user_key(user_id: int) -> str:
+    return f"jwt-user:{user_id}"
+
+
+def get_digest(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+def get_revoked_key(access_token: str) -> str:
+    return f"jwt-revoked:{get_digest(access_token)}"
+
+
+def get_credentials(user_id: int, access_token: str) -> tuple[tuple | None, bool]:
+    """
+    The user with their secret key and whether the token is revoked, with a single cache round trip.
+    The user and the secret key are loaded from the database on a cache miss.
+    """
+
+    from .models import SecretKey
+
+    user_key, revoked_key = get_user_key(user_id), get_revoked_key(access_token)
+
+    try:
+        values = get_cache().get_many([user_key, revoked_key])
+    except Exception as e:
+        logging.warning(f"Shared cache is unavailable: {e!r}")
+        raise AuthCacheUnavailable from e
+
+    if values.get(revoked_key):
+        return None, True
+
+    credentials = values.get(user_key)
+
+    if credentials is None:
+        secret_key = SecretKey.objects.select_related("user").filter(user_id=user_id).first()
+
+        if secret_key is None:
+            return None, False
+
+        credentials = (secret_key.user, secret_key.key)
+
+        try:
+            get_cache().set(user_key, credentials, settings.JWT_SETTINGS["USER_CACHE_TTL"])
+        except Exception as e:
+            logging.warning(f"Shared cache is unavailable: {e!r}")
+
+    return credentials, False
+
+
+def get_token(user_id: int, access_token: str) -> dict | None:
+    """
+    The cached token of a user: user id, is_active, the creation time of the token and the user itself.
+    A user has a single token, so the entry is kept by the user id and is checked against the digest of the token.
+    The token is loaded from the database on a cache miss or if the user has got a new token since.
+    """
+
+    from .models import JWTToken
+
+    digest = get_digest(access_token)
+    entry = token_cache.get(str(user_id))
+
+    if entry is not None and entry["digest"] == digest:
+        return entry
+
+    token = JWTToken.objects.select_related("user").filter(user_id=user_id, access_token=access_token).first()
+
+    if token is None:
+        return None
+
+    entry = {"digest": digest, "user_id": token.user_id, "is_active": token.user.is_active,
+             "created": token.created, "user": token.user}
+    expires = token.created + settings.JWT_SETTINGS["ACCESS_TOKEN_LIFETIME"]
+    ttl = min(settings.JWT_SETTINGS["USER_CACHE_TTL"], (expires - timezone.now()).total_seconds())
+
+    if ttl > 0:
+        token_cache.set(str(user_id), entry, ttl)
+
+    return entry
+
+
+def forget_user(user_id: int) -> None:
+    """
+    Drop the cached user, secret key and token, e.g. after the user has got a new token, has logged out
+    or has been changed
+    """
+
+    token_cache.delete(str(user_id))
+
+    try:
+        get_cache().delete(get_user_key(user_id))
+    except Exception as e:
+        logging.warning(f"Shared cache is unavailable: {e!r}")
+
+
+def forget_users(user_ids) -> None:
+    for user_id in user_ids:
+        forget_user(user_id)
+
+
+def revoke(access_token: str, expires: datetime.datetime) -> None:
+    """Add an access token to the revocation set until it expires"""
+
+    ttl = (expires - timezone.now()).total_seconds()
+
+    if ttl <= 0:
+        return
+
+    try:
+        get_cache().set(get_revoked_key(access_token), True, ttl)
+    except Exception as e:
+        logging.warning(f"Shared cache is unavailable, the token stays valid until it expires: {e!r}")
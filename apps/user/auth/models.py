@@ -12,12 +12,13 @@ class SecretKey(models.Model):
     """User secret key to create JWT token"""
 
     key: str = models.CharField(_("secret key"), max_length=250, unique=True)
-    created: timezone = models.DateTimeField(_("created"), auto_now_add=True)
+    created: timezone = models.DateTimeField(_("created"), auto_now_add=True, db_index=True)
     user: int = models.ForeignKey(verbose_name="user_id", to=User, on_delete=models.CASCADE, related_name="secret_key")
 
     class Meta:
         verbose_name = _("Secret Key")
         verbose_name_plural = _("Secret Keys")
+        constraints = [models.UniqueConstraint(fields=["user"], name="unique_secret_key_user")]
 
 
 class JWTToken(models.Model):
@@ -25,12 +26,13 @@ class JWTToken(models.Model):
 
     access_token: str = models.CharField(_("access token"), max_length=250, unique=True,)
     refresh_token: str = models.CharField(_("refresh token"), max_length=250, unique=True)
-    created: timezone = models.DateTimeField(_("created"), auto_now_add=True)
+    created: timezone = models.DateTimeField(_("created"), auto_now_add=True, db_index=True)
     user: int = models.ForeignKey(verbose_name=_("user_id"), to=User, on_delete=models.CASCADE, related_name="auth_token")
 
     class Meta:
         verbose_name = _("JWTToken")
         verbose_name_plural = _("JWTTokens")
+        constraints = [models.UniqueConstraint(fields=["user"], name="unique_jwttoken_user")]
 
     def __str__(self):
         return f"JWT token to {self.user.username}"
@@ -1,10 +1,19 @@
+import jwt
+
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.admin import AdminSite
+from django.core.cache import caches
+from django.test import override_settings
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase, APIRequestFactory
 from rest_framework.exceptions import AuthenticationFailed
 
 from config import settings
-from apps.user import services as user_services, models as user_models
-from apps.user.auth import backends, models as auth_models
+from apps.user import services as user_services, models as user_models, db_queries
+from apps.user.admin import UserAdmin
+from apps.user.auth import backends, cache, models as auth_models
 
 
 class TestJWTTokenAuthBackend(APITestCase):
@@ -90,4 +99,179 @@ class TestJWTTokenAuthBackend(APITestCase):
         raise_msg = 'User inactive or deleted.'
         user_models.User.objects.filter(id=3).update(is_active=False)
         with self.assertRaisesMessage(AuthenticationFailed, raise_msg):
-            self.instance.authenticate_credentials(self.token_to_db.access_token)
\ No newline at end of file
+            self.instance.authenticate_credentials(self.token_to_db.access_token)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+@mock.patch.dict(settings.JWT_SETTINGS, {"VERIFICATION": "stateless"})
+class TestJWTTokenAuthBackendStateless(APITestCase):
+    """Testing JWTTokenAuthBackend class in the stateless verification mode"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    def setUp(self) -> None:
+        caches["default"].clear()
+
+        self.instance = backends.JWTTokenAuthBackend()
+        self.token = user_services.create_jwttoken(user_id=1)
+
+    def test_authenticate_credentials(self):
+        """Testing authenticate_credentials method loads the user once and then needs no queries"""
+
+        with self.assertNumQueries(1):
+            response_1 = self.instance.authenticate_credentials(self.token.access_token)
+
+        with self.assertNumQueries(0):
+            response_2 = self.instance.authenticate_credentials(self.token.access_token)
+
+        assert "admin" == response_1[0].username == response_2[0].username, response_2[0]
+        assert self.token.access_token == response_2[1].access_token, response_2[1].access_token
+
+        raise_msg = 'Invalid token.'
+        with self.assertRaisesMessage(AuthenticationFailed, raise_msg):
+            self.instance.authenticate_credentials(f"{self.token.access_token}1")
+
+        with self.assertRaisesMessage(AuthenticationFailed, raise_msg):
+            self.instance.authenticate_credentials(self.token.refresh_token)
+
+    def test_logout(self):
+        """Testing a logged out token is rejected without the token table"""
+
+        self.instance.authenticate_credentials(self.token.access_token)
+        db_queries.logout(self.token)
+
+        with self.assertNumQueries(0), self.assertRaisesMessage(AuthenticationFailed, 'Invalid token.'):
+            self.instance.authenticate_credentials(self.token.access_token)
+
+    def test_new_token(self):
+        """Testing a new sign in invalidates the previous token with the new secret key"""
+
+        self.instance.authenticate_credentials(self.token.access_token)
+        new_token = user_services.create_jwttoken(user_id=1)
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid token.'):
+            self.instance.authenticate_credentials(self.token.access_token)
+
+        response = self.instance.authenticate_credentials(new_token.access_token)
+        assert "admin" == response[0].username, response[0]
+
+    def test_token_signed_with_secret_key(self):
+        """Testing a token signed with the secret key of the user itself, not the derived key, is rejected"""
+
+        secret_key = auth_models.SecretKey.objects.get(user_id=1).key
+        claims = jwt.decode(self.token.access_token, options={"verify_signature": False})
+        forged_token = jwt.encode(claims, key=secret_key, algorithm=settings.JWT_SETTINGS["ALGORITHM"])
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid token.'):
+            self.instance.authenticate_credentials(forged_token)
+
+    def test_expired_token(self):
+        with mock.patch.dict(settings.JWT_SETTINGS, {"ACCESS_TOKEN_LIFETIME": timedelta(minutes=-1)}):
+            token = user_services.create_jwttoken(user_id=1)
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'Token expired.'):
+            self.instance.authenticate_credentials(token.access_token)
+
+    def test_inactive_user(self):
+        user_models.User.objects.filter(id=1).update(is_active=False)
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'User inactive or deleted.'):
+            self.instance.authenticate_credentials(self.token.access_token)
+
+    def test_token_without_expiration(self):
+        """Testing a token issued before the stateless mode is checked against the token table"""
+
+        token = auth_models.JWTToken.objects.get(user_id=3)
+
+        with self.assertNumQueries(1), self.assertRaisesMessage(AuthenticationFailed, 'Token expired.'):
+            self.instance.authenticate_credentials(token.access_token)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+@mock.patch.dict(settings.JWT_SETTINGS, {"VERIFICATION": "cache"})
+class TestJWTTokenAuthBackendCache(APITestCase):
+    """Testing JWTTokenAuthBackend class in the cache verification mode"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    def setUp(self) -> None:
+        caches["default"].clear()
+        cache.token_cache.local.clear()
+
+        self.instance = backends.JWTTokenAuthBackend()
+        self.token = user_services.create_jwttoken(user_id=1)
+
+    def test_authenticate_credentials(self):
+        """Testing authenticate_credentials method loads the token once and then needs no queries"""
+
+        with self.assertNumQueries(1):
+            response_1 = self.instance.authenticate_credentials(self.token.access_token)
+
+        with self.assertNumQueries(0):
+            response_2 = self.instance.authenticate_credentials(self.token.access_token)
+
+        assert "admin" == response_1[0].username == response_2[0].username, response_2[0]
+        assert self.token.access_token == response_2[1].access_token, response_2[1].access_token
+
+        cache.token_cache.local.clear()
+
+        with self.assertNumQueries(0):
+            self.instance.authenticate_credentials(self.token.access_token)
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid token.'):
+            self.instance.authenticate_credentials(f"{self.token.access_token}1")
+
+    def test_logout(self):
+        self.instance.authenticate_credentials(self.token.access_token)
+        db_queries.logout(self.token)
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid token.'):
+            self.instance.authenticate_credentials(self.token.access_token)
+
+    def test_refresh_token(self):
+        """Testing a refreshed token replaces the previous one in the cache"""
+
+        self.instance.authenticate_credentials(self.token.access_token)
+        response = self.client.post(reverse("refresh-tokens"), {"refresh_token": self.token.refresh_token})
+        assert 201 == response.status_code, response.data
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid token.'):
+            self.instance.authenticate_credentials(self.token.access_token)
+
+        new_token = auth_models.JWTToken.objects.get(user_id=1)
+        assert "admin" == self.instance.authenticate_credentials(new_token.access_token)[0].username
+
+    def test_change_password(self):
+        """Testing a changed password is seen by the next request"""
+
+        self.instance.authenticate_credentials(self.token.access_token)
+        db_queries.change_password(1, "new_hashed_password")
+
+        user = self.instance.authenticate_credentials(self.token.access_token)[0]
+        assert "new_hashed_password" == user.hashed_password, user.hashed_password
+
+    def test_deactivate_user(self):
+        """Testing the admin actions and the user changes drop the cached token"""
+
+        self.instance.authenticate_credentials(self.token.access_token)
+        user_admin = UserAdmin(user_models.User, AdminSite())
+        queryset = user_models.User.objects.filter(id=1)
+
+        with mock.patch.object(user_admin, "message_user"):
+            user_admin.deactivate_user(None, queryset)
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'User inactive or deleted.'):
+            self.instance.authenticate_credentials(self.token.access_token)
+
+        user = user_models.User.objects.get(id=1)
+        user.is_active = True
+        user.save()
+
+        assert self.instance.authenticate_credentials(self.token.access_token)[0].is_active
+
+    def test_delete_user(self):
+        self.instance.authenticate_credentials(self.token.access_token)
+        user_models.User.objects.get(id=1).delete()
+
+        with self.assertRaisesMessage(AuthenticationFailed, 'Invalid token.'):
+            self.instance.authenticate_credentials(self.token.access_token)
@@ -1 +1 @@
-from .tasks import send_reset_password
\ No newline at end of file
+from .tasks import send_reset_password, flush_email_outbox, purge_expired_tokens
\ No newline at end of file
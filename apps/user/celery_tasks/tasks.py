@@ -1,25 +1,73 @@
-from django.core.mail import send_mail
+import random
+import logging
+
+from django.core.cache import caches
 
 from celery import shared_task
 
+from apps.user import emails, purge
 from config import settings
 
 
 @shared_task
-def send_reset_password(user_email: str, secret_key: str) -> None:
+def send_reset_password(user_email: str, token: str) -> None:
     html_message = f"""
         <p>
             Request to reset user password with email '{user_email}'.\n 
             To reset your password, follow the link:\n
-            <h3>http://127.0.0.1:8000/api/v1/auth/reset_password/{user_email}/{secret_key}</h3>
+            <h3>http://127.0.0.1:8000/api/v1/auth/reset_password/{user_email}/{token}</h3>
         </p>
     """
 
-    send_mail(
+    emails.queue_email(
         subject=f'Request to change user password',
         message=html_message,
-        from_email=settings.EMAIL_HOST_USER,
-        recipient_list=[user_email],
-        fail_silently=False,
         html_message=html_message,
+        recipient=user_email,
     )
+    schedule_email_flush()
+
+
+def schedule_email_flush() -> None:
+    """Flush the outbox at the end of the batch window, unless a flush of the window is scheduled already"""
+
+    window = settings.EMAIL_SETTINGS["BATCH_WINDOW"]
+
+    try:
+        scheduled = caches["default"].add("email-outbox:flush", True, window)
+    except Exception as e:
+        logging.warning(f"Shared cache is unavailable: {e!r}")
+        scheduled = True
+
+    if scheduled:
+        flush_email_outbox.apply_async(countdown=window)
+
+
+@shared_task(bind=True, max_retries=settings.EMAIL_SETTINGS["MAX_RETRIES"])
+def flush_email_outbox(self) -> dict:
+    """
+    Send the queued emails over a single SMTP connection per batch, run at the end of a batch window and by
+    Celery beat. A transient SMTP error is retried with an exponential backoff
+    """
+
+    try:
+        outcomes = emails.send_outbox()
+    except Exception as e:
+        if not emails.is_transient(e):
+            raise
+
+        backoff = min(settings.EMAIL_SETTINGS["RETRY_BACKOFF"] * 2 ** self.request.retries,
+                      settings.EMAIL_SETTINGS["RETRY_BACKOFF_MAX"])
+        raise self.retry(exc=e, countdown=backoff * random.uniform(0.5, 1))
+
+    logging.info(f"Sent the email outbox: {outcomes}")
+    return outcomes
+
+
+@shared_task
+def purge_expired_tokens() -> dict:
+    """Delete the expired tokens and secret keys, run by Celery beat"""
+
+    deleted = purge.purge_expired_tokens()
+    logging.info(f"Purged expired tokens: {deleted}")
+    return deleted
@@ -1,9 +1,11 @@
 from rest_framework import exceptions
+from django.db import connection, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from . import models
-from .auth import models as auth_models
+from .auth import models as auth_models, cache as auth_cache
+from config import settings
 
 
 def get_or_none(email: str) -> models.User | None:
@@ -24,26 +26,19 @@ def get_user_by_email(email: str) -> models.User | None:
     return query
 
 
-def get_user_id_by_secret_key(secret_key: str) -> models.User | None:
-    """Get the user by the relation's secret_key field"""
-
-    try:
-        query = auth_models.SecretKey.objects.get(key=secret_key)
-        return query.user_id
-    except auth_models.SecretKey.DoesNotExist:
-        return None
-
-
 def change_password(user_id: int, hashed_password: str) -> None:
     """Cahnge user account password"""
 
     models.User.objects.filter(id=user_id).update(hashed_password=hashed_password)
+    auth_cache.forget_user(user_id)
 
 
 def logout(instance: auth_models.JWTToken) -> None:
-    """Sign out (delete authentication jwt token)"""
+    """Sign out (delete authentication jwt token, drop it from the cache and revoke it for the stateless mode)"""
 
     instance.delete()
+    auth_cache.forget_user(instance.user_id)
+    auth_cache.revoke(instance.access_token, instance.created + settings.JWT_SETTINGS["ACCESS_TOKEN_LIFETIME"])
 
 
 # action with SecretKey model instance
@@ -87,4 +82,51 @@ def create_jwttoken(access_token: str, refresh_token: str, user_id: int) -> auth
         defaults={"access_token":access_token, "refresh_token":refresh_token, "created": timezone.now()}
     )
 
-    return instance
\ No newline at end of file
+    return instance
+
+
+def issue_jwttoken(secret_key: str, access_token: str, refresh_token: str, user_id: int) -> auth_models.JWTToken:
+    """
+    Replace the secret key and the token of a user at once.
+    A single INSERT ... ON CONFLICT statement for both tables on Postgres, so concurrent sign ins of the same user
+    can not race into an IntegrityError, and two upserts in a transaction on other databases.
+    """
+
+    created = timezone.now()
+
+    if connection.vendor == "postgresql":
+        secret_key_table = connection.ops.quote_name(auth_models.SecretKey._meta.db_table)
+        token_table = connection.ops.quote_name(auth_models.JWTToken._meta.db_table)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH secret_key AS (
+                    INSERT INTO {secret_key_table} (key, created, user_id) VALUES (%s, %s, %s)
+                    ON CONFLICT (user_id) DO UPDATE SET key = EXCLUDED.key, created = EXCLUDED.created
+                )
+                INSERT INTO {token_table} (access_token, refresh_token, created, user_id) VALUES (%s, %s, %s, %s)
+                ON CONFLICT (user_id) DO UPDATE SET access_token = EXCLUDED.access_token,
+                    refresh_token = EXCLUDED.refresh_token, created = EXCLUDED.created
+                RETURNING id
+                """,
+                [secret_key, created, user_id, access_token, refresh_token, created, user_id],
+            )
+            token_id = cursor.fetchone()[0]
+    else:
+        with transaction.atomic():
+            auth_models.SecretKey.objects.bulk_create(
+                [auth_models.SecretKey(key=secret_key, created=created, user_id=user_id)],
+                update_conflicts=True, unique_fields=["user"], update_fields=["key", "created"],
+            )
+            auth_models.JWTToken.objects.bulk_create(
+                [auth_models.JWTToken(access_token=access_token, refresh_token=refresh_token, created=created,
+                                      user_id=user_id)],
+                update_conflicts=True, unique_fields=["user"],
+                update_fields=["access_token", "refresh_token", "created"],
+            )
+            # created of auto_now_add is set again by bulk_create
+            token_id, created = auth_models.JWTToken.objects.values_list("id", "created").get(user_id=user_id)
+
+    return auth_models.JWTToken(id=token_id, access_token=access_token, refresh_token=refresh_token, created=created,
+                                user_id=user_id)
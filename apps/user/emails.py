@@ -0,0 +1,102 @@
+import logging
+import smtplib
+
+from collections import Counter
+
+from django.core import mail
+from kombu import Connection
+
+from config import settings
+
+
+def get_outbox_connection() -> Connection:
+    return Connection(settings.EMAIL_SETTINGS["OUTBOX_URL"])
+
+
+def queue_email(subject: str, message: str, html_message: str, recipient: str) -> None:
+    """Put an email into the outbox, it is sent with the other emails of the batch window"""
+
+    with get_outbox_connection() as connection, \
+            connection.SimpleQueue(settings.EMAIL_SETTINGS["OUTBOX_QUEUE"]) as queue:
+        queue.put({"subject": subject, "message": message, "html_message": html_message, "to": recipient})
+
+
+def is_transient(error: Exception) -> bool:
+    """A network error or a 4xx reply of the SMTP server, the email may be sent later"""
+
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+
+def build_message(payload: dict, connection) -> mail.EmailMultiAlternatives:
+    message = mail.EmailMultiAlternatives(
+        subject=payload["subject"], body=payload["message"], from_email=settings.EMAIL_HOST_USER,
+        to=[payload["to"]], connection=connection,
+    )
+    message.attach_alternative(payload["html_message"], "text/html")
+    return message
+
+
+def send_batch(batch: list, outcomes: Counter) -> None:
+    """
+    Send a batch of outbox messages over a single SMTP connection.
+    A message is acknowledged once it is sent or rejected for good. On a transient error the rest of the batch
+    goes back to the outbox and the error is raised to retry later.
+    """
+
+    connection = mail.get_connection(fail_silently=False)
+
+    try:
+        connection.open()
+
+        for message in batch:
+            try:
+                connection.send_messages([build_message(message.payload, connection)])
+            except (smtplib.SMTPException, OSError) as e:
+                if is_transient(e):
+                    raise
+
+                logging.warning(f"The email to {message.payload['to']} is rejected: {e!r}")
+                outcomes["rejected"] += 1
+            else:
+                outcomes["sent"] += 1
+
+            message.ack()
+    except Exception:
+        for message in batch:
+            if not message.acknowledged:
+                message.requeue()
+        raise
+    finally:
+        try:
+            connection.close()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+
+def send_outbox(batch_size: int | None = None) -> dict:
+    """Send the emails of the outbox in batches until it is empty"""
+
+    batch_size = batch_size or settings.EMAIL_SETTINGS["BATCH_SIZE"]
+    outcomes = Counter()
+
+    with get_outbox_connection() as connection, \
+            connection.SimpleQueue(settings.EMAIL_SETTINGS["OUTBOX_QUEUE"]) as queue:
+        while True:
+            batch = []
+
+            while len(batch) < batch_size:
+                try:
+                    batch.append(queue.get(block=False))
+                except queue.Empty:
+                    break
+
+            if not batch:
+                return dict(outcomes)
+
+            send_batch(batch, outcomes)
+            outcomes["batches"] += 1
@@ -0,0 +1,140 @@
+import os
+import time
+import threading
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, status
+
+from config import settings
+
+
+class HashingBusy(exceptions.APIException):
+    """Too many passwords are hashed already, the request is rejected instead of waiting for its turn"""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("The server is busy, try again later.")
+    default_code = "hashing_busy"
+
+
+class HashingPool:
+    """
+    Runs the password hashing off the request thread, in a pool of processes to escape the GIL.
+
+    At most MAX_IN_FLIGHT hashes of a web process are running or queued in the pool, a request that waits
+    longer than QUEUE_TIMEOUT for its turn gets HashingBusy (503), so a burst of logins can not take every
+    worker thread and starve the cheap requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self._slots = None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats = {
+            "hashes": 0,
+            "rejected": 0,
+            "waiting": 0,
+            "in_flight": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+        }
+
+    def get_stats(self) -> dict:
+        """Queue depth, queue wait and latency counters of this process"""
+
+        stats = dict(self.stats)
+        stats["queue_wait_avg"] = stats["queue_wait_total"] / stats["hashes"] if stats["hashes"] else None
+        stats["latency_avg"] = stats["latency_total"] / stats["hashes"] if stats["hashes"] else None
+        stats["executor"] = settings.HASHING_SETTINGS["EXECUTOR"]
+        stats["max_in_flight"] = settings.HASHING_SETTINGS["MAX_IN_FLIGHT"]
+        return stats
+
+    def setup(self) -> None:
+        """Create the pool on the first use, and again in a forked worker process"""
+
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._slots = threading.BoundedSemaphore(settings.HASHING_SETTINGS["MAX_IN_FLIGHT"])
+                    self._executor = None
+                    self._pid = os.getpid()
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=settings.HASHING_SETTINGS["WORKERS"])
+
+        return self._executor
+
+    def discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Forget a broken pool, the next hash creates a new one"""
+
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+        executor.shutdown(wait=False)
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Call a picklable function in the pool and wait for its result"""
+
+        self.setup()
+        started = time.monotonic()
+        self.count(waiting=1)
+
+        try:
+            acquired = self._slots.acquire(timeout=settings.HASHING_SETTINGS["QUEUE_TIMEOUT"])
+        finally:
+            self.count(waiting=-1)
+
+        if not acquired:
+            self.count(rejected=1)
+            raise HashingBusy()
+
+        wait = time.monotonic() - started
+        self.count(in_flight=1)
+
+        try:
+            if settings.HASHING_SETTINGS["EXECUTOR"] == "process":
+                executor = self.get_executor()
+
+                try:
+                    return executor.submit(func, *args, **kwargs).result()
+                except BrokenProcessPool:
+                    # A worker process died, a broken pool rejects every later submit
+                    self.discard_executor(executor)
+                    raise
+
+            return func(*args, **kwargs)
+        finally:
+            self._slots.release()
+            latency = time.monotonic() - started
+            self.count(in_flight=-1, hashes=1, queue_wait_total=wait, latency_total=latency)
+
+            with self._stats_lock:
+                self.stats["queue_wait_max"] = max(self.stats["queue_wait_max"], wait)
+                self.stats["latency_max"] = max(self.stats["latency_max"], latency)
+
+    def count(self, **deltas) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                self.stats[name] += delta
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+pool = HashingPool()
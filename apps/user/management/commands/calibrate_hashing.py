@@ -0,0 +1,91 @@
+import time
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.user import services
+from config import settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Find the password hashing parameters that take about the target time on the current hardware and print "
+        "them as environment variables. The hashes with other parameters are rehashed on sign in"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", choices=("pbkdf2_sha256", "scrypt"),
+                            default=settings.HASHING_SETTINGS["ALGORITHM"])
+        parser.add_argument("--target-ms", type=float, default=250, help="Time of a single hash")
+        parser.add_argument("--runs", type=int, default=3, help="A time is the median of this many hashes")
+        parser.add_argument("--scrypt-r", type=int, default=settings.HASHING_SETTINGS["SCRYPT_R"])
+        parser.add_argument("--scrypt-p", type=int, default=settings.HASHING_SETTINGS["SCRYPT_P"])
+        parser.add_argument("--scrypt-max-n", type=int, default=2 ** 20,
+                            help="Memory of scrypt is 128 * n * r bytes")
+
+    def handle(self, *args, **options):
+        if options["target_ms"] <= 0 or options["runs"] < 1:
+            raise CommandError("The target time and the number of runs must be positive.")
+
+        self.runs = options["runs"]
+        target = options["target_ms"] / 1000
+        algorithm = options["algorithm"]
+
+        # The first hash starts the processes of the hashing pool
+        self.measure(algorithm, services.get_hasher_params(algorithm))
+
+        if algorithm == "pbkdf2_sha256":
+            params = self.calibrate_pbkdf2(target)
+        else:
+            params = self.calibrate_scrypt(target, options["scrypt_r"], options["scrypt_p"], options["scrypt_max_n"])
+
+        current = services.get_hasher_params(algorithm)
+        self.stdout.write(f"Current {algorithm} {services.encode_params(current)}: "
+                          f"{self.measure(algorithm, current) * 1000:.0f} ms")
+        self.stdout.write(f"Calibrated {algorithm} {services.encode_params(params)}: "
+                          f"{self.measure(algorithm, params) * 1000:.0f} ms")
+
+        variables = {"HASHING_ALGORITHM": algorithm}
+
+        if algorithm == "pbkdf2_sha256":
+            variables["HASHING_PBKDF2_ITERATIONS"] = params["i"]
+        else:
+            variables.update(HASHING_SCRYPT_N=params["n"], HASHING_SCRYPT_R=params["r"], HASHING_SCRYPT_P=params["p"])
+
+        self.stdout.write(self.style.SUCCESS("\n".join(f"{name}={value}" for name, value in variables.items())))
+
+    def measure(self, algorithm: str, params: dict) -> float:
+        """Median time of a hash with the parameters, in seconds"""
+
+        times = []
+
+        for _ in range(self.runs):
+            started = time.perf_counter()
+            services.derive_key("calibration", services.create_salt(), algorithm, params)
+            times.append(time.perf_counter() - started)
+
+        return statistics.median(times)
+
+    def calibrate_pbkdf2(self, target: float) -> dict:
+        """
+        The time is about proportional to the iterations. The second step corrects for the fixed overhead of the
+        hashing pool, the iterations are rounded to thousands
+        """
+
+        iterations = settings.HASHING_SETTINGS["PBKDF2_ITERATIONS"]
+
+        for _ in range(2):
+            elapsed = self.measure("pbkdf2_sha256", {"i": iterations})
+            iterations = max(int(round(iterations * target / elapsed, -3)), 10_000)
+
+        return {"i": iterations}
+
+    def calibrate_scrypt(self, target: float, r: int, p: int, max_n: int) -> dict:
+        """n must be a power of two, the largest one that takes no more than the target time is taken"""
+
+        n = 2 ** 10
+
+        while n * 2 <= max_n and self.measure("scrypt", {"n": n * 2, "r": r, "p": p}) <= target:
+            n *= 2
+
+        return {"n": n, "r": r, "p": p}
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.user.purge import purge_expired_tokens
+from config import settings
+
+
+class Command(BaseCommand):
+    help = "Delete the tokens and the secret keys older than REFRESH_TOKEN_LIFETIME in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.JWT_SETTINGS["PURGE_BATCH_SIZE"],
+                            help="Rows deleted in one transaction")
+        parser.add_argument("--sleep", type=float, default=settings.JWT_SETTINGS["PURGE_SLEEP"],
+                            help="Pause between the batches, in seconds")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["sleep"] < 0:
+            raise CommandError("The batch size must be positive and the pause must not be negative.")
+
+        deleted = purge_expired_tokens(batch_size=options["batch_size"], sleep=options["sleep"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted['tokens']} expired tokens and {deleted['secret_keys']} secret keys."
+        ))
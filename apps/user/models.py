@@ -23,9 +23,25 @@ class User(AbstractUser):
     class Meta:
         verbose_name = _("User")
         verbose_name_plural = _("Users")
+        # The users ordered by their sign up time of sql_request
+        indexes = [models.Index(fields=["created_in"], name="user_created_in_idx")]
 
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        from .auth.cache import forget_user
+
+        super().save(*args, **kwargs)
+        forget_user(self.id)
+
+    def delete(self, *args, **kwargs):
+        from .auth.cache import forget_user
+
+        user_id = self.id
+        result = super().delete(*args, **kwargs)
+        forget_user(user_id)
+        return result
+
     def get_absolute_url(self):
         return reverse('user-detail', kwargs={'username': self.username})
\ No newline at end of file
@@ -0,0 +1,61 @@
+import time
+import datetime
+
+from django.db import transaction
+from django.db.models import Model, Q
+from django.utils import timezone
+
+from .auth import models as auth_models
+from config import settings
+
+
+def delete_batch(model: type[Model], threshold: datetime.datetime, after: tuple | None,
+                 batch_size: int) -> tuple[int, tuple | None]:
+    """
+    Delete the next batch of rows created before the threshold, in the order of (created, id).
+    Returns the number of deleted rows and the key of the last row of the batch to continue after it,
+    None after the last batch.
+    """
+
+    queryset = model.objects.filter(created__lt=threshold)
+
+    if after is not None:
+        queryset = queryset.filter(Q(created__gt=after[0]) | Q(created=after[0], id__gt=after[1]))
+
+    keys = list(queryset.order_by("created", "id").values_list("created", "id")[:batch_size])
+
+    if not keys:
+        return 0, None
+
+    with transaction.atomic():
+        # A token issued again since the select has a new created and stays
+        deleted, _ = model.objects.filter(id__in=[id for _, id in keys], created__lt=threshold).delete()
+
+    return deleted, keys[-1] if len(keys) == batch_size else None
+
+
+def purge_expired_tokens(batch_size: int | None = None, sleep: float | None = None) -> dict:
+    """
+    Delete the tokens and the secret keys older than REFRESH_TOKEN_LIFETIME in small batches with short
+    transactions and a pause between them, so that the sign ins are not blocked by long locks.
+    A secret key is issued together with its token, so it expires with it.
+    """
+
+    batch_size = batch_size or settings.JWT_SETTINGS["PURGE_BATCH_SIZE"]
+    sleep = settings.JWT_SETTINGS["PURGE_SLEEP"] if sleep is None else sleep
+    threshold = timezone.now() - settings.JWT_SETTINGS["REFRESH_TOKEN_LIFETIME"]
+    deleted = {}
+
+    for name, model in (("tokens", auth_models.JWTToken), ("secret_keys", auth_models.SecretKey)):
+        deleted[name], after = 0, None
+
+        while True:
+            count, after = delete_batch(model, threshold, after, batch_size)
+            deleted[name] += count
+
+            if after is None:
+                break
+
+            time.sleep(sleep)
+
+    return deleted
@@ -1,11 +1,17 @@
 import jwt
+import hmac
 import string
 import secrets
 import hashlib
 
 from random import choice
 
-from . import db_queries
+from django.core import signing
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from . import db_queries, hashing
+from .auth import cache as auth_cache
 from config import settings
 
 
@@ -16,30 +22,95 @@ def create_salt(length: int = 12) -> hex:
     return "".join(choice(string.ascii_letters) for _ in range(length))
 
 
-def password_hashing(password: str, salt: str | None = None) -> hex:
-    """Hashing the user password"""
+# Hashes of the old "salt$hash" format, without the algorithm and the parameters
+LEGACY_ALGORITHM = "pbkdf2_sha256"
+LEGACY_PARAMS = {"i": 100_000}
+
+
+def get_hasher_params(algorithm: str) -> dict:
+    """The current parameters of a password hashing algorithm"""
+
+    if algorithm == "pbkdf2_sha256":
+        return {"i": settings.HASHING_SETTINGS["PBKDF2_ITERATIONS"]}
+    if algorithm == "scrypt":
+        return {"n": settings.HASHING_SETTINGS["SCRYPT_N"], "r": settings.HASHING_SETTINGS["SCRYPT_R"],
+                "p": settings.HASHING_SETTINGS["SCRYPT_P"]}
+
+    raise ValueError(f"Unknown password hashing algorithm: {algorithm}")
+
+
+def encode_params(params: dict) -> str:
+    return ",".join(f"{name}={value}" for name, value in params.items())
+
+
+def decode_params(params: str) -> dict:
+    return {name: int(value) for name, value in (param.split("=") for param in params.split(","))}
+
+
+def derive_key(password: str, salt: str, algorithm: str, params: dict) -> bytes:
+    """Run a password hashing algorithm in the hashing pool"""
+
+    if algorithm == "pbkdf2_sha256":
+        return hashing.pool.run(hashlib.pbkdf2_hmac, "sha256", password.encode(), salt.encode(), params["i"])
+    if algorithm == "scrypt":
+        # scrypt needs 128 * n * r bytes, with a margin over it
+        maxmem = 256 * params["n"] * params["r"] + 1024 * 1024
+        return hashing.pool.run(hashlib.scrypt, password.encode(), salt=salt.encode(), n=params["n"],
+                                r=params["r"], p=params["p"], maxmem=maxmem, dklen=32)
+
+    raise ValueError(f"Unknown password hashing algorithm: {algorithm}")
+
+
+def password_hashing(password: str, salt: str | None = None, algorithm: str | None = None,
+                     params: dict | None = None) -> hex:
+    """Hashing the user password, with the current algorithm and parameters by default"""
 
     if not salt:
         salt = create_salt()
 
-    enc = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), 100_000)
+    algorithm = algorithm or settings.HASHING_SETTINGS["ALGORITHM"]
+    params = params or get_hasher_params(algorithm)
+
+    return derive_key(password, salt, algorithm, params).hex()
+
 
-    return enc.hex()
+def parse_hashed_password(hashed_password: str) -> tuple[str, dict, str, str]:
+    """Split a hashed_password field into the algorithm, the parameters, the salt and the hash"""
+
+    parts = hashed_password.split("$")
+
+    if len(parts) == 2:
+        return LEGACY_ALGORITHM, LEGACY_PARAMS, *parts
+
+    algorithm, params, salt, hashed = parts
+    return algorithm, decode_params(params), salt, hashed
 
 
 def validate_password(password: str, hashed_password: str) -> bool:
     """Check if the password matches the hashed password from database"""
 
-    salt, hashed = hashed_password.split("$")
-    return password_hashing(password, salt) == hashed
+    algorithm, params, salt, hashed = parse_hashed_password(hashed_password)
+    return hmac.compare_digest(password_hashing(password, salt, algorithm, params), hashed)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Check if the password is hashed with an old format, algorithm or parameters"""
 
+    if hashed_password.count("$") != 3:
+        return True
 
-def create_hashed_password(password: str) -> str:
-    """Create a hashed_password field of a User model instance"""
+    algorithm, params, _, _ = parse_hashed_password(hashed_password)
+    return algorithm != settings.HASHING_SETTINGS["ALGORITHM"] or params != get_hasher_params(algorithm)
 
-    salt = create_salt()
-    hashed = password_hashing(password, salt)
-    return f"{salt}${hashed}"
+
+def create_hashed_password(password: str, salt: str | None = None) -> str:
+    """Create a hashed_password field of a User model instance: algorithm$params$salt$hash"""
+
+    salt = salt or create_salt()
+    algorithm = settings.HASHING_SETTINGS["ALGORITHM"]
+    params = get_hasher_params(algorithm)
+    hashed = password_hashing(password, salt, algorithm, params)
+    return f"{algorithm}${encode_params(params)}${salt}${hashed}"
 
 
 # action to JWT token
@@ -53,21 +124,65 @@ def create_user_secret_key(user_id: int) -> hex:
     return secret_key
 
 
-def create_jwttoken(user_id: int):
-    """Create a JWTToken model instance"""
+def get_signing_key(secret_key: str) -> str:
+    """
+    The key of the tokens of a user, derived from the server SECRET_KEY and the secret key of the user.
+    A new secret key invalidates the previous tokens, the tokens can not be signed without the server secret.
+    """
+
+    return salted_hmac("apps.user.jwt", secret_key).hexdigest()
+
 
-    _secret_key = create_user_secret_key(user_id=user_id)
+def encode_jwttokens(user_id: int, secret_key: str) -> tuple[str, str]:
+    """Encode an access and a refresh token of a user"""
+
+    now = timezone.now()
     _access_token= jwt.encode(
-        payload={settings.JWT_SETTINGS["USER_ID_CLAIM"]: user_id, "type_token": "access"},
-        key=_secret_key, 
+        payload={settings.JWT_SETTINGS["USER_ID_CLAIM"]: user_id, "type_token": "access", "iat": now,
+                 "exp": now + settings.JWT_SETTINGS["ACCESS_TOKEN_LIFETIME"]},
+        key=get_signing_key(secret_key), 
         algorithm=settings.JWT_SETTINGS["ALGORITHM"]
     )
     _refresh_token= jwt.encode(
-        payload={settings.JWT_SETTINGS["USER_ID_CLAIM"]: user_id, "type_token": "refresh"}, 
-        key=_secret_key, 
+        payload={settings.JWT_SETTINGS["USER_ID_CLAIM"]: user_id, "type_token": "refresh", "iat": now,
+                 "exp": now + settings.JWT_SETTINGS["REFRESH_TOKEN_LIFETIME"]}, 
+        key=get_signing_key(secret_key), 
         algorithm=settings.JWT_SETTINGS["ALGORITHM"]
     )
 
-    query = db_queries.create_jwttoken(access_token=_access_token, refresh_token=_refresh_token, user_id=user_id)
+    return _access_token, _refresh_token
+
+
+def create_jwttoken(user_id: int):
+    """Create a JWTToken model instance"""
+
+    _secret_key = secrets.token_hex()
+    _access_token, _refresh_token = encode_jwttokens(user_id, _secret_key)
+
+    query = db_queries.issue_jwttoken(secret_key=_secret_key, access_token=_access_token,
+                                      refresh_token=_refresh_token, user_id=user_id)
+    # After the write, so that the previous secret key and token can not be cached again in between
+    auth_cache.forget_user(user_id)
+
+    return query
+
+
+# action to reset password
+def get_reset_password_signer(user) -> signing.TimestampSigner:
+    # The password hash is a part of the salt, a token stops working once the password is changed
+    return signing.TimestampSigner(salt=f"apps.user.reset-password:{user.hashed_password}")
+
+
+def create_reset_password_token(user) -> str:
+    """The token of the reset password link of a user, valid for PASSWORD_RESET_TIMEOUT and for a single reset"""
+
+    return get_reset_password_signer(user).sign(str(user.id))
+
+
+def check_reset_password_token(user, token: str) -> bool:
+    try:
+        user_id = get_reset_password_signer(user).unsign(token, max_age=settings.PASSWORD_RESET_TIMEOUT)
+    except signing.BadSignature:
+        return False
 
-    return query
\ No newline at end of file
+    return str(user.id) == user_id
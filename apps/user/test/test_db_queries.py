@@ -1,3 +1,6 @@
+from unittest import skipUnless
+
+from django.db import connection
 from rest_framework.test import APITestCase
 from rest_framework.exceptions import AuthenticationFailed
 
@@ -37,26 +40,6 @@ class TestGetUserByEmailFunction(APITestCase):
         self.assertIsNone(response, response)
 
 
-class TestGetUserIdBySecretKeyFunction(APITestCase):
-    """Testing get_user_id_by_secret_key function"""
-
-    fixtures = ["./config/test/test_data.json"]
-
-    @classmethod
-    def setUpClass(cls) -> None:
-        super().setUpClass()
-        cls.instance = auth_models.SecretKey.objects.get(id=1)
-
-    def test_existing_user_id(self):
-        response = db_queries.get_user_id_by_secret_key(self.instance.key)
-        self.assertIsNotNone(response, response)
-        assert 2 == response, response
-    
-    def test_non_existent_user_id(self):
-        response = db_queries.get_user_id_by_secret_key(f"{self.instance.key}1")
-        self.assertIsNone(response, response)
-
-
 class TestChangePasswordFunction(APITestCase):
     """Testing change_password function"""
 
@@ -215,3 +198,37 @@ class TestCreateJWTTokenFunction(APITestCase):
         self.assertTrue(secret_key,secret_key)
         assert "access_token" == response.access_token, response.access_token
         assert 3 == count_instance, count_instance
+
+
+class TestIssueJWTTokenFunction(APITestCase):
+    """Testing issue_jwttoken function"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    def test_update_instance(self):
+        instance = auth_models.JWTToken.objects.get(user__id=3)
+
+        response = db_queries.issue_jwttoken("secret_key", "access_token", "refresh_token", 3)
+        assert instance.id == response.id, response.id
+        assert 2 == auth_models.JWTToken.objects.count()
+        assert 3 == auth_models.SecretKey.objects.count()
+
+        token = auth_models.JWTToken.objects.get(user__id=3)
+        assert ("access_token", "refresh_token", response.created) == \
+            (token.access_token, token.refresh_token, token.created), token
+        assert "secret_key" == auth_models.SecretKey.objects.get(user__id=3).key
+
+    def test_create_instance(self):
+        response = db_queries.issue_jwttoken("secret_key", "access_token", "refresh_token", 1)
+        assert 3 == auth_models.JWTToken.objects.count()
+        assert 4 == auth_models.SecretKey.objects.count()
+        assert response.id == auth_models.JWTToken.objects.get(user__id=1).id, response.id
+
+        response = db_queries.issue_jwttoken("secret_key_2", "access_token_2", "refresh_token_2", 1)
+        assert 3 == auth_models.JWTToken.objects.count(), "the token of the user must be replaced"
+        assert "secret_key_2" == auth_models.SecretKey.objects.get(user__id=1).key
+
+    @skipUnless(connection.vendor == "postgresql", "INSERT ... ON CONFLICT of both tables is Postgres only")
+    def test_single_statement(self):
+        with self.assertNumQueries(1):
+            db_queries.issue_jwttoken("secret_key", "access_token", "refresh_token", 1)
@@ -0,0 +1,108 @@
+import smtplib
+import itertools
+
+from unittest import mock
+
+import pytest
+
+from celery.exceptions import Retry
+from django.core.cache import caches
+from django.test import override_settings
+
+from config import settings
+from apps.user import emails
+from apps.user.celery_tasks import tasks
+from benchmarks.stand_in import SMTPStandInServer
+
+
+outbox_queues = itertools.count()
+
+
+@pytest.fixture
+def server():
+    with SMTPStandInServer() as server, override_settings(
+        EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend", EMAIL_HOST="127.0.0.1",
+        EMAIL_PORT=server.port, EMAIL_USE_TLS=False, EMAIL_HOST_USER="", EMAIL_HOST_PASSWORD="",
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    ), mock.patch.dict(settings.EMAIL_SETTINGS, {"OUTBOX_URL": "memory://",
+                                                 "OUTBOX_QUEUE": f"email-outbox-{next(outbox_queues)}"}):
+        caches["default"].clear()
+        yield server
+
+
+def queue_emails(*recipients: str) -> None:
+    for recipient in recipients:
+        emails.queue_email("Subject", "Message", "<p>Message</p>", recipient)
+
+
+def test_send_outbox(server: SMTPStandInServer):
+    """Testing the send_outbox function sends a batch over a single connection"""
+
+    queue_emails(*(f"user{i}@example.com" for i in range(5)))
+    outcomes = emails.send_outbox(batch_size=2)
+
+    assert {"sent": 5, "batches": 3} == outcomes, outcomes
+    assert 3 == server.connections, server.connections
+    assert [[f"user{i}@example.com"] for i in range(5)] == [recipients for _, recipients, _ in server.messages]
+    assert {} == emails.send_outbox(), "the outbox must be empty"
+
+
+def test_send_reset_password(server: SMTPStandInServer):
+    """Testing the reset password emails of a batch window are flushed once"""
+
+    with mock.patch.object(tasks.flush_email_outbox, "apply_async") as apply_async:
+        tasks.send_reset_password("user1@example.com", "key1")
+        tasks.send_reset_password("user2@example.com", "key2")
+
+    apply_async.assert_called_once_with(countdown=settings.EMAIL_SETTINGS["BATCH_WINDOW"])
+    assert 0 == server.connections, "the emails must wait for the end of the window"
+
+    tasks.flush_email_outbox.apply()
+
+    assert 1 == server.connections, server.connections
+    assert b"key2" in server.messages[1][2], server.messages[1][2]
+
+
+def test_transient_error(server: SMTPStandInServer):
+    """Testing the emails go back to the outbox after a transient error"""
+
+    queue_emails("user1@example.com", "user2@example.com", "user3@example.com")
+    server.fail_next = 1
+
+    with pytest.raises(smtplib.SMTPSenderRefused) as error:
+        emails.send_outbox()
+
+    assert emails.is_transient(error.value)
+    assert {"sent": 3, "batches": 1} == emails.send_outbox()
+
+
+def test_rejected_recipient(server: SMTPStandInServer):
+    """Testing a rejected email is dropped and the rest of the batch is sent"""
+
+    queue_emails("user1@example.com", "unknown@example.com", "user2@example.com")
+    server.rejected.add("unknown@example.com")
+
+    outcomes = emails.send_outbox()
+
+    assert {"sent": 2, "rejected": 1, "batches": 1} == outcomes, outcomes
+    assert 1 == server.connections, server.connections
+    assert {} == emails.send_outbox(), "a rejected email must not be sent again"
+
+
+def test_flush_email_outbox_backoff():
+    """Testing a transient error is retried with a backoff"""
+
+    error = smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+    with mock.patch.object(emails, "send_outbox", side_effect=error), \
+            mock.patch.object(tasks.flush_email_outbox, "retry", side_effect=Retry) as retry:
+        tasks.flush_email_outbox.apply()
+
+    backoff = settings.EMAIL_SETTINGS["RETRY_BACKOFF"]
+    assert backoff / 2 <= retry.call_args.kwargs["countdown"] <= backoff, retry.call_args
+
+    with mock.patch.object(emails, "send_outbox", side_effect=smtplib.SMTPAuthenticationError(535, b"")), \
+            mock.patch.object(tasks.flush_email_outbox, "retry") as retry:
+        result = tasks.flush_email_outbox.apply()
+
+    assert not retry.called and isinstance(result.result, smtplib.SMTPAuthenticationError), result.result
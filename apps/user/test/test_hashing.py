@@ -0,0 +1,98 @@
+import os
+import hashlib
+import threading
+
+from unittest import mock
+
+import pytest
+
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from concurrent.futures.process import BrokenProcessPool
+
+from config import settings
+from apps.user import hashing
+
+
+def test_run_in_process_pool():
+    """Testing the HashingPool class hashes in the pool of processes and counts it"""
+
+    pool = hashing.HashingPool()
+
+    try:
+        response = pool.run(hashlib.pbkdf2_hmac, "sha256", b"password", b"salt", 1000)
+    finally:
+        pool.shutdown()
+
+    assert hashlib.pbkdf2_hmac("sha256", b"password", b"salt", 1000) == response, response
+
+    stats = pool.get_stats()
+    assert 1 == stats["hashes"] and 0 == stats["in_flight"] and 0 == stats["waiting"], stats
+    assert stats["latency_avg"] >= stats["queue_wait_avg"], stats
+
+
+@mock.patch.dict(settings.HASHING_SETTINGS, {"EXECUTOR": "process", "WORKERS": 1})
+def test_run_replaces_broken_pool():
+    """Testing the HashingPool class creates a new pool of processes after a worker has died"""
+
+    pool = hashing.HashingPool()
+
+    try:
+        worker = pool.run(os.getpid)
+
+        with pytest.raises(BrokenProcessPool):
+            pool.run(os._exit, 1)
+
+        response = pool.run(os.getpid)
+    finally:
+        pool.shutdown()
+
+    assert worker != response, "the hash must run in a new worker process"
+    assert 0 == pool.get_stats()["in_flight"], pool.get_stats()
+
+
+@mock.patch.dict(settings.HASHING_SETTINGS, {"EXECUTOR": "inline", "MAX_IN_FLIGHT": 1, "QUEUE_TIMEOUT": 0.05})
+def test_run_rejects_when_busy():
+    """Testing a hash waits at most QUEUE_TIMEOUT for its turn"""
+
+    pool = hashing.HashingPool()
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=pool.run, args=(hold,))
+    thread.start()
+    started.wait(5)
+
+    try:
+        assert 1 == pool.get_stats()["in_flight"]
+
+        with pytest.raises(hashing.HashingBusy):
+            pool.run(hashlib.sha256, b"password")
+    finally:
+        release.set()
+        thread.join()
+
+    stats = pool.get_stats()
+    assert 1 == stats["rejected"] and 1 == stats["hashes"], stats
+    assert b"password" == pool.run(bytes, b"password"), "a free slot must be taken again"
+
+
+class TestHashingBusy(APITestCase):
+    """Testing a busy hashing pool returns 503"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    def test_sign_in(self):
+        with mock.patch.object(hashing.pool, "run", side_effect=hashing.HashingBusy):
+            response = self.client.post(reverse("sign-in"), {"email": "admin@mail.ru", "password": "admin"})
+
+        assert 503 == response.status_code, response.data
+        assert "The server is busy, try again later." == response.data["detail"], response.data
+
+    def test_hashing_stats(self):
+        response = self.client.get(reverse("hashing-stats"))
+        assert 401 == response.status_code, response.data
@@ -56,11 +56,11 @@ class TestResetPasswordViewPermission(APITestCase):
 
         cls.user = models.User.objects.get(id=3)
         cls.token = services.create_jwttoken(cls.user.id)
-        cls.secret_key = auth.models.SecretKey.objects.get(id=2)
 
         cls.request = APIRequestFactory()
         cls.client = APIClient()
-        cls.url_1 = reverse("reset-password", kwargs={"email": cls.user.email, 'secret_key': cls.secret_key.key})
+        cls.url_1 = reverse("reset-password", kwargs={"email": cls.user.email,
+                                                      "token": services.create_reset_password_token(cls.user)})
         
         cls.type_token = settings.JWT_SETTINGS["AUTH_HEADER_TYPES"]
 
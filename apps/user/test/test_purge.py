@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from config import settings
+from apps.user import db_queries, models, purge, services
+from apps.user.auth import models as auth_models
+
+
+class TestPurgeExpiredTokens(APITestCase):
+    """Testing the purge_expired_tokens function"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    def setUp(self) -> None:
+        expired = timezone.now() - settings.JWT_SETTINGS["REFRESH_TOKEN_LIFETIME"] - timedelta(minutes=1)
+
+        for user_id in (1, 2, 3, 4):
+            services.create_jwttoken(user_id)
+
+        auth_models.JWTToken.objects.filter(user_id__in=(1, 2, 3)).update(created=expired)
+        auth_models.SecretKey.objects.filter(user_id__in=(1, 2, 3)).update(created=expired)
+
+    def test_purge_expired_tokens(self):
+        with mock.patch.object(purge.time, "sleep") as sleep:
+            deleted = purge.purge_expired_tokens(batch_size=2, sleep=0.5)
+
+        assert {"tokens": 3, "secret_keys": 3} == deleted, deleted
+        assert [4] == list(auth_models.JWTToken.objects.values_list("user_id", flat=True))
+        assert [4] == list(auth_models.SecretKey.objects.values_list("user_id", flat=True))
+        assert [mock.call(0.5)] * 2 == sleep.call_args_list, "a pause must follow every full batch"
+
+    def test_token_issued_again(self):
+        """Testing a token issued again after the select of its batch stays"""
+
+        threshold = timezone.now() - settings.JWT_SETTINGS["REFRESH_TOKEN_LIFETIME"]
+        atomic = transaction.atomic
+
+        def issue_then_atomic():
+            services.create_jwttoken(1)
+            return atomic()
+
+        with mock.patch.object(purge, "transaction") as purge_transaction:
+            purge_transaction.atomic.side_effect = issue_then_atomic
+            deleted, after = purge.delete_batch(auth_models.JWTToken, threshold, None, 10)
+
+        assert 2 == deleted, deleted
+        assert after is None, after
+        assert auth_models.JWTToken.objects.filter(user_id=1).exists(), "the new token must stay"
+
+    def test_command(self):
+        call_command("purge_expired_tokens", sleep=0, stdout=mock.Mock())
+        assert 1 == auth_models.JWTToken.objects.count()
+
+    def test_reset_password_after_purge(self):
+        """Testing a user whose secret key has been purged can reset the password"""
+
+        purge.purge_expired_tokens(sleep=0)
+        assert db_queries.get_secret_key(1) is None
+
+        with mock.patch("apps.user.views.send_reset_password.delay") as delay:
+            response = self.client.post(reverse("try-to-reset-password"), {"email": "admin@mail.ru"})
+
+        assert 200 == response.status_code, response.data
+        assert services.check_reset_password_token(models.User.objects.get(id=1), delay.call_args.args[1])
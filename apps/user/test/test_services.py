@@ -1,7 +1,14 @@
+import io
+import hashlib
+
+from unittest import mock
+
 import pytest
 
+from django.core.management import call_command
 from rest_framework.test import APITestCase
 
+from config import settings
 from apps.user import services, models
 from apps.user.auth import models as auth_models
 
@@ -53,11 +60,56 @@ def test_create_hashed_password(password: str):
     """Testing the create_hashed_password function"""
 
     response = services.create_hashed_password(password)
-    assert "$" in response, response
+    assert 3 == response.count("$"), response
 
-    salt, hashed_password = response.split("$")
+    algorithm, params, salt, hashed_password = response.split("$")
+    assert "pbkdf2_sha256" == algorithm, algorithm
+    assert "i=100000" == params, params
     assert 12 == len(salt), salt
     assert 64 == len(hashed_password)
+    assert services.validate_password(password, response), response
+    assert not services.validate_password(f"{password}1", response), response
+
+
+@mock.patch.dict(settings.HASHING_SETTINGS, {"ALGORITHM": "scrypt", "SCRYPT_N": 2 ** 10})
+def test_create_hashed_password_scrypt():
+    """Testing the create_hashed_password function with scrypt"""
+
+    response = services.create_hashed_password("password", salt="KtQrvyHOiHFU")
+    hashed_password = hashlib.scrypt(b"password", salt=b"KtQrvyHOiHFU", n=1024, r=8, p=1, dklen=32).hex()
+
+    assert f"scrypt$n=1024,r=8,p=1$KtQrvyHOiHFU${hashed_password}" == response, response
+    assert services.validate_password("password", response), response
+
+
+@pytest.mark.parametrize(
+    "hashed_password, output",
+    [
+        ("KtQrvyHOiHFU$b18f34385035abe98c305d63d2121ff72a8bca7385a7d217d1891a1c43d397ae", True),
+        ("pbkdf2_sha256$i=100000$KtQrvyHOiHFU$b18f34385035abe98c305d63d2121ff72a8bca7385a7d217d1891a1c43d397ae",
+         False),
+        ("pbkdf2_sha256$i=50000$KtQrvyHOiHFU$b18f34385035abe98c305d63d2121ff72a8bca7385a7d217d1891a1c43d397ae",
+         True),
+        ("scrypt$n=1024,r=8,p=1$KtQrvyHOiHFU$b18f34385035abe98c305d63d2121ff72a8bca7385a7d217d1891a1c43d397ae", True),
+    ]
+)
+def test_needs_rehash(hashed_password: str, output: bool):
+    """Testing the needs_rehash function"""
+
+    response = services.needs_rehash(hashed_password)
+    assert response == output, response
+
+
+def test_calibrate_hashing_command():
+    """Testing the calibrate_hashing command prints the parameters as environment variables"""
+
+    stdout = io.StringIO()
+    call_command("calibrate_hashing", algorithm="scrypt", target_ms=1, runs=1, stdout=stdout)
+    assert "HASHING_ALGORITHM=scrypt\nHASHING_SCRYPT_N=1024\n" in stdout.getvalue(), stdout.getvalue()
+
+    stdout = io.StringIO()
+    call_command("calibrate_hashing", algorithm="pbkdf2_sha256", target_ms=1, runs=1, stdout=stdout)
+    assert "HASHING_PBKDF2_ITERATIONS=10000" in stdout.getvalue(), stdout.getvalue()
 
 
 class TestCreateUserSecretKeyFunction(APITestCase):
@@ -144,3 +196,23 @@ class TestCreateJWTTokenFunction(APITestCase):
         assert 4 == new_count_auth_token_to_db, new_count_auth_token_to_db
         assert "JWTToken" == response.__class__.__name__, response.__class__.__name__
         assert 3 == response.user_id, response.user_id
+
+
+class TestResetPasswordToken(APITestCase):
+    """Testing the create_reset_password_token and check_reset_password_token functions"""
+
+    fixtures = ["./config/test/test_data.json"]
+
+    def test_check_reset_password_token(self):
+        user, other_user = models.User.objects.get(id=2), models.User.objects.get(id=1)
+        token = services.create_reset_password_token(user)
+
+        assert auth_models.SecretKey.objects.get(user=user).key not in token, "the secret key must not be disclosed"
+        assert services.check_reset_password_token(user, token), token
+        assert not services.check_reset_password_token(other_user, token), "a token is valid for its user only"
+
+        with mock.patch.object(settings, "PASSWORD_RESET_TIMEOUT", -1):
+            assert not services.check_reset_password_token(user, token), "a token expires"
+
+        user.hashed_password = services.create_hashed_password("newpassword")
+        assert not services.check_reset_password_token(user, token), "a token is valid until the password is changed"
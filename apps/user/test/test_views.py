@@ -1,8 +1,11 @@
 import json
 
+from unittest import mock
+
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient, APITestCase
 
+from config import settings
 from apps.user import models, services
 from apps.user.auth import models as auth_models
 
@@ -55,6 +58,27 @@ class TestSignInView(APITestCase):
         valid_resposne = self.client.post(path=self.path, data={"email": "admin@mail.ru", "password": "karmavdele"})
         assert valid_resposne.status_code == 201, valid_resposne.status_code
 
+    def test_rehash_password(self):
+        """Testing an outdated hash is replaced with the current algorithm and parameters on sign in"""
+
+        data = {"email": "admin@mail.ru", "password": "karmavdele"}
+        assert services.needs_rehash(models.User.objects.get(id=1).hashed_password), "the fixture hash is legacy"
+
+        response = self.client.post(path=self.path, data=data)
+        assert response.status_code == 201, response.status_code
+
+        hashed_password = models.User.objects.get(id=1).hashed_password
+        assert hashed_password.startswith("pbkdf2_sha256$i=100000$"), hashed_password
+        assert services.validate_password("karmavdele", hashed_password), hashed_password
+
+        with mock.patch.dict(settings.HASHING_SETTINGS, {"ALGORITHM": "scrypt", "SCRYPT_N": 2 ** 10}):
+            response = self.client.post(path=self.path, data=data)
+            assert response.status_code == 201, response.status_code
+
+            hashed_password = models.User.objects.get(id=1).hashed_password
+            assert hashed_password.startswith("scrypt$n=1024,r=8,p=1$"), hashed_password
+            assert not services.needs_rehash(hashed_password)
+
 
 class TestSignUpView(APITestCase):
     """Testing the SignUpView endpoint methods"""
@@ -284,13 +308,13 @@ class TestResetPasswordView(APITestCase):
         cls.user = models.User.objects.get(id=3)
         cls.user_1 = models.User.objects.get(id=1)
         cls.jwt_token = auth_models.JWTToken.objects.get(id=1)
-        cls.secret_key = auth_models.SecretKey.objects.get(id=2)
-        cls.secret_key_1 = auth_models.SecretKey.objects.get(id=1)
 
         cls.client = APIClient()
 
-        cls.path = reverse("reset-password", kwargs={"email": cls.user.email, 'secret_key': cls.secret_key.key})
-        cls.path_1 = reverse("reset-password", kwargs={"email": cls.user_1.email, "secret_key": cls.secret_key_1.key})
+        cls.path = reverse("reset-password", kwargs={"email": cls.user.email,
+                                                     "token": services.create_reset_password_token(cls.user)})
+        cls.path_1 = reverse("reset-password", kwargs={"email": cls.user_1.email,
+                                                       "token": services.create_reset_password_token(cls.user_1)})
         cls.valid_data = {
             "new_password": "karmavdele1",
             "confirm_password": "karmavdele1"
@@ -9,6 +9,7 @@ urlpatterns = [
     path("profile/try_to_reset_password/", views.TryToResetPasswordView.as_view(), name="try-to-reset-password"),
     path("profile/<slug:username>/", views.ProfileView.as_view(), name="user-detail"),
     path("token/refresh/", views.RefreshTokenView.as_view(), name="refresh-tokens"),
-    path("reset_password/<str:email>/<str:secret_key>/", views.ResetPasswordView.as_view(), name="reset-password"),
+    path("reset_password/<str:email>/<str:token>/", views.ResetPasswordView.as_view(), name="reset-password"),
     path("profile/<slug:username>/change_password/", views.ChangePasswordView.as_view(), name="change-password"),
+    path("hashing_stats/", views.hashing_stats, name="hashing-stats"),
 ]
\ No newline at end of file
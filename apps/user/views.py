@@ -1,12 +1,12 @@
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
-from rest_framework import generics, response, status, views
+from rest_framework import decorators, generics, response, status, views
 from rest_framework.exceptions import ValidationError, AuthenticationFailed
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 
-from . import models, serializers, services, permissions, db_queries
+from . import models, serializers, services, permissions, db_queries, hashing
 from .celery_tasks import send_reset_password
 from config import settings
 
@@ -17,7 +17,11 @@ class SignInView(generics.CreateAPIView):
     serializer_class = serializers.SignInSerializer
     authentication_classes = []
 
-    @swagger_auto_schema(responses={201: serializers.BaseJWTTokenSerializer}, tags=["auth"], security=[{}])
+    @swagger_auto_schema(
+        responses={201: serializers.BaseJWTTokenSerializer, 503: '{"detail": "The server is busy, try again later."}'},
+        tags=["auth"],
+        security=[{}],
+    )
     def post(self, request, *args, **kwargs):
         error = AuthenticationFailed(detail="Incorrect email or password.", code=status.HTTP_400_BAD_REQUEST)
 
@@ -32,11 +36,22 @@ class SignInView(generics.CreateAPIView):
         if not user.is_active:
             raise AuthenticationFailed(detail="Inactivate user.", code=status.HTTP_400_BAD_REQUEST)
 
+        if services.needs_rehash(user.hashed_password):
+            self.rehash_password(user, request.data["password"])
+
         token = services.create_jwttoken(user_id=user.id)
         serializer = serializers.BaseJWTTokenSerializer(token)
 
         return response.Response(data=serializer.data, status=status.HTTP_201_CREATED)
 
+    def rehash_password(self, user: models.User, password: str) -> None:
+        """Hash the password with the current algorithm and parameters, on the next sign in if it is busy now"""
+
+        try:
+            db_queries.change_password(user.id, services.create_hashed_password(password))
+        except hashing.HashingBusy:
+            pass
+
 
 class SignUpView(generics.CreateAPIView):
     """Sign up endpoint"""
@@ -44,7 +59,11 @@ class SignUpView(generics.CreateAPIView):
     serializer_class = serializers.SignUpSerializer
     authentication_classes = []
 
-    @swagger_auto_schema(responses={201: serializers.BaseJWTTokenSerializer}, tags=["auth"], security=[{}])
+    @swagger_auto_schema(
+        responses={201: serializers.BaseJWTTokenSerializer, 503: '{"detail": "The server is busy, try again later."}'},
+        tags=["auth"],
+        security=[{}],
+    )
     def post(self, request, *args, **kwargs):
         return super().post(request, *args, **kwargs)
 
@@ -145,14 +164,14 @@ class ResetPasswordView(generics.UpdateAPIView):
     lookup_field = "email"
 
     def update(self, request, *args, **kwargs):
-        user_id_by_secret_key = db_queries.get_user_id_by_secret_key(request.path.split("/")[-2])
-        if user_id_by_secret_key is None:
-            raise AuthenticationFailed(_("No user with such secret key."))
+        user = db_queries.get_user_by_email(self.kwargs["email"])
+        if user is None or not services.check_reset_password_token(user, self.kwargs["token"]):
+            raise AuthenticationFailed(_("Invalid or expired reset password link."))
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         hashed_password = services.create_hashed_password(serializer.data["new_password"])
-        self.perform_update(user_id_by_secret_key, hashed_password)
+        self.perform_update(user.id, hashed_password)
         return response.Response({"new_password": hashed_password}, status=status.HTTP_200_OK)
 
     def perform_update(self, user_id: int, hashed_password: str):
@@ -200,11 +219,15 @@ class TryToResetPasswordView(generics.CreateAPIView):
         if user is None:
             raise error
 
-        secret_key = db_queries.get_secret_key(user.id)
+        # Not the secret key of the user, the tokens are signed with it
+        send_reset_password.delay(user.email, services.create_reset_password_token(user))
 
-        if secret_key is None:
-            raise error
+        return response.Response({"detail": "Check you email."}, status=status.HTTP_200_OK)
 
-        send_reset_password.delay(user.email, secret_key.key)
 
-        return response.Response({"detail": "Check you email."}, status=status.HTTP_200_OK)
+@decorators.api_view(["GET"])
+@decorators.permission_classes([IsAdminUser])
+def hashing_stats(request):
+    """Queue depth, queue wait and latency counters of the password hashing of the current process"""
+
+    return response.Response(hashing.pool.get_stats())
@@ -0,0 +1,56 @@
+"""
+Time the thumbnails of a large photo and compare their size with the original image.
+
+Run from the project root:
+
+    python -m benchmarks.bench_images --width 6720 --height 4480
+"""
+
+import io
+import os
+import time
+import argparse
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from PIL import Image, ImageFilter
+
+from apps.main import images
+
+
+def make_photo(width: int, height: int) -> bytes:
+    """A noisy JPEG, close to a real photo in size"""
+
+    image = Image.effect_noise((width, height), 64).convert("RGB").filter(ImageFilter.GaussianBlur(2))
+    buffer = io.BytesIO()
+    image.save(buffer, format="jpeg", quality=90)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=6720)
+    parser.add_argument("--height", type=int, default=4480)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = make_photo(args.width, args.height)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        thumbnails = images.make_thumbnails(content)
+    elapsed = (time.perf_counter() - start) / args.repeat
+
+    print(f"original: {args.width}x{args.height}, {len(content) / 1024:.0f} KiB")
+    print(f"thumbnails: {elapsed * 1000:.0f} ms per image")
+
+    for name, formats in thumbnails.items():
+        sizes = ", ".join(f"{format} {len(data) / 1024:.1f} KiB" for format, data in formats.items())
+        print(f"  {name}: {sizes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare memory and CPU per page of opengraph_py3 (full BeautifulSoup parse)
+with the streaming <head> parser on the saved pages in benchmarks/fixtures.
+
+Every page is inflated to each of the given body sizes. Run from the project root:
+
+    python -m benchmarks.bench_metadata_parser --sizes 50000 1000000 5000000
+"""
+
+import gc
+import time
+import argparse
+import tracemalloc
+import warnings
+
+from pathlib import Path
+
+import opengraph_py3
+
+from apps.main.metadata_parser import parse_metadata
+
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+PARAGRAPH = "<p>Lorem ipsum dolor sit amet, <a href='#'>consectetur</a> adipiscing elit.</p>\n"
+
+
+def load_page(path: Path, size: int) -> bytes:
+    body = PARAGRAPH * (size // len(PARAGRAPH))
+    return path.read_text().replace("{body}", body).encode()
+
+
+def opengraph_extractor(url: str, html: bytes, chunk_size: int, max_bytes: int) -> dict:
+    data = opengraph_py3.OpenGraph(html=html, scrape=True)
+    return dict(data, url=data.get("url") or url)
+
+
+def head_extractor(url: str, html: bytes, chunk_size: int, max_bytes: int) -> dict:
+    chunks = (html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+    return parse_metadata(url, chunks, max_bytes)
+
+
+def measure(extractor, url: str, html: bytes, chunk_size: int, max_bytes: int) -> tuple[dict, float, int]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.process_time()
+    data = extractor(url, html, chunk_size, max_bytes)
+    cpu = time.process_time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return data, cpu, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50_000, 1_000_000, 5_000_000])
+    parser.add_argument("--chunk-size", type=int, default=16 * 1024)
+    parser.add_argument("--max-bytes", type=int, default=512 * 1024)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    print(f"{'page':<14}{'size':>10} | {'opengraph cpu':>14}{'peak mem':>11} | {'head cpu':>9}{'peak mem':>11} | same")
+
+    for path in sorted(FIXTURES.glob("*.html")):
+        for size in args.sizes:
+            html = load_page(path, size)
+            url = f"https://example.com/{path.stem}"
+            old, old_cpu, old_peak = measure(opengraph_extractor, url, html, args.chunk_size, args.max_bytes)
+            new, new_cpu, new_peak = measure(head_extractor, url, html, args.chunk_size, args.max_bytes)
+            same = [key for key in ("title", "description", "image", "type", "url") if old.get(key) == new.get(key)]
+
+            print(
+                f"{path.stem:<14}{len(html):>10} | {old_cpu * 1000:>12.1f}ms{old_peak / 2 ** 20:>9.1f}MB"
+                f" | {new_cpu * 1000:>7.1f}ms{new_peak / 2 ** 20:>9.2f}MB | {len(same)}/5"
+            )
+
+
+if __name__ == "__main__":
+    main()
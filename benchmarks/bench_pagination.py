@@ -0,0 +1,95 @@
+"""
+Compare the latency of the first and a deep page of GET /links/ with the page number and the keyset pagination.
+The cursor of the deep page is built from the last row of the page before it, as a client that follows the next
+links would get it.
+
+A test database is created on the database of the settings, seeded with the scale data generator and dropped
+at the end. Run from the project root:
+
+    python -m benchmarks.bench_pagination --links 150000 --deep-page 10000
+"""
+
+import os
+import time
+import argparse
+import statistics
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from apps.main import models
+from apps.main.pagination import KeysetPagination
+from apps.main.scale_data import ScaleDataGenerator
+from apps.user.models import User
+
+
+def measure(client: APIClient, url: str, params: dict, repeat: int) -> float:
+    """Median latency of the request, in milliseconds"""
+
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, params)
+        times.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+
+    return statistics.median(times)
+
+
+def get_cursor(page: int) -> str:
+    """The cursor of a page of the keyset pagination, from the last row of the page before it"""
+
+    last = models.Link.objects.order_by("-created_in", "-id")[(page - 1) * api_settings.PAGE_SIZE - 1]
+    return KeysetPagination().make_cursor((last.created_in, last.id))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=150_000)
+    parser.add_argument("--deep-page", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.deep_page * api_settings.PAGE_SIZE > args.links:
+        parser.error(f"--links must be at least {args.deep_page * api_settings.PAGE_SIZE} for the deep page")
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        method = "copy" if connection.vendor == "postgresql" else "bulk_create"
+        ScaleDataGenerator(users=1000, collections=1000, links=args.links, batch_size=10_000, id_offset=1,
+                           method=method).generate()
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        client = APIClient()
+        client.force_authenticate(User.objects.first())
+        url = reverse("link-list")
+        cursor = get_cursor(args.deep_page)
+
+        print(f"{connection.vendor}, {args.links} links, page {args.deep_page}")
+
+        for name, first, deep in (
+            ("page number", {"page": 1}, {"page": args.deep_page}),
+            ("keyset", {"cursor": ""}, {"cursor": cursor}),
+        ):
+            first_ms = measure(client, url, first, args.repeat)
+            deep_ms = measure(client, url, deep, args.repeat)
+            print(f"  {name:>11}: page 1 {first_ms:7.1f} ms, page {args.deep_page} {deep_ms:7.1f} ms")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare the pages per second of the link and collection lists rendered by the serializers and by the row reader,
+from the queries to the JSON bytes, for pages of several sizes. Both outputs are checked to be identical.
+
+A test database is created on the database of the settings, seeded with the scale data generator and dropped
+at the end. Run from the project root:
+
+    python -m benchmarks.bench_read_path --links 20000 --sizes 15 100
+"""
+
+import os
+import time
+import argparse
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.main import models, serializers
+from apps.main.fieldsets import get_fieldset_columns, prune_queryset
+from apps.main.readers import get_row_reader
+from apps.main.scale_data import ScaleDataGenerator
+
+
+def render_serializer(serializer_class, queryset, size: int, context: dict) -> bytes:
+    """The list view without the row reader"""
+
+    page = list(prune_queryset(queryset, *get_fieldset_columns(serializer_class, None, None))[:size])
+    return JSONRenderer().render(serializer_class(page, many=True, context=context).data)
+
+
+def render_reader(serializer_class, queryset, size: int, context: dict) -> bytes:
+    reader = get_row_reader(serializer_class, None, None)
+    page = list(reader.values(queryset)[:size])
+    return JSONRenderer().render(reader.read(page, context["request"]))
+
+
+def measure(render, serializer_class, queryset, size: int, context: dict, seconds: float) -> float:
+    """Pages per second of the render function"""
+
+    count = 0
+    start = time.perf_counter()
+
+    while (elapsed := time.perf_counter() - start) < seconds:
+        render(serializer_class, queryset, size, context)
+        count += 1
+
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=20_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15, 100])
+    parser.add_argument("--seconds", type=float, default=2)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        method = "copy" if connection.vendor == "postgresql" else "bulk_create"
+        ScaleDataGenerator(users=100, collections=1000, links=args.links, batch_size=10_000, id_offset=1,
+                           method=method).generate()
+
+        context = {"request": Request(APIRequestFactory().get("/"))}
+        cases = (
+            ("links", serializers.LinkSerializer, models.Link.objects.order_by("-created_in", "-id")),
+            ("collections", serializers.CollectionSerializer, models.Collection.objects.order_by("-created_in", "-id")),
+        )
+
+        print(f"{connection.vendor}, {args.links} links")
+
+        for name, serializer_class, queryset in cases:
+            for size in args.sizes:
+                assert render_serializer(serializer_class, queryset, size, context) == \
+                    render_reader(serializer_class, queryset, size, context), f"{name} outputs differ"
+
+                before = measure(render_serializer, serializer_class, queryset, size, context, args.seconds)
+                after = measure(render_reader, serializer_class, queryset, size, context, args.seconds)
+                print(f"  {name:>11} x {size:<4} serializer {before:7.1f} pages/s, row reader {after:7.1f} pages/s, "
+                      f"x{after / before:.1f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
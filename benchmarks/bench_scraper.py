@@ -0,0 +1,78 @@
+"""
+Compare the blocking opengraph_py3 fetch with the concurrent scraper,
+then import many links of a single host under the default politeness limits.
+
+Run from the project root:
+
+    python -m benchmarks.bench_scraper --links 25 --same-host-links 50
+"""
+
+import os
+import time
+import argparse
+
+from unittest import mock
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+import opengraph_py3
+
+from apps.main import scraper
+from benchmarks.stand_in import StandInServer
+from config import settings
+
+
+def compare(server: StandInServer, links: int, min_delay: float, max_delay: float) -> None:
+    step = (max_delay - min_delay) / max(links - 1, 1)
+    urls = [f"{server.url}/page-{i}?delay={min_delay + i * step:.3f}" for i in range(links)]
+
+    start = time.perf_counter()
+    for url in urls:
+        opengraph_py3.OpenGraph(url=url, scrape=True)
+    sequential = time.perf_counter() - start
+
+    # The stand-in server is a single host, lift its politeness limits to compare raw concurrency
+    with mock.patch.dict(settings.SCRAPER_SETTINGS, {"MAX_PER_HOST": links, "HOST_BURST": links}):
+        start = time.perf_counter()
+        result = scraper.get_many_metadata(urls)
+        concurrent = time.perf_counter() - start
+
+    errors = [data for data in result if isinstance(data, Exception)]
+    print(f"links: {links}, slowest page: {max_delay:.2f}s, errors: {len(errors)}")
+    print(f"opengraph_py3, one by one: {sequential:.2f}s")
+    print(f"scraper, concurrently:     {concurrent:.2f}s")
+
+
+def same_host(server: StandInServer, links: int) -> None:
+    scraper.fetcher.reset_stats()
+    urls = [f"{server.url}/watch-{i}?delay=0.02" for i in range(links)]
+
+    start = time.perf_counter()
+    scraper.get_many_metadata(urls)
+    elapsed = time.perf_counter() - start
+    stats = scraper.fetcher.get_stats()
+
+    limits = {key: settings.SCRAPER_SETTINGS[key] for key in ("MAX_PER_HOST", "HOST_RATE", "HOST_BURST")}
+    print(f"\n{links} links of one host, {limits}: {elapsed:.2f}s")
+    print(f"connections created: {stats['connections_created']}, reused: {stats['connections_reused']}")
+    print(f"queue wait avg: {stats['queue_wait_avg']:.2f}s, max: {stats['queue_wait_max']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=25)
+    parser.add_argument("--min-delay", type=float, default=0.05)
+    parser.add_argument("--max-delay", type=float, default=0.5)
+    parser.add_argument("--same-host-links", type=int, default=50)
+    args = parser.parse_args()
+
+    with StandInServer() as server:
+        compare(server, args.links, args.min_delay, args.max_delay)
+        same_host(server, args.same_host_links)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compare the logins per second of the token issuance with two update_or_create calls and with
+db_queries.issue_jwttoken, sequentially and with concurrent logins of the same users.
+Only the token issuance is timed, without the password hashing.
+
+A test database is created on the database of the settings and dropped at the end.
+Run from the project root:
+
+    python -m benchmarks.bench_tokens --logins 2000 --users 100 --threads 8
+"""
+
+import os
+import time
+import secrets
+import argparse
+
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.db import IntegrityError, connection, connections
+
+from apps.user import db_queries, services
+from apps.user.models import User
+
+
+def issue_before(user_id: int) -> None:
+    """The token issuance before issue_jwttoken"""
+
+    secret_key = services.create_user_secret_key(user_id)
+    access_token, refresh_token = services.encode_jwttokens(user_id, secret_key)
+    db_queries.create_jwttoken(access_token=access_token, refresh_token=refresh_token, user_id=user_id)
+
+
+def issue_after(user_id: int) -> None:
+    secret_key = secrets.token_hex()
+    access_token, refresh_token = services.encode_jwttokens(user_id, secret_key)
+    db_queries.issue_jwttoken(secret_key=secret_key, access_token=access_token, refresh_token=refresh_token,
+                              user_id=user_id)
+
+
+def run(issue, user_ids: list[int], logins: int, threads: int) -> tuple[float, int]:
+    """Logins per second and the number of failed logins"""
+
+    def login(i: int) -> bool:
+        try:
+            issue(user_ids[i % len(user_ids)])
+            return True
+        except IntegrityError:
+            return False
+        finally:
+            if threads > 1:
+                connections.close_all()
+
+    start = time.perf_counter()
+
+    if threads > 1:
+        with ThreadPoolExecutor(threads) as executor:
+            results = list(executor.map(login, range(logins)))
+    else:
+        results = [login(i) for i in range(logins)]
+
+    return logins / (time.perf_counter() - start), results.count(False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        users = User.objects.bulk_create([
+            User(username=f"bench{i}", email=f"bench{i}@example.com", hashed_password="") for i in range(args.users)
+        ])
+        user_ids = [user.id for user in users] if users[0].id else list(User.objects.values_list("id", flat=True))
+
+        # Concurrent connections of the threads need a database server
+        thread_counts = (1, args.threads) if connection.vendor != "sqlite" else (1,)
+
+        print(f"{connection.vendor}, {args.logins} logins of {args.users} users")
+
+        for threads in thread_counts:
+            for name, issue in (("update_or_create", issue_before), ("issue_jwttoken", issue_after)):
+                rate, failed = run(issue, user_ids, args.logins, threads)
+                print(f"  {name:>16}, {threads} thread(s): {rate:8.0f} logins/s, {failed} failed")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Local stand-in servers: an HTTP server of link pages with a configurable delay and an SMTP server"""
+
+import time
+import threading
+import socketserver
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+PAGE = """<html>
+<head>
+    <title>Page {path}</title>
+    <meta property="og:title" content="Page {path}" />
+    <meta property="og:description" content="Stand-in page {path}" />
+    <meta property="og:image" content="http://127.0.0.1/{path}.png" />
+    <meta property="og:type" content="website" />
+</head>
+<body>{body}</body>
+</html>"""
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with an OpenGraph page after `?delay=` seconds.
+    With `?etag=` the page has that ETag and a matching If-None-Match gets a 304.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        time.sleep(float(query.get("delay", [0])[0]))
+
+        etag = f'"{query["etag"][0]}"' if "etag" in query else None
+
+        if etag is not None and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        status = int(query.get("status", [200])[0])
+        body_size = int(query.get("body", [0])[0])
+        content = PAGE.format(path=url.path, body="<p>lorem ipsum</p>" * body_size).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+
+        if etag is not None:
+            self.send_header("ETag", etag)
+
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class StandInServer:
+    """Run StandInHandler on a free local port in a background thread"""
+
+    def __init__(self, handler: type[BaseHTTPRequestHandler] = StandInHandler):
+        self.httpd = StandInHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class SMTPStandInHandler(socketserver.StreamRequestHandler):
+    """
+    A minimal SMTP server without TLS and authentication, it keeps the accepted messages in the server.
+    The server answers `fail_next` MAIL commands with 421 and rejects the RCPT of `rejected` addresses with 550.
+    """
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        mail_from, recipients = None, []
+        self.reply("220 stand-in ESMTP")
+
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].split(":", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 stand-in")
+            elif verb == "MAIL":
+                with server.lock:
+                    fail = server.fail_next > 0
+                    server.fail_next -= fail
+
+                if fail:
+                    self.reply("421 Service not available")
+                    return
+
+                mail_from, recipients = command.split(":", 1)[1].strip(" <>"), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipient = command.split(":", 1)[1].strip(" <>")
+
+                if recipient in server.rejected:
+                    self.reply("550 No such user")
+                else:
+                    recipients.append(recipient)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b"".join(iter(self.rfile.readline, b".\r\n"))
+
+                with server.lock:
+                    server.messages.append((mail_from, recipients, data))
+
+                self.reply("250 OK")
+            elif verb == "RSET":
+                mail_from, recipients = None, []
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class SMTPStandInServer(socketserver.ThreadingTCPServer):
+    """Run SMTPStandInHandler on a free local port in a background thread"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPStandInHandler)
+        self.thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+        self.fail_next = 0
+        self.rejected = set()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
@@ -15,7 +15,7 @@ app = Celery('config')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
-app.autodiscover_tasks(packages=["apps.user.celery_tasks"])
+app.autodiscover_tasks(packages=["apps.user.celery_tasks", "apps.main.celery_tasks"])
 
 
 @app.task(bind=True)
@@ -198,6 +198,10 @@ SWAGGER_SETTINGS = {
 }
 
 
+# A reset password link expires after PASSWORD_RESET_TIMEOUT seconds or once the password is changed
+PASSWORD_RESET_TIMEOUT = int(timedelta(hours=1).total_seconds())
+
+
 # JWTToken settings
 
 JWT_SETTINGS = {
@@ -210,6 +214,123 @@ JWT_SETTINGS = {
     'USER_ID_CLAIM': 'user_id',
 
     'AUTH_TOKEN_CLASSES': ('src.user.auth.models.JWTToken',), 
+
+    # "database" looks every access token up in the token table. "stateless" verifies its signature and expiration
+    # with the user and the secret key from the cache and rejects the logged out tokens of the revocation set.
+    # "cache" looks the access token up in a per-process LRU in front of Redis and in the token table on a miss
+    'VERIFICATION': os.getenv('DOC_JWT_VERIFICATION', os.getenv('JWT_VERIFICATION', 'database')),
+    'USER_CACHE_TTL': timedelta(minutes=5).total_seconds(),
+    # Keep it short: a token revoked by another process stays valid in the local tier for up to this time
+    'TOKEN_CACHE_LOCAL_TTL': 5,
+    'TOKEN_CACHE_LOCAL_SIZE': 10_000,
+
+    # The tokens and the secret keys older than REFRESH_TOKEN_LIFETIME are deleted by Celery beat in batches,
+    # with a pause in seconds between them
+    'PURGE_BATCH_SIZE': 1000,
+    'PURGE_SLEEP': 0.1,
+    'PURGE_INTERVAL': timedelta(hours=1),
+}
+
+
+# Password hashing settings
+
+HASHING_SETTINGS = {
+    # "process" hashes in a pool of processes off the request thread, "inline" on the request thread
+    'EXECUTOR': os.getenv('DOC_HASHING_EXECUTOR', os.getenv('HASHING_EXECUTOR', 'process')),
+    'WORKERS': int(os.getenv('DOC_HASHING_WORKERS', os.getenv('HASHING_WORKERS', 2))),
+    # Hashes of a web process running or queued in the pool at the same time
+    'MAX_IN_FLIGHT': int(os.getenv('DOC_HASHING_MAX_IN_FLIGHT', os.getenv('HASHING_MAX_IN_FLIGHT', 8))),
+    # Seconds a request waits for its turn before it gets 503
+    'QUEUE_TIMEOUT': float(os.getenv('DOC_HASHING_QUEUE_TIMEOUT', os.getenv('HASHING_QUEUE_TIMEOUT', 2))),
+    # "pbkdf2_sha256" or "scrypt". The hashes with other parameters are rehashed on sign in,
+    # `python manage.py calibrate_hashing` finds the parameters for a target latency on the current hardware
+    'ALGORITHM': os.getenv('DOC_HASHING_ALGORITHM', os.getenv('HASHING_ALGORITHM', 'pbkdf2_sha256')),
+    'PBKDF2_ITERATIONS': int(os.getenv('DOC_HASHING_PBKDF2_ITERATIONS',
+                                       os.getenv('HASHING_PBKDF2_ITERATIONS', 100_000))),
+    'SCRYPT_N': int(os.getenv('DOC_HASHING_SCRYPT_N', os.getenv('HASHING_SCRYPT_N', 2 ** 14))),
+    'SCRYPT_R': int(os.getenv('DOC_HASHING_SCRYPT_R', os.getenv('HASHING_SCRYPT_R', 8))),
+    'SCRYPT_P': int(os.getenv('DOC_HASHING_SCRYPT_P', os.getenv('HASHING_SCRYPT_P', 1))),
+}
+
+
+# Link settings
+
+LINK_SETTINGS = {
+    # Scrape link metadata in a Celery task instead of the POST /links/ request
+    'ASYNC_ENRICHMENT': bool(int(os.getenv('DOC_LINK_ASYNC_ENRICHMENT', os.getenv('LINK_ASYNC_ENRICHMENT', 0)))),
+
+    # POST /links/bulk/ limits
+    'BULK_MAX_LINKS': 5000,
+    'BULK_BATCH_SIZE': 500,
+
+    # Celery beat revalidates REFRESH_BATCH_SIZE links not refreshed for REFRESH_AGE every REFRESH_INTERVAL,
+    # sending at most REFRESH_CONCURRENCY conditional GETs at a time
+    'REFRESH_AGE': timedelta(days=7),
+    'REFRESH_BATCH_SIZE': 100,
+    'REFRESH_CONCURRENCY': 10,
+    'REFRESH_INTERVAL': timedelta(minutes=1),
+
+    # Render the GET responses of the link and collection endpoints from .values() rows instead of model instances
+    'ROW_READER': True,
+
+    # Links nested in a collection, the most recent ones
+    'COLLECTION_RECENT_LINKS': 10,
+}
+
+
+# Scraper settings
+
+SCRAPER_SETTINGS = {
+    # Maximum number of pages downloaded at the same time
+    'MAX_CONCURRENCY': 30,
+    # Politeness limits of every host: concurrent requests and a token bucket of requests per second
+    'MAX_PER_HOST': 6,
+    'HOST_RATE': 5,
+    'HOST_BURST': 10,
+    # The limits of at most this many hosts are kept, the least recently used idle hosts are forgotten
+    'MAX_HOSTS': 1000,
+    # Idle keep-alive connections are kept in the pool of their host for this many seconds
+    'KEEPALIVE_TIMEOUT': 30,
+    # Total time to download a single page, in seconds
+    'TIMEOUT': 10,
+    # Only the <head> of a page is read, and never more than MAX_PAGE_BYTES of it
+    'MAX_PAGE_BYTES': 512 * 1024,
+    'CHUNK_SIZE': 16 * 1024,
+    # The rest of a page is still read if it is that small, so that the connection can be reused
+    'DRAIN_BYTES': 64 * 1024,
+    'USER_AGENT': 'Mozilla/5.0 (compatible; XvunBot/1.0; +https://github.com/Lanterman/xvun)',
+
+    # Circuit breaker of every host, shared by all processes through the default cache: the circuit opens after
+    # CIRCUIT_FAILURE_THRESHOLD failures within CIRCUIT_FAILURE_WINDOW seconds and lets a single request through
+    # after CIRCUIT_COOL_DOWN seconds. Timeouts and connection errors are failures too
+    'CIRCUIT_FAILURE_THRESHOLD': 5,
+    'CIRCUIT_FAILURE_WINDOW': 60,
+    'CIRCUIT_COOL_DOWN': timedelta(minutes=5).total_seconds(),
+    'CIRCUIT_FAILURE_STATUSES': (403, 429, 500, 502, 503, 504),
+    # Create the links of a host with an open circuit with fallback metadata instead of rejecting them
+    'CIRCUIT_FALLBACK': bool(int(os.getenv('DOC_SCRAPER_CIRCUIT_FALLBACK', os.getenv('SCRAPER_CIRCUIT_FALLBACK', 0)))),
+
+    # Link metadata cache, keyed by the canonical link
+    'CACHE_TTL': timedelta(days=1).total_seconds(),
+    # How long to remember that a link could not be scraped
+    'CACHE_NEGATIVE_TTL': timedelta(minutes=10).total_seconds(),
+    'CACHE_LOCAL_SIZE': 1024,
+    'CACHE_LOCAL_TTL': timedelta(minutes=5).total_seconds(),
+}
+
+
+# Link image settings
+
+IMAGE_SETTINGS = {
+    # Thumbnails fit into a square box of this many pixels and are saved in every format
+    'THUMBNAIL_SIZES': {'small': 320, 'large': 960},
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': 80,
+    # Thumbnails are stored once per image, under <STORAGE_PATH>/<sha256 of the image>/
+    'STORAGE_PATH': 'link/thumbnails',
+    # Larger images are not processed
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'MAX_PIXELS': 50_000_000,
 }
 
 
@@ -227,6 +348,32 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 # CELERY_RESULT_EXPIRES = 3
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+CELERY_BEAT_SCHEDULE = {
+    'refresh-stale-links': {
+        'task': 'apps.main.celery_tasks.tasks.refresh_stale_links',
+        'schedule': LINK_SETTINGS['REFRESH_INTERVAL'],
+    },
+    'purge-expired-tokens': {
+        'task': 'apps.user.celery_tasks.tasks.purge_expired_tokens',
+        'schedule': JWT_SETTINGS['PURGE_INTERVAL'],
+    },
+    # Sends the emails left in the outbox after the retries of their batch
+    'flush-email-outbox': {
+        'task': 'apps.user.celery_tasks.tasks.flush_email_outbox',
+        'schedule': timedelta(minutes=1),
+    },
+}
+
+
+# Cache settings
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/1',
+        'OPTIONS': {'socket_connect_timeout': 1, 'socket_timeout': 1},
+    }
+}
 
 
 # smtp
@@ -238,6 +385,18 @@ EMAIL_HOST_PASSWORD = os.environ.get('DOC_EMAIL_HOST_PASSWORD', os.environ['EMAI
 EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
 
+EMAIL_SETTINGS = {
+    # The reset password emails wait in a queue of the broker and are sent together every BATCH_WINDOW seconds
+    'OUTBOX_URL': CELERY_BROKER_URL,
+    'OUTBOX_QUEUE': 'email-outbox',
+    'BATCH_WINDOW': 2,
+    'BATCH_SIZE': 100,
+    # Seconds before the first retry after a transient SMTP error, doubled for every next one
+    'RETRY_BACKOFF': 5,
+    'RETRY_BACKOFF_MAX': 300,
+    'MAX_RETRIES': 8,
+}
+
 
 # Other
 
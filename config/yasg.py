@@ -21,12 +21,13 @@ For authenticated requests, create a user and enter the resulting token along wi
 Example: '{AUTH_HEADER_TYPES} d8175af2fac77d4ee16b984769a7251775e6be48'.
 
 P.S.
-Before resetting "auth/reset_password/<user_email>/<user_secret_key>/" password, you must request it from "/auth/profile/try_to_reset_password/" endpoint.
+Before resetting "auth/reset_password/<user_email>/<token>/" password, you must request it from "/auth/profile/try_to_reset_password/" endpoint.
 
 P.S.S
-To load test data use "/add_test_data/" endpoint.
+To load test data use "/add_test_data/" endpoint or "python manage.py add_test_data" command.
 
-Due to the poor choice of library for retrieving site pages and the lack of asynchrony, the process may take some time.
+The link metadata comes from the bundled test data, so loading takes a few seconds and needs no network.
+To scrape the live pages instead, use "/add_test_data/?scrape=1" or "python manage.py add_test_data --scrape".
 """
 
 schema_view = get_schema_view(